@@ -199,16 +199,15 @@ class XSchedulePlaylistBrowser extends LitElement {
       }
 
       const newSchedules = {};
+      const newSongs = {};
 
-      // Fetch playlist metadata (including durations)
-      // Try xSchedule service first (has duration), fall back to browse_media (no duration)
-      let playlistsMetadata = {};
+      // One call returns every playlist with its duration, steps and the
+      // schedule to show (active, else soonest upcoming), chosen server side
       try {
-        // First try xSchedule-specific service (includes duration)
-        const metadataResponse = await this._hass.callWS({
+        const response = await this._hass.callWS({
           type: 'call_service',
           domain: 'xschedule',
-          service: 'get_playlists_with_metadata',
+          service: 'get_catalog',
           service_data: {
             entity_id: this.config.entity,
             force_refresh: forceRefresh,
@@ -216,103 +215,30 @@ class XSchedulePlaylistBrowser extends LitElement {
           return_response: true,
         });
 
-        if (metadataResponse && metadataResponse.response && metadataResponse.response.playlists) {
-          // Convert array to map by playlist name
-          playlistsMetadata = metadataResponse.response.playlists.reduce((acc, playlist) => {
-            acc[playlist.name] = playlist;
-            return acc;
-          }, {});
-        }
-      } catch (err) {
-        // Service not available (non-xSchedule player) - try browse_media fallback
-        console.log('xSchedule service not available, falling back to browse_media (no duration)');
-        try {
-          const browseResult = await this._hass.callWS({
-            type: 'media_player/browse_media',
-            entity_id: this.config.entity,
-            media_content_type: '',
-            media_content_id: '',
-          });
-
-          // Map browse_media response (no duration field available)
-          if (browseResult && browseResult.children) {
-            browseResult.children.forEach(child => {
-              playlistsMetadata[child.title] = {
-                name: child.title,
-                lengthms: 0  // Duration not available via browse_media
-              };
-            });
+        const playlists = (response && response.response && response.response.playlists) || [];
+        for (const playlist of playlists) {
+          if (playlist.steps) {
+            newSongs[playlist.name] = playlist.steps;
           }
-        } catch (browseErr) {
-          console.error('Failed to fetch playlists metadata:', browseErr);
-        }
-      }
 
-      // Fetch schedule info for each playlist
-      for (const playlist of this._playlists) {
-        try {
-          const response = await this._hass.callWS({
-            type: 'call_service',
-            domain: 'xschedule',
-            service: 'get_playlist_schedules',
-            service_data: {
-              entity_id: this.config.entity,
-              playlist: playlist,
-              force_refresh: forceRefresh,
-            },
-            return_response: true,
-          });
-
-
-          if (response && response.response && response.response.schedules && response.response.schedules.length > 0) {
-            const schedules = response.response.schedules;
-
-            // Find the best schedule to display:
-            // 1. Currently active schedule (active: "TRUE" or nextactive: "NOW!")
-            // 2. Soonest upcoming schedule (earliest valid date)
-            let schedule = null;
-
-            // First, look for active schedule
-            const activeSchedule = schedules.find(s => s.active === "TRUE" || s.nextactive === "NOW!");
-            if (activeSchedule) {
-              schedule = activeSchedule;
-            } else {
-              // Find soonest upcoming schedule (skip "A long time from now" and invalid dates)
-              const upcomingSchedules = schedules
-                .filter(s => {
-                  const na = s.nextactive;
-                  return na && na !== "A long time from now" && na !== "N/A" && na.match(/\d{4}-\d{2}-\d{2}/);
-                })
-                .sort((a, b) => {
-                  // Sort by nextactive date (earliest first)
-                  return new Date(a.nextactive) - new Date(b.nextactive);
-                });
-
-              schedule = upcomingSchedules.length > 0 ? upcomingSchedules[0] : schedules[0];
-            }
-
-            if (!schedule) {
-              continue; // Skip this playlist
-            }
-
-            // Get duration from metadata (lengthms field is milliseconds, convert to seconds)
-            let totalDuration = 0;
-            if (playlistsMetadata[playlist] && playlistsMetadata[playlist].lengthms) {
-              totalDuration = parseInt(playlistsMetadata[playlist].lengthms) / 1000;
-            }
-
-            newSchedules[playlist] = {
-              nextActiveTime: schedule.nextactive,  // Fixed: field is "nextactive" not "nextactivetime"
-              enabled: schedule.enabled,
-              active: schedule.active,
-              duration: totalDuration,
-            };
+          const schedule = playlist.schedule;
+          if (!schedule) {
+            continue; // Skip playlists without a schedule
           }
-        } catch (err) {
-          console.error(`Failed to fetch schedule for ${playlist}:`, err);
+
+          newSchedules[playlist.name] = {
+            nextActiveTime: schedule.nextactive,
+            enabled: schedule.enabled,
+            active: schedule.active,
+            duration: (playlist.duration || 0) / 1000,  // milliseconds to seconds
+          };
         }
+      } catch (err) {
+        console.error('Failed to fetch playlist catalog:', err);
       }
 
+      // Songs arrive with the catalog, so expanding a playlist needs no request
+      this._playlistSongs = { ...this._playlistSongs, ...newSongs };
       this._playlistSchedules = newSchedules;
       // Force shouldUpdate to detect this change by clearing previous state
       this._previousSchedules = null;
@@ -332,7 +258,9 @@ class XSchedulePlaylistBrowser extends LitElement {
         // Only refetch if this is our entity
         if (event.data.entity_id === this.config.entity) {
           console.debug('Backend cache invalidated, refetching schedule info');
-          this._fetchScheduleInfo(true); // Force refresh to get fresh data
+          // The backend has already dropped the invalidated entries, so a
+          // plain fetch refetches only those
+          this._fetchScheduleInfo();
         }
       },
       'xschedule_cache_invalidated'
@@ -94,6 +94,41 @@ describe('XSchedulePlaylistBrowser', () => {
       element._error = 'Test error';
       expect(element._error).to.equal('Test error');
     });
+
+    it('loads schedules and songs with one get_catalog call', async () => {
+      const config = createMockCardConfig();
+      mockHass.states['media_player.xschedule'] = createMockEntityState(
+        'media_player.xschedule',
+        'idle',
+        { playlist_songs: [], source_list: ['Halloween', 'Christmas', 'Background'] }
+      );
+      mockHass.callWS = stub().resolves({
+        response: {
+          playlists: [
+            {
+              name: 'Halloween',
+              duration: 600000,
+              steps: [{ name: 'Thriller', duration: 300000 }],
+              schedule: { nextactive: 'NOW!', enabled: 'TRUE', active: 'TRUE' },
+            },
+            { name: 'Christmas', duration: 900000, steps: [], schedule: null },
+            { name: 'Background', duration: 0, steps: null, schedule: null },
+          ],
+        },
+      });
+
+      // Setting hass with a source_list triggers the fetch
+      element = await createConfiguredElement('xschedule-playlist-browser', config, mockHass);
+      await new Promise(resolve => setTimeout(resolve, 0));
+
+      expect(mockHass.callWS.callCount).to.equal(1);
+      expect(mockHass.callWS.firstCall.args[0].service).to.equal('get_catalog');
+      expect(element._playlistSchedules).to.deep.equal({
+        Halloween: { nextActiveTime: 'NOW!', enabled: 'TRUE', active: 'TRUE', duration: 600 },
+      });
+      expect(element._playlistSongs.Halloween).to.deep.equal([{ name: 'Thriller', duration: 300000 }]);
+      expect(element._playlistSongs.Background).to.be.undefined;
+    });
   });
 
   describe('Playlist Selection', () => {
@@ -1,6 +1,7 @@
 """The xSchedule integration."""
 from __future__ import annotations
 
+import asyncio
 import logging
 import shutil
 from pathlib import Path
@@ -9,10 +10,20 @@ from typing import Any
 import voluptuous as vol
 
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import Platform
-from homeassistant.core import HomeAssistant, ServiceCall
+from homeassistant.const import CONF_HOST, CONF_PORT, Platform
+from homeassistant.core import HomeAssistant, ServiceCall, ServiceResponse, SupportsResponse
+from homeassistant.exceptions import HomeAssistantError
 import homeassistant.helpers.config_validation as cv
 from homeassistant.helpers import entity_platform
+from homeassistant.helpers.storage import Store
+
+from .const import (
+    SERVICE_ENTITY_CONCURRENCY,
+    STORAGE_KEY_QUEUE,
+    STORAGE_VERSION,
+)
+from .hub import async_get_hub, async_release_hub, catalog_store_key
+from .websocket_api import async_register_websocket_commands
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -24,12 +35,15 @@ SERVICE_PLAY_SONG = "play_song"
 SERVICE_JUMP_TO_STEP = "jump_to_step"
 SERVICE_GET_PLAYLIST_SCHEDULES = "get_playlist_schedules"
 SERVICE_GET_PLAYLISTS_WITH_METADATA = "get_playlists_with_metadata"
+SERVICE_GET_CATALOG = "get_catalog"
 
 # Internal Queue services
 SERVICE_ADD_TO_INTERNAL_QUEUE = "add_to_internal_queue"
 SERVICE_REMOVE_FROM_INTERNAL_QUEUE = "remove_from_internal_queue"
 SERVICE_REORDER_INTERNAL_QUEUE = "reorder_internal_queue"
 SERVICE_CLEAR_INTERNAL_QUEUE = "clear_internal_queue"
+SERVICE_ADD_MANY_TO_INTERNAL_QUEUE = "add_many_to_internal_queue"
+SERVICE_APPLY_QUEUE_OPS = "apply_queue_ops"
 
 SCHEMA_PLAY_SONG = vol.Schema(
     {
@@ -61,6 +75,13 @@ SCHEMA_GET_PLAYLISTS_WITH_METADATA = vol.Schema(
     }
 )
 
+SCHEMA_GET_CATALOG = vol.Schema(
+    {
+        vol.Required("entity_id"): cv.entity_id,
+        vol.Optional("force_refresh", default=False): cv.boolean,
+    }
+)
+
 # Internal Queue schemas
 SCHEMA_ADD_TO_INTERNAL_QUEUE = vol.Schema(
     {
@@ -89,6 +110,29 @@ SCHEMA_CLEAR_INTERNAL_QUEUE = vol.Schema(
     }
 )
 
+SCHEMA_ADD_MANY_TO_INTERNAL_QUEUE = vol.Schema(
+    {
+        vol.Required("entity_id"): cv.entity_ids,
+        vol.Required("songs"): [cv.string],
+    }
+)
+
+SCHEMA_APPLY_QUEUE_OPS = vol.Schema(
+    {
+        vol.Required("entity_id"): cv.entity_ids,
+        vol.Required("operations"): [
+            vol.Schema(
+                {
+                    vol.Required("op"): vol.In(["add", "remove", "bump", "move"]),
+                    vol.Optional("song"): cv.string,
+                    vol.Optional("queue_item_id"): cv.string,
+                    vol.Optional("position"): vol.All(vol.Coerce(int), vol.Range(min=0)),
+                }
+            )
+        ],
+    }
+)
+
 
 async def _copy_cards_to_www(hass: HomeAssistant) -> dict[str, int]:
     """
@@ -241,6 +285,59 @@ async def _register_frontend_resources(hass: HomeAssistant, timestamps: dict[str
 # and causing other HACS cards to be removed. Only async_setup_entry() should register resources.
 
 
+def _get_entity(hass: HomeAssistant, entity_id: str, method: str) -> Any | None:
+    """Return the media player entity for entity_id if it has method, else None."""
+    component = hass.data.get("media_player")
+    entity = component.get_entity(entity_id) if component else None
+    return entity if hasattr(entity, method) else None
+
+
+async def async_call_entities(
+    hass: HomeAssistant, entity_ids: list[str], method: str, *args: Any
+) -> dict[str, Any]:
+    """Call method on each targeted xSchedule player, a few at a time.
+
+    Entities are all resolved first, then called concurrently (at most
+    SERVICE_ENTITY_CONCURRENCY at once) so players targeted together start
+    together. Returns the entities that succeeded and an error per entity
+    that didn't.
+    """
+    errors: dict[str, str] = {}
+    calls = {}
+    for entity_id in dict.fromkeys(entity_ids):
+        entity = _get_entity(hass, entity_id, method)
+        if entity is None:
+            _LOGGER.error("Entity %s is not an xSchedule player", entity_id)
+            errors[entity_id] = "not an xSchedule player"
+        else:
+            calls[entity_id] = getattr(entity, method)
+
+    semaphore = asyncio.Semaphore(SERVICE_ENTITY_CONCURRENCY)
+
+    async def call(entity_id: str) -> None:
+        async with semaphore:
+            try:
+                await calls[entity_id](*args)
+            except Exception as err:  # pylint: disable=broad-except
+                _LOGGER.error("Error calling %s for %s: %s", method, entity_id, err, exc_info=True)
+                errors[entity_id] = str(err) or type(err).__name__
+
+    await asyncio.gather(*(call(entity_id) for entity_id in calls))
+    return {
+        "succeeded": [entity_id for entity_id in calls if entity_id not in errors],
+        "errors": errors,
+    }
+
+
+def _raise_for_errors(call: ServiceCall, response: dict[str, Any]) -> dict[str, Any]:
+    """Fail the call on any entity error, unless the caller reads the response."""
+    if response["errors"] and not call.return_response:
+        raise HomeAssistantError(
+            "; ".join(f"{entity_id}: {error}" for entity_id, error in response["errors"].items())
+        )
+    return response
+
+
 async def async_reload_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
     """Reload config entry when options change."""
     await hass.config_entries.async_reload(entry.entry_id)
@@ -253,6 +350,9 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     hass.data.setdefault(DOMAIN, {})
     hass.data[DOMAIN][entry.entry_id] = entry.data
 
+    # One connection per xSchedule host, shared by every entry and platform
+    entry.runtime_data = await async_get_hub(hass, entry)
+
     # Copy cards to www and get timestamps for cache busting
     timestamps = await _copy_cards_to_www(hass)
 
@@ -271,208 +371,108 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     entry.async_on_unload(entry.add_update_listener(async_reload_entry))
 
     # Register services
-    async def async_play_song(call: ServiceCall) -> None:
+    async def async_play_song(call: ServiceCall) -> ServiceResponse:
         """Handle play_song service call."""
-        entity_ids = call.data["entity_id"]
-        playlist = call.data["playlist"]
-        song = call.data["song"]
-
-        for entity_id in entity_ids:
-            # Get the media player entity directly from the component
-            component = hass.data.get("media_player")
-            if component:
-                entity_obj = component.get_entity(entity_id)
-                if entity_obj and hasattr(entity_obj, "async_play_song"):
-                    await entity_obj.async_play_song(playlist, song)
-
-    async def async_jump_to_step(call: ServiceCall) -> None:
+        return await async_call_entities(
+            hass, call.data["entity_id"], "async_play_song", call.data["playlist"], call.data["song"]
+        )
+
+    async def async_jump_to_step(call: ServiceCall) -> ServiceResponse:
         """Handle jump_to_step service call."""
-        entity_ids = call.data["entity_id"]
-        step = call.data["step"]
-
-        _LOGGER.debug("jump_to_step service called: entity_ids=%s, step=%s", entity_ids, step)
-
-        for entity_id in entity_ids:
-            # Get the media player entity directly from the component
-            component = hass.data.get("media_player")
-            if not component:
-                _LOGGER.error("media_player component not found in hass.data")
-                continue
-                
-            entity_obj = component.get_entity(entity_id)
-            if not entity_obj:
-                _LOGGER.error("Entity %s not found in media_player component", entity_id)
-                continue
-                
-            if not hasattr(entity_obj, "async_jump_to_step"):
-                _LOGGER.error("Entity %s does not have async_jump_to_step method", entity_id)
-                continue
-                
-            try:
-                _LOGGER.debug("Calling async_jump_to_step on entity %s with step=%s", entity_id, step)
-                await entity_obj.async_jump_to_step(step)
-                _LOGGER.info("Successfully called async_jump_to_step for %s", entity_id)
-            except Exception as err:
-                _LOGGER.error("Error calling async_jump_to_step for %s: %s", entity_id, err, exc_info=True)
+        _LOGGER.debug("jump_to_step service called: entity_ids=%s, step=%s",
+                     call.data["entity_id"], call.data["step"])
+        return await async_call_entities(
+            hass, call.data["entity_id"], "async_jump_to_step", call.data["step"]
+        )
 
     async def async_get_playlist_schedules(call: ServiceCall) -> dict[str, Any]:
         """Handle get_playlist_schedules service call."""
-        entity_id = call.data["entity_id"]
-        playlist = call.data["playlist"]
-        force_refresh = call.data.get("force_refresh", False)
-
-        # Get the media player entity directly from the component
-        component = hass.data.get("media_player")
-        if component:
-            entity_obj = component.get_entity(entity_id)
-            if entity_obj and hasattr(entity_obj, "async_get_playlist_schedules"):
-                schedules = await entity_obj.async_get_playlist_schedules(playlist, force_refresh)
-                return {"schedules": schedules}
-
-        return {"schedules": []}
+        entity_obj = _get_entity(hass, call.data["entity_id"], "async_get_playlist_schedules")
+        if entity_obj is None:
+            return {"schedules": []}
+        schedules = await entity_obj.async_get_playlist_schedules(
+            call.data["playlist"], call.data.get("force_refresh", False)
+        )
+        return {"schedules": schedules}
 
     async def async_get_playlists_with_metadata(call: ServiceCall) -> dict[str, Any]:
         """Handle get_playlists_with_metadata service call."""
-        entity_id = call.data["entity_id"]
-        force_refresh = call.data.get("force_refresh", False)
-
-        # Get the media player entity directly from the component
-        component = hass.data.get("media_player")
-        if component:
-            entity_obj = component.get_entity(entity_id)
-            if entity_obj and hasattr(entity_obj, "_api_client"):
-                playlists = await entity_obj._api_client.get_playlists_with_metadata(force_refresh)
-                return {"playlists": playlists}
-
-        return {"playlists": []}
-
-    # Internal Queue service handlers
-    async def async_add_to_internal_queue(call: ServiceCall) -> None:
+        entity_obj = _get_entity(hass, call.data["entity_id"], "async_get_playlists_with_metadata")
+        if entity_obj is None:
+            return {"playlists": []}
+        playlists = await entity_obj.async_get_playlists_with_metadata(
+            call.data.get("force_refresh", False)
+        )
+        return {"playlists": playlists}
+
+    async def async_get_catalog(call: ServiceCall) -> dict[str, Any]:
+        """Handle get_catalog service call."""
+        entity_obj = _get_entity(hass, call.data["entity_id"], "async_get_catalog")
+        if entity_obj is None:
+            return {"playlists": []}
+        return await entity_obj.async_get_catalog(call.data.get("force_refresh", False))
+
+    # Internal Queue service handlers (these fail the call if any entity fails)
+    async def async_add_to_internal_queue(call: ServiceCall) -> ServiceResponse:
         """Handle add_to_internal_queue service call."""
-        entity_ids = call.data["entity_id"]
-        song = call.data["song"]
-
-        _LOGGER.debug("add_to_internal_queue service called: entity_ids=%s, song=%s", entity_ids, song)
-
-        for entity_id in entity_ids:
-            component = hass.data.get("media_player")
-            if not component:
-                _LOGGER.error("media_player component not found in hass.data")
-                continue
-                
-            entity_obj = component.get_entity(entity_id)
-            if not entity_obj:
-                _LOGGER.error("Entity %s not found in media_player component", entity_id)
-                continue
-                
-            if not hasattr(entity_obj, "async_add_to_internal_queue"):
-                _LOGGER.error("Entity %s does not have async_add_to_internal_queue method", entity_id)
-                continue
-                
-            try:
-                _LOGGER.debug("Calling async_add_to_internal_queue on entity %s with song=%s", entity_id, song)
-                await entity_obj.async_add_to_internal_queue(song)
-                _LOGGER.info("Successfully called async_add_to_internal_queue for %s", entity_id)
-            except Exception as err:
-                _LOGGER.error("Error calling async_add_to_internal_queue for %s: %s", entity_id, err, exc_info=True)
-                raise
-
-    async def async_remove_from_internal_queue(call: ServiceCall) -> None:
+        _LOGGER.debug("add_to_internal_queue service called: entity_ids=%s, song=%s",
+                     call.data["entity_id"], call.data["song"])
+        return _raise_for_errors(call, await async_call_entities(
+            hass, call.data["entity_id"], "async_add_to_internal_queue", call.data["song"]
+        ))
+
+    async def async_remove_from_internal_queue(call: ServiceCall) -> ServiceResponse:
         """Handle remove_from_internal_queue service call."""
-        entity_ids = call.data["entity_id"]
-        queue_item_id = call.data["queue_item_id"]
-
-        _LOGGER.debug("remove_from_internal_queue service called: entity_ids=%s, queue_item_id=%s", 
-                     entity_ids, queue_item_id)
-
-        for entity_id in entity_ids:
-            component = hass.data.get("media_player")
-            if not component:
-                _LOGGER.error("media_player component not found in hass.data")
-                continue
-                
-            entity_obj = component.get_entity(entity_id)
-            if not entity_obj:
-                _LOGGER.error("Entity %s not found in media_player component", entity_id)
-                continue
-                
-            if not hasattr(entity_obj, "async_remove_from_internal_queue"):
-                _LOGGER.error("Entity %s does not have async_remove_from_internal_queue method", entity_id)
-                continue
-                
-            try:
-                _LOGGER.debug("Calling async_remove_from_internal_queue on entity %s", entity_id)
-                await entity_obj.async_remove_from_internal_queue(queue_item_id)
-                _LOGGER.info("Successfully called async_remove_from_internal_queue for %s", entity_id)
-            except Exception as err:
-                _LOGGER.error("Error calling async_remove_from_internal_queue for %s: %s", entity_id, err, exc_info=True)
-                raise
-
-    async def async_reorder_internal_queue(call: ServiceCall) -> None:
+        _LOGGER.debug("remove_from_internal_queue service called: entity_ids=%s, queue_item_id=%s",
+                     call.data["entity_id"], call.data["queue_item_id"])
+        return _raise_for_errors(call, await async_call_entities(
+            hass, call.data["entity_id"], "async_remove_from_internal_queue", call.data["queue_item_id"]
+        ))
+
+    async def async_reorder_internal_queue(call: ServiceCall) -> ServiceResponse:
         """Handle reorder_internal_queue service call."""
-        entity_ids = call.data["entity_id"]
-        queue_item_ids = call.data["queue_item_ids"]
-
-        _LOGGER.debug("reorder_internal_queue service called: entity_ids=%s, queue_item_ids=%s", 
-                     entity_ids, queue_item_ids)
-
-        for entity_id in entity_ids:
-            component = hass.data.get("media_player")
-            if not component:
-                _LOGGER.error("media_player component not found in hass.data")
-                continue
-                
-            entity_obj = component.get_entity(entity_id)
-            if not entity_obj:
-                _LOGGER.error("Entity %s not found in media_player component", entity_id)
-                continue
-                
-            if not hasattr(entity_obj, "async_reorder_internal_queue"):
-                _LOGGER.error("Entity %s does not have async_reorder_internal_queue method", entity_id)
-                continue
-                
-            try:
-                _LOGGER.debug("Calling async_reorder_internal_queue on entity %s", entity_id)
-                await entity_obj.async_reorder_internal_queue(queue_item_ids)
-                _LOGGER.info("Successfully called async_reorder_internal_queue for %s", entity_id)
-            except Exception as err:
-                _LOGGER.error("Error calling async_reorder_internal_queue for %s: %s", entity_id, err, exc_info=True)
-                raise
-
-    async def async_clear_internal_queue(call: ServiceCall) -> None:
+        _LOGGER.debug("reorder_internal_queue service called: entity_ids=%s, queue_item_ids=%s",
+                     call.data["entity_id"], call.data["queue_item_ids"])
+        return _raise_for_errors(call, await async_call_entities(
+            hass, call.data["entity_id"], "async_reorder_internal_queue", call.data["queue_item_ids"]
+        ))
+
+    async def async_clear_internal_queue(call: ServiceCall) -> ServiceResponse:
         """Handle clear_internal_queue service call."""
-        entity_ids = call.data["entity_id"]
-
-        _LOGGER.debug("clear_internal_queue service called: entity_ids=%s", entity_ids)
-
-        for entity_id in entity_ids:
-            component = hass.data.get("media_player")
-            if not component:
-                _LOGGER.error("media_player component not found in hass.data")
-                continue
-                
-            entity_obj = component.get_entity(entity_id)
-            if not entity_obj:
-                _LOGGER.error("Entity %s not found in media_player component", entity_id)
-                continue
-                
-            if not hasattr(entity_obj, "async_clear_internal_queue"):
-                _LOGGER.error("Entity %s does not have async_clear_internal_queue method", entity_id)
-                continue
-                
-            try:
-                _LOGGER.debug("Calling async_clear_internal_queue on entity %s", entity_id)
-                await entity_obj.async_clear_internal_queue()
-                _LOGGER.info("Successfully called async_clear_internal_queue for %s", entity_id)
-            except Exception as err:
-                _LOGGER.error("Error calling async_clear_internal_queue for %s: %s", entity_id, err, exc_info=True)
-                raise
+        _LOGGER.debug("clear_internal_queue service called: entity_ids=%s", call.data["entity_id"])
+        return _raise_for_errors(call, await async_call_entities(
+            hass, call.data["entity_id"], "async_clear_internal_queue"
+        ))
+
+    async def async_add_many_to_internal_queue(call: ServiceCall) -> ServiceResponse:
+        """Handle add_many_to_internal_queue service call."""
+        _LOGGER.debug("add_many_to_internal_queue service called: entity_ids=%s, songs=%s",
+                     call.data["entity_id"], call.data["songs"])
+        return _raise_for_errors(call, await async_call_entities(
+            hass, call.data["entity_id"], "async_add_many_to_internal_queue", call.data["songs"]
+        ))
+
+    async def async_apply_queue_ops(call: ServiceCall) -> ServiceResponse:
+        """Handle apply_queue_ops service call."""
+        _LOGGER.debug("apply_queue_ops service called: entity_ids=%s, operations=%s",
+                     call.data["entity_id"], call.data["operations"])
+        return _raise_for_errors(call, await async_call_entities(
+            hass, call.data["entity_id"], "async_apply_queue_ops", call.data["operations"]
+        ))
 
     hass.services.async_register(
-        DOMAIN, SERVICE_PLAY_SONG, async_play_song, schema=SCHEMA_PLAY_SONG
+        DOMAIN,
+        SERVICE_PLAY_SONG,
+        async_play_song,
+        schema=SCHEMA_PLAY_SONG,
+        supports_response=SupportsResponse.OPTIONAL,
     )
     hass.services.async_register(
-        DOMAIN, SERVICE_JUMP_TO_STEP, async_jump_to_step, schema=SCHEMA_JUMP_TO_STEP
+        DOMAIN,
+        SERVICE_JUMP_TO_STEP,
+        async_jump_to_step,
+        schema=SCHEMA_JUMP_TO_STEP,
+        supports_response=SupportsResponse.OPTIONAL,
     )
     hass.services.async_register(
         DOMAIN,
@@ -488,6 +488,16 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         schema=SCHEMA_GET_PLAYLISTS_WITH_METADATA,
         supports_response=True,
     )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_GET_CATALOG,
+        async_get_catalog,
+        schema=SCHEMA_GET_CATALOG,
+        supports_response=True,
+    )
+
+    # Card state streaming (xschedule/subscribe)
+    async_register_websocket_commands(hass)
 
     # Register internal queue services
     hass.services.async_register(
@@ -495,24 +505,42 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         SERVICE_ADD_TO_INTERNAL_QUEUE,
         async_add_to_internal_queue,
         schema=SCHEMA_ADD_TO_INTERNAL_QUEUE,
+        supports_response=SupportsResponse.OPTIONAL,
     )
     hass.services.async_register(
         DOMAIN,
         SERVICE_REMOVE_FROM_INTERNAL_QUEUE,
         async_remove_from_internal_queue,
         schema=SCHEMA_REMOVE_FROM_INTERNAL_QUEUE,
+        supports_response=SupportsResponse.OPTIONAL,
     )
     hass.services.async_register(
         DOMAIN,
         SERVICE_REORDER_INTERNAL_QUEUE,
         async_reorder_internal_queue,
         schema=SCHEMA_REORDER_INTERNAL_QUEUE,
+        supports_response=SupportsResponse.OPTIONAL,
     )
     hass.services.async_register(
         DOMAIN,
         SERVICE_CLEAR_INTERNAL_QUEUE,
         async_clear_internal_queue,
         schema=SCHEMA_CLEAR_INTERNAL_QUEUE,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_ADD_MANY_TO_INTERNAL_QUEUE,
+        async_add_many_to_internal_queue,
+        schema=SCHEMA_ADD_MANY_TO_INTERNAL_QUEUE,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_APPLY_QUEUE_OPS,
+        async_apply_queue_ops,
+        schema=SCHEMA_APPLY_QUEUE_OPS,
+        supports_response=SupportsResponse.OPTIONAL,
     )
 
     return True
@@ -526,6 +554,7 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
 
     if unload_ok:
         hass.data[DOMAIN].pop(entry.entry_id)
+        await async_release_hub(hass, entry)
 
     # Unregister services if this is the last entry
     if not hass.data[DOMAIN]:
@@ -533,10 +562,28 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         hass.services.async_remove(DOMAIN, SERVICE_JUMP_TO_STEP)
         hass.services.async_remove(DOMAIN, SERVICE_GET_PLAYLIST_SCHEDULES)
         hass.services.async_remove(DOMAIN, SERVICE_GET_PLAYLISTS_WITH_METADATA)
+        hass.services.async_remove(DOMAIN, SERVICE_GET_CATALOG)
         # Unregister internal queue services
         hass.services.async_remove(DOMAIN, SERVICE_ADD_TO_INTERNAL_QUEUE)
         hass.services.async_remove(DOMAIN, SERVICE_REMOVE_FROM_INTERNAL_QUEUE)
         hass.services.async_remove(DOMAIN, SERVICE_REORDER_INTERNAL_QUEUE)
         hass.services.async_remove(DOMAIN, SERVICE_CLEAR_INTERNAL_QUEUE)
+        hass.services.async_remove(DOMAIN, SERVICE_ADD_MANY_TO_INTERNAL_QUEUE)
+        hass.services.async_remove(DOMAIN, SERVICE_APPLY_QUEUE_OPS)
 
     return unload_ok
+
+
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Remove data persisted for a deleted config entry.
+
+    The catalog is shared by the host's entries, so it goes with the last.
+    """
+    await Store(hass, STORAGE_VERSION, f"{STORAGE_KEY_QUEUE}.{entry.entry_id}").async_remove()
+    host = (entry.data[CONF_HOST], entry.data[CONF_PORT])
+    if not any(
+        other.entry_id != entry.entry_id
+        and (other.data[CONF_HOST], other.data[CONF_PORT]) == host
+        for other in hass.config_entries.async_entries(DOMAIN)
+    ):
+        await Store(hass, STORAGE_VERSION, catalog_store_key(*host)).async_remove()
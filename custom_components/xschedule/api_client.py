@@ -4,16 +4,86 @@ from __future__ import annotations
 import asyncio
 import hashlib
 import logging
-from typing import Any
-from urllib.parse import quote, urlencode
+import time
+import weakref
+from functools import lru_cache, partial
+from typing import TYPE_CHECKING, Any
+from urllib.parse import quote
 
 import aiohttp
 
-from .const import API_COMMAND, API_QUERY
+from .cache import XScheduleCache
+from .codec import loads
+from .coalesce import LatestValueSender, TokenBucket
+from .const import (
+    API_COMMAND,
+    API_QUERY,
+    COALESCE_BURST,
+    COALESCE_RATE,
+    CACHE_MAX_BYTES,
+    CACHE_MAX_PLAYLISTS,
+    CACHE_PLAYLISTS_TTL,
+    CACHE_SCHEDULES_TTL,
+    CACHE_STEPS_TTL,
+    HTTP_CONNECTION_LIMIT,
+    STATUS_MICRO_CACHE_TTL,
+    WS_FALLBACK_COOLDOWN,
+)
+
+if TYPE_CHECKING:
+    from .websocket import XScheduleWebSocket
 
 _LOGGER = logging.getLogger(__name__)
 
 
+@lru_cache(maxsize=256)
+def _encode(value: str) -> str:
+    """Percent-encode a query/command name or parameter string.
+
+    xSchedule requires %20 for spaces and does not accept + as space encoding.
+    Query and command names come from a small fixed set, so they are cached.
+    """
+    return quote(value, safe="")
+
+
+# Cached data sets, named after their caches
+CACHE_PLAYLISTS = "playlists"
+CACHE_STEPS = "steps"
+CACHE_SCHEDULES = "schedules"
+CACHE_ALL = frozenset({CACHE_PLAYLISTS, CACHE_STEPS, CACHE_SCHEDULES})
+
+# A schedule starting or ending changes the schedules' active/nextactive
+# flags and the playlists' nextscheduled field
+SCHEDULE_SCOPE = frozenset({CACHE_PLAYLISTS, CACHE_SCHEDULES})
+
+# Cached data each command can change. Transport, volume, seek and queue
+# commands don't alter playlists, steps or schedules and are not listed.
+COMMAND_INVALIDATES: dict[str, frozenset[str]] = {
+    "Stop all now": SCHEDULE_SCOPE,
+    "Stop": SCHEDULE_SCOPE,
+    "Add to the current schedule n minutes": SCHEDULE_SCOPE,
+    "Activate all schedules": SCHEDULE_SCOPE,
+    "Deactivate all schedules": SCHEDULE_SCOPE,
+    "Activate specified schedule": SCHEDULE_SCOPE,
+    "Deactivate specified schedule": SCHEDULE_SCOPE,
+    "Restart selected schedule": SCHEDULE_SCOPE,
+    "Restart named schedule": SCHEDULE_SCOPE,
+    "Toggle current playlist loop": frozenset({CACHE_PLAYLISTS}),
+    "Toggle current playlist random": frozenset({CACHE_PLAYLISTS}),
+    "Refresh current playlist": CACHE_ALL,
+    "Change show folder": CACHE_ALL,
+}
+
+# Commands that set an absolute value, typically from a slider. Only the
+# newest queued value is sent; relative commands ("Adjust volume by",
+# "Increase brightness by n%") must all be sent and are not listed.
+COALESCED_COMMANDS = frozenset(
+    {"Set volume to", "Set step position ms", "Set brightness to n%"}
+)
+
+_UNSET: Any = object()
+
+
 class XScheduleAPIError(Exception):
     """Base exception for xSchedule API errors."""
 
@@ -26,6 +96,14 @@ class XScheduleAuthError(XScheduleAPIError):
     """Exception for authentication errors."""
 
 
+class XScheduleRequestTimeout(XScheduleConnectionError):
+    """Exception for a request that was sent but never answered."""
+
+
+class XScheduleResponseError(XScheduleAPIError):
+    """Exception for a reply that isn't in the expected format."""
+
+
 class XScheduleAPIClient:
     """Client for interacting with xSchedule API."""
 
@@ -36,18 +114,103 @@ class XScheduleAPIClient:
         password: str | None = None,
         session: aiohttp.ClientSession | None = None,
     ) -> None:
-        """Initialize the API client."""
+        """Initialize the API client.
+
+        Pass Home Assistant's shared session (``async_get_clientsession``) so
+        requests ride on its pooled keep-alive connector. Without one the
+        client creates its own session with a per-host connector.
+        """
         self.host = host
         self.port = port
         self.password = password
         self._session = session
         self._own_session = session is None
         self._base_url = f"http://{host}:{port}"
-        # Cache storage: dict[playlist_name, tuple[data, timestamp]]
-        self._schedule_cache: dict[str, tuple[list[dict[str, Any]], float]] = {}
-        self._steps_cache: dict[str, tuple[list[dict[str, Any]], float]] = {}
-        self._schedule_cache_ttl = 300  # 5 minutes for schedules (reduced from 10)
-        self._steps_cache_ttl = 180  # 3 minutes for steps/songs (reduced from 5)
+
+        # Pre-encoded URL templates: only the encoded name and parameters are
+        # appended per request
+        self._query_url = f"{self._base_url}/{API_QUERY}?Query="
+        self._command_url = f"{self._base_url}/{API_COMMAND}?Command="
+        password_hash = self._get_password_hash()
+        self._auth_suffix = f"&Pass={password_hash}" if password_hash else ""
+
+        # xSchedule's embedded web server is slow, cap parallel requests
+        self._request_slots = asyncio.Semaphore(HTTP_CONNECTION_LIMIT)
+
+        # Connection reuse tracking (protocols seen so far, weakly held)
+        self._seen_connections: weakref.WeakSet[Any] = weakref.WeakSet()
+        self._requests_total = 0
+        self._connections_new = 0
+        self._connections_reused = 0
+
+        # Open WebSocket used for queries/commands when connected
+        self._websocket: XScheduleWebSocket | None = None
+        self._websocket_requests = 0
+        self._websocket_fallbacks = 0
+        # After a WebSocket failure REST is used until this monotonic time
+        self._websocket_retry_at = 0.0
+
+        # Single-flight: in-flight queries keyed by (query, parameters)
+        self._inflight: dict[tuple[str, str], asyncio.Task] = {}
+        self._queries_coalesced = 0
+        # Latest-value-wins senders for COALESCED_COMMANDS, keyed by command
+        self._coalesced: dict[str, LatestValueSender] = {}
+        # Micro-cache for GetPlayingStatus bursts: (monotonic time, result)
+        self._status_micro_cache: tuple[float, Any] | None = None
+        # Bumped by every command; a status query that started before one
+        # mustn't fill the micro-cache
+        self._status_generation = 0
+
+        # Stale-while-revalidate caches keyed by playlist name
+        self._playlists_cache = XScheduleCache(
+            "playlists", CACHE_PLAYLISTS_TTL, 1, CACHE_MAX_BYTES
+        )
+        self._schedule_cache = XScheduleCache(
+            "schedules", CACHE_SCHEDULES_TTL, CACHE_MAX_PLAYLISTS, CACHE_MAX_BYTES
+        )
+        self._steps_cache = XScheduleCache(
+            "steps", CACHE_STEPS_TTL, CACHE_MAX_PLAYLISTS, CACHE_MAX_BYTES
+        )
+        self._caches = {
+            CACHE_PLAYLISTS: self._playlists_cache,
+            CACHE_STEPS: self._steps_cache,
+            CACHE_SCHEDULES: self._schedule_cache,
+        }
+
+        # Server session tracking: ids are only valid for one xSchedule
+        # session, so a known name reporting a new id (or a new version)
+        # means xSchedule restarted or reloaded its show folder
+        self._server_version: str | None = None
+        self._session_ids: dict[tuple[str, str], str] = {}
+        self._active_schedule: Any = _UNSET
+        self._server_sessions = 0
+
+    @property
+    def connection_stats(self) -> dict[str, int]:
+        """Return HTTP connection reuse and WebSocket request counters."""
+        return {
+            "requests": self._requests_total,
+            "connections_new": self._connections_new,
+            "connections_reused": self._connections_reused,
+            "queries_coalesced": self._queries_coalesced,
+            "commands_coalesced": sum(
+                sender.superseded for sender in self._coalesced.values()
+            ),
+            "websocket_requests": self._websocket_requests,
+            "websocket_fallbacks": self._websocket_fallbacks,
+        }
+
+    def attach_websocket(self, websocket: XScheduleWebSocket | None) -> None:
+        """Send queries and commands over this socket while it is connected."""
+        self._websocket = websocket
+
+    @property
+    def cache_stats(self) -> dict[str, dict[str, int]]:
+        """Return hit/miss/refresh statistics for each cache."""
+        return {
+            cache.name: cache.stats
+            for cache in (self._playlists_cache, self._schedule_cache, self._steps_cache)
+        }
 
     async def _get_session(self) -> aiohttp.ClientSession:
         """Get or create aiohttp session."""
@@ -57,6 +220,10 @@ class XScheduleAPIClient:
 
     async def close(self) -> None:
         """Close the API client session."""
+        for cache in (self._playlists_cache, self._schedule_cache, self._steps_cache):
+            cache.cancel_refreshes()
+        for sender in self._coalesced.values():
+            sender.cancel()
         if self._own_session and self._session:
             await self._session.close()
             self._session = None
@@ -67,98 +234,296 @@ class XScheduleAPIClient:
             return hashlib.md5(self.password.encode()).hexdigest()
         return None
 
-    def _is_cache_valid(self, cache_time: float, ttl: int) -> bool:
-        """Check if cache entry is still valid."""
-        import time
-        return (time.time() - cache_time) < ttl
-
     def invalidate_cache(self, playlist_name: str | None = None) -> None:
-        """Invalidate cache for a playlist or all playlists."""
-        if playlist_name:
-            self._schedule_cache.pop(playlist_name, None)
-            self._steps_cache.pop(playlist_name, None)
+        """Invalidate steps and schedules for a playlist or all playlists."""
+        self.invalidate(frozenset({CACHE_STEPS, CACHE_SCHEDULES}), playlist_name)
+
+    def invalidate(
+        self, scope: frozenset[str], playlist_name: str | None = None
+    ) -> None:
+        """Invalidate the named caches, for one playlist or entirely.
+
+        The playlists cache holds a single list, so it is always cleared.
+        """
+        for name in scope:
+            cache = self._caches[name]
+            if playlist_name and name != CACHE_PLAYLISTS:
+                cache.pop(playlist_name)
+            else:
+                cache.clear()
+
+    def observe_status(self, status: dict[str, Any]) -> frozenset[str]:
+        """Invalidate cached data made stale by a playing status update.
+
+        A new server session (restart or show folder change) invalidates
+        everything. A schedule starting or ending invalidates schedules and
+        playlist metadata. Returns the invalidated cache names.
+        """
+        if self._is_new_session(status):
+            _LOGGER.info("xSchedule restart or show folder change detected, clearing caches")
+            self._start_new_session()
+            self.invalidate(CACHE_ALL)
+            self._is_new_session(status)  # record ids for the new session
+            self._active_schedule = (status.get("schedulename"), status.get("scheduleid"))
+            return CACHE_ALL
+
+        schedule = (status.get("schedulename"), status.get("scheduleid"))
+        previous, self._active_schedule = self._active_schedule, schedule
+        if previous is not _UNSET and previous != schedule:
+            _LOGGER.debug("Active schedule changed: %s -> %s", previous, schedule)
+            self.invalidate(SCHEDULE_SCOPE)
+            return SCHEDULE_SCOPE
+        return frozenset()
+
+    @property
+    def server_sessions(self) -> int:
+        """Return the number of xSchedule restarts/reloads detected."""
+        return self._server_sessions
+
+    def _is_new_session(self, status: dict[str, Any]) -> bool:
+        """Record session-scoped ids, returning True if any conflict."""
+        version = status.get("version")
+        if version:
+            if self._server_version is not None and version != self._server_version:
+                return True
+            self._server_version = version
+
+        return any(
+            self._session_id_changed(kind, name, session_id)
+            for kind, name, session_id in (
+                ("playlist", status.get("playlist"), status.get("playlistid")),
+                ("schedule", status.get("schedulename"), status.get("scheduleid")),
+            )
+        )
+
+    def _session_id_changed(
+        self, kind: str, name: str | None, session_id: str | None
+    ) -> bool:
+        """Record the id of a named object, returning True if it changed."""
+        if not name or not session_id:
+            return False
+        return self._session_ids.setdefault((kind, name), session_id) != session_id
+
+    def _start_new_session(self) -> None:
+        """Forget ids and version recorded for the previous server session."""
+        self._server_version = None
+        self._session_ids.clear()
+        self._active_schedule = _UNSET
+        self._server_sessions += 1
+
+    def _build_url(self, prefix: str, name: str, parameters: str = "") -> str:
+        """Build a request URL from a pre-encoded template."""
+        url = prefix + _encode(name)
+        if parameters:
+            url += "&Parameters=" + quote(parameters, safe="")
+        return url + self._auth_suffix
+
+    def _track_connection(self, response: aiohttp.ClientResponse) -> None:
+        """Record whether a response was served over a reused connection."""
+        self._requests_total += 1
+        connection = response.connection
+        protocol = connection.protocol if connection is not None else None
+        if protocol is None:
+            return
+        if protocol in self._seen_connections:
+            self._connections_reused += 1
         else:
-            self._schedule_cache.clear()
-            self._steps_cache.clear()
+            self._seen_connections.add(protocol)
+            self._connections_new += 1
 
-    async def _request(
-        self,
-        endpoint: str,
-        params: dict[str, Any] | None = None,
-        timeout: int = 10,
-    ) -> Any:
-        """Make HTTP request to xSchedule API."""
-        session = await self._get_session()
+    async def _request(self, url: str, timeout: int = 10) -> Any:
+        """Make HTTP request to xSchedule API.
 
-        # Add password if configured
-        if params is None:
-            params = {}
-        if self.password:
-            params["Pass"] = self._get_password_hash()
-
-        # Build URL manually with pre-encoded parameters
-        # We do this because xSchedule requires %20 for spaces, not +
-        # Parameters dict already has pre-encoded values from query()/command()
-        url = f"{self._base_url}/{endpoint}"
-        if params:
-            # Build query string manually to preserve our encoding
-            query_parts = []
-            for key, value in params.items():
-                # Value is already encoded if it came from query()/command()
-                # Don't encode again
-                query_parts.append(f"{key}={value}")
-            url = f"{url}?{'&'.join(query_parts)}"
+        The URL already carries its query string (see _build_url) because
+        xSchedule requires %20 for spaces, which aiohttp's params would not
+        preserve.
+        """
+        session = await self._get_session()
 
         try:
-            async with asyncio.timeout(timeout):
-                # Don't pass params - URL already has query string
-                async with session.get(url) as response:
+            async with self._request_slots:
+                # Time spent waiting for a slot doesn't count against the
+                # request's own timeout
+                async with asyncio.timeout(timeout), session.get(url) as response:
+                    self._track_connection(response)
                     response.raise_for_status()
-                    data = await response.json()
-
-                    # Check for authentication error
-                    if isinstance(data, dict) and data.get("result") == "failed":
-                        if "password" in data.get("message", "").lower():
-                            raise XScheduleAuthError("Authentication failed")
-
-                    return data
+                    return self._check_auth(await response.json(loads=loads))
         except aiohttp.ClientError as err:
-            _LOGGER.error("Error connecting to xSchedule at %s: %s", url, err)
+            _LOGGER.error("Error connecting to xSchedule at %s: %s", self._base_url, err)
             raise XScheduleConnectionError(f"Connection failed: {err}") from err
         except asyncio.TimeoutError as err:
-            _LOGGER.error("Timeout connecting to xSchedule at %s", url)
+            _LOGGER.error("Timeout connecting to xSchedule at %s", self._base_url)
             raise XScheduleConnectionError("Connection timeout") from err
 
+    @staticmethod
+    def _check_auth(data: Any) -> Any:
+        """Raise XScheduleAuthError if a response reports a password failure."""
+        if isinstance(data, dict) and data.get("result") == "failed":
+            if "password" in data.get("message", "").lower():
+                raise XScheduleAuthError("Authentication failed")
+        return data
+
+    @staticmethod
+    def _not_understood(result: Any) -> bool:
+        """Return True if xSchedule couldn't parse a WebSocket request.
+
+        Such a request was not run, so it is safe to send it over REST.
+        """
+        return (
+            isinstance(result, dict)
+            and result.get("result") == "failed"
+            and result.get("message") == "Empty request."
+        )
+
+    def _websocket_ready(self) -> XScheduleWebSocket | None:
+        """Return the attached WebSocket if it is connected and healthy."""
+        websocket = self._websocket
+        if (
+            websocket is not None
+            and websocket.connected
+            and time.monotonic() >= self._websocket_retry_at
+        ):
+            return websocket
+        return None
+
+    def _websocket_failed(self, name: str, err: Exception) -> None:
+        """Send requests over REST for a while after a WebSocket failure."""
+        self._websocket_fallbacks += 1
+        self._websocket_retry_at = time.monotonic() + WS_FALLBACK_COOLDOWN
+        _LOGGER.debug("WebSocket request %s failed, using REST: %s", name, err)
+
+    async def _send_query(self, query_name: str, parameters: str) -> Any:
+        """Run a query over the WebSocket, or REST if that isn't possible.
+
+        Queries have no side effects, so any WebSocket failure (including a
+        timeout) is retried over REST.
+        """
+        if websocket := self._websocket_ready():
+            try:
+                result = await websocket.async_query(query_name, parameters)
+            except XScheduleConnectionError as err:
+                self._websocket_failed(query_name, err)
+            else:
+                if not self._not_understood(result):
+                    self._websocket_requests += 1
+                    return self._check_auth(result)
+                self._websocket_fallbacks += 1
+
+        return await self._request(self._build_url(self._query_url, query_name, parameters))
+
+    async def _send_command(self, command_name: str, parameters: str) -> Any:
+        """Run a command over the WebSocket, or REST if it wasn't run.
+
+        A command that was sent but not answered may have run, so a timeout
+        is raised rather than repeating it over REST.
+        """
+        if websocket := self._websocket_ready():
+            try:
+                result = await websocket.async_command(command_name, parameters)
+            except XScheduleRequestTimeout as err:
+                self._websocket_failed(command_name, err)
+                raise
+            except XScheduleConnectionError as err:
+                self._websocket_failed(command_name, err)
+            else:
+                if not self._not_understood(result):
+                    self._websocket_requests += 1
+                    return self._check_auth(result)
+                self._websocket_fallbacks += 1
+
+        return await self._request(
+            self._build_url(self._command_url, command_name, parameters)
+        )
+
     async def query(self, query_name: str, parameters: str = "") -> Any:
-        """Execute a query against xSchedule API."""
-        params = {"Query": query_name}
-        if parameters:
-            # Manually encode parameters to use %20 instead of + for spaces
-            # xSchedule doesn't accept + as space encoding
-            params["Parameters"] = quote(parameters, safe='')
+        """Execute a query against xSchedule API.
+
+        Queries go over the attached WebSocket when it is connected.
+
+        Identical (query, parameters) requests that arrive while one is in
+        flight share its HTTP round trip. GetPlayingStatus replies are also
+        reused for STATUS_MICRO_CACHE_TTL to absorb bursts.
+        """
+        if query_name == "GetPlayingStatus" and self._status_micro_cache:
+            cached_at, cached_status = self._status_micro_cache
+            if time.monotonic() - cached_at < STATUS_MICRO_CACHE_TTL:
+                self._queries_coalesced += 1
+                return cached_status
+
+        key = (query_name, parameters)
+        task = self._inflight.get(key)
+        if task is None:
+            _LOGGER.debug("Executing query: %s with params: %s", query_name, parameters)
+            task = asyncio.ensure_future(self._send_query(query_name, parameters))
+            self._inflight[key] = task
+            task.add_done_callback(
+                partial(self._query_done, key, self._status_generation)
+            )
+        else:
+            _LOGGER.debug("Joining in-flight query: %s with params: %s", query_name, parameters)
+            self._queries_coalesced += 1
+
+        # Shield so a cancelled caller doesn't cancel the request for the others
+        return await asyncio.shield(task)
 
-        _LOGGER.debug("Executing query: %s with params: %s", query_name, parameters)
-        return await self._request(API_QUERY, params)
+    def _query_done(
+        self, key: tuple[str, str], generation: int, task: asyncio.Task
+    ) -> None:
+        """Release a finished in-flight query."""
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if task.cancelled():
+            return
+        # Retrieve the exception so it isn't reported as never retrieved when
+        # every waiter was cancelled
+        if (
+            task.exception() is None
+            and key[0] == "GetPlayingStatus"
+            and generation == self._status_generation
+        ):
+            self._status_micro_cache = (time.monotonic(), task.result())
 
     async def command(self, command_name: str, parameters: str = "") -> Any:
         """Execute a command against xSchedule API."""
-        # Manually encode command name to use %20 instead of + for spaces
-        # xSchedule doesn't accept + as space encoding
-        params = {"Command": quote(command_name, safe='')}
-        if parameters:
-            # Manually encode parameters to use %20 instead of + for spaces
-            params["Parameters"] = quote(parameters, safe='')
-
+        # Any command can change playing status
+        self._status_micro_cache = None
+        self._status_generation += 1
         _LOGGER.debug("Executing command: %s with params: %s", command_name, parameters)
-        result = await self._request(API_COMMAND, params)
+        if command_name in COALESCED_COMMANDS:
+            result = await self._coalesced_sender(command_name).async_send(parameters)
+        else:
+            result = await self._send_command(command_name, parameters)
         _LOGGER.debug("Command response: %s", result)
         
         # Check if command failed
         if isinstance(result, dict) and result.get("result") == "failed":
             _LOGGER.warning("Command '%s' failed: %s", command_name, result.get("message", "Unknown error"))
-        
+        else:
+            self.apply_command_invalidation(command_name)
+
         return result
 
+    def _coalesced_sender(self, command_name: str) -> LatestValueSender:
+        """Return the rate-limited, latest-value-wins sender for a command."""
+        sender = self._coalesced.get(command_name)
+        if sender is None:
+            sender = self._coalesced[command_name] = LatestValueSender(
+                command_name,
+                partial(self._send_command, command_name),
+                TokenBucket(COALESCE_RATE, COALESCE_BURST),
+            )
+        return sender
+
+    def apply_command_invalidation(self, command_name: str) -> None:
+        """Invalidate the cached data a successful command can change."""
+        scope = COMMAND_INVALIDATES.get(command_name)
+        if not scope:
+            return
+        _LOGGER.debug("Command '%s' invalidates %s", command_name, sorted(scope))
+        if command_name == "Change show folder":
+            self._start_new_session()
+        self.invalidate(scope)
+
     # Status and information queries
 
     async def get_playing_status(self) -> dict[str, Any]:
@@ -179,62 +544,62 @@ class XScheduleAPIClient:
 
     async def get_playlists_with_metadata(self, force_refresh: bool = False) -> list[dict[str, Any]]:
         """Get full playlist objects with all metadata (duration, loop status, etc.)."""
-        import time
-
-        # Force refresh: invalidate cache first
         if force_refresh:
             _LOGGER.debug("Force refresh requested for playlists metadata")
-            self._playlists_cache = {}
-            self._playlists_cache_time = 0
 
-        # Check cache first (same cache as get_playlists, 5 min TTL)
-        if self._playlists_cache_time and (time.time() - self._playlists_cache_time < 300):
-            if "metadata" in self._playlists_cache:
-                _LOGGER.debug("Using cached playlists metadata")
-                return self._playlists_cache["metadata"]
+        async def fetch() -> list[dict[str, Any]] | None:
+            result = await self.query("GetPlaylists")
+            # API returns dict with 'playlists' key containing list of playlist objects
+            if isinstance(result, dict) and "playlists" in result:
+                playlists = result["playlists"]
+                if playlists and isinstance(playlists[0], dict):
+                    self._observe_playlist_ids(playlists)
+                    return playlists
+            return None
 
         try:
-            result = await self.query("GetPlaylists")
+            playlists = await self._playlists_cache.async_get("metadata", fetch, force_refresh)
         except XScheduleAPIError as err:
             _LOGGER.error("Failed to get playlists metadata: %s", err)
             return []
-
-        # API returns dict with 'playlists' key containing list of playlist objects
-        if isinstance(result, dict) and "playlists" in result:
-            playlists = result["playlists"]
-            if playlists and isinstance(playlists[0], dict):
-                # Cache full playlist objects
-                self._playlists_cache["metadata"] = playlists
-                self._playlists_cache_time = time.time()
-                return playlists
-        return []
+        return playlists or []
+
+    def _observe_playlist_ids(self, playlists: list[dict[str, Any]]) -> None:
+        """Detect a new server session from GetPlayLists ids.
+
+        The playlist list itself is being refreshed, so only steps and
+        schedules are invalidated.
+        """
+        if any(
+            self._session_id_changed("playlist", playlist.get("name"), playlist.get("id"))
+            for playlist in playlists
+        ):
+            _LOGGER.info("xSchedule playlist ids changed, clearing steps and schedules")
+            self._start_new_session()
+            self.invalidate_cache()
+            for playlist in playlists:
+                self._session_id_changed("playlist", playlist.get("name"), playlist.get("id"))
 
     async def get_playlist_steps(self, playlist_name: str, force_refresh: bool = False) -> list[dict[str, Any]]:
-        """Get list of steps/songs in a playlist (with 3 min caching)."""
-        import time
+        """Get list of steps/songs in a playlist (cached, refreshed after 3 min).
 
-        # Force refresh: invalidate cache first
+        Raises XScheduleResponseError if the reply has no steps list, so a
+        malformed reply can't pass for an empty playlist.
+        """
         if force_refresh:
             _LOGGER.debug("Force refresh requested for steps: '%s'", playlist_name)
-            self._steps_cache.pop(playlist_name, None)
-
-        # Check cache first
-        if playlist_name in self._steps_cache:
-            cached_steps, cache_time = self._steps_cache[playlist_name]
-            if self._is_cache_valid(cache_time, self._steps_cache_ttl):
-                _LOGGER.debug("Using cached steps for '%s'", playlist_name)
-                return cached_steps
-
-        # Cache miss or expired - fetch from API
-        _LOGGER.debug("Fetching steps for playlist: '%s'", playlist_name)
-        result = await self.query("GetPlayListSteps", playlist_name)
-        # API returns dict with 'steps' key containing list
-        if isinstance(result, dict) and "steps" in result:
-            steps = result["steps"]
-            # Store in cache with current timestamp
-            self._steps_cache[playlist_name] = (steps, time.time())
-            return steps
-        return []
+
+        async def fetch() -> list[dict[str, Any]]:
+            _LOGGER.debug("Fetching steps for playlist: '%s'", playlist_name)
+            result = await self.query("GetPlayListSteps", playlist_name)
+            # API returns dict with 'steps' key containing list
+            if isinstance(result, dict) and isinstance(result.get("steps"), list):
+                return result["steps"]
+            raise XScheduleResponseError(
+                f"Malformed GetPlayListSteps reply for '{playlist_name}': {result!r:.100}"
+            )
+
+        return await self._steps_cache.async_get(playlist_name, fetch, force_refresh)
 
     async def get_queued_steps(self) -> list[dict[str, Any]]:
         """Get list of queued steps."""
@@ -244,85 +609,58 @@ class XScheduleAPIClient:
         return []
 
     async def get_playlist_schedules(self, playlist_name: str, force_refresh: bool = False) -> list[dict[str, Any]]:
-        """Get schedule information for a playlist (with 5 min caching)."""
-        import time
-
-        # Force refresh: invalidate cache first
+        """Get schedule information for a playlist (cached, refreshed after 5 min)."""
         if force_refresh:
             _LOGGER.debug("Force refresh requested for schedules: '%s'", playlist_name)
-            self._schedule_cache.pop(playlist_name, None)
-
-        # Check cache first
-        if playlist_name in self._schedule_cache:
-            cached_schedules, cache_time = self._schedule_cache[playlist_name]
-            if self._is_cache_valid(cache_time, self._schedule_cache_ttl):
-                _LOGGER.debug("Using cached schedules for '%s'", playlist_name)
-                return cached_schedules
-
-        # Cache miss or expired - fetch from API
-        _LOGGER.debug("Fetching schedules for playlist: '%s'", playlist_name)
-        result = await self.query("GetPlayListSchedules", playlist_name)
-        if isinstance(result, dict) and "schedules" in result:
-            schedules = result["schedules"]
-            # Store in cache with current timestamp
-            self._schedule_cache[playlist_name] = (schedules, time.time())
-            _LOGGER.debug("Found %d schedules for '%s'", len(schedules), playlist_name)
-            return schedules
-        _LOGGER.debug("No schedules found for '%s'", playlist_name)
-        return []
+
+        async def fetch() -> list[dict[str, Any]] | None:
+            _LOGGER.debug("Fetching schedules for playlist: '%s'", playlist_name)
+            result = await self.query("GetPlayListSchedules", playlist_name)
+            if isinstance(result, dict) and "schedules" in result:
+                _LOGGER.debug("Found %d schedules for '%s'", len(result["schedules"]), playlist_name)
+                return result["schedules"]
+            _LOGGER.debug("No schedules found for '%s'", playlist_name)
+            return None
+
+        schedules = await self._schedule_cache.async_get(playlist_name, fetch, force_refresh)
+        return schedules or []
 
     # Playback control commands
 
     async def play_playlist(self, playlist_name: str) -> dict[str, Any]:
         """Play specified playlist."""
-        result = await self.command("Play specified playlist", playlist_name)
-        self.invalidate_cache(playlist_name)
-        return result
+        return await self.command("Play specified playlist", playlist_name)
 
     async def pause(self) -> dict[str, Any]:
         """Pause playback."""
-        result = await self.command("Pause")
-        self.invalidate_cache()
-        return result
+        return await self.command("Pause")
 
     async def stop(self) -> dict[str, Any]:
         """Stop playback."""
-        result = await self.command("Stop")
-        self.invalidate_cache()
-        return result
+        return await self.command("Stop")
 
     async def stop_all_now(self) -> dict[str, Any]:
         """Stop all playlists, schedules, and empty the queue."""
-        result = await self.command("Stop all now")
-        self.invalidate_cache()
-        return result
+        return await self.command("Stop all now")
 
     async def next_step(self) -> dict[str, Any]:
         """Go to next step in current playlist."""
-        result = await self.command("Next step in current playlist")
-        self.invalidate_cache()
-        return result
+        return await self.command("Next step in current playlist")
 
     async def previous_step(self) -> dict[str, Any]:
         """Go to previous step in current playlist."""
-        result = await self.command("Prior step in current playlist")
-        self.invalidate_cache()
-        return result
+        return await self.command("Prior step in current playlist")
 
     async def restart_step(self) -> dict[str, Any]:
         """Restart current step."""
-        result = await self.command("Restart step in current playlist")
-        self.invalidate_cache()
-        return result
+        return await self.command("Restart step in current playlist")
 
     async def play_playlist_step(
         self, playlist_name: str, step_name: str
     ) -> dict[str, Any]:
         """Play specific step in a playlist."""
         params = f"{playlist_name},{step_name}"
-        result = await self.command("Play playlist step", params)
-        self.invalidate_cache(playlist_name)
-        return result
+        return await self.command("Play playlist step", params)
 
     async def set_step_position(self, position_ms: int) -> dict[str, Any]:
         """Set playback position in current step (seek)."""
@@ -349,24 +687,18 @@ class XScheduleAPIClient:
     ) -> dict[str, Any]:
         """Add a step to the queue."""
         params = f"{playlist_name},{step_name}"
-        result = await self.command("Enqueue playlist step", params)
-        self.invalidate_cache()
-        return result
+        return await self.command("Enqueue playlist step", params)
 
     async def clear_queue(self) -> dict[str, Any]:
         """Clear the playlist queue."""
-        result = await self.command("Clear playlist queue")
-        self.invalidate_cache()
-        return result
+        return await self.command("Clear playlist queue")
 
     async def jump_to_step_at_end(self, step_name: str) -> dict[str, Any]:
         """Jump to specified step in current playlist at end of current step."""
-        result = await self.command(
+        return await self.command(
             "Jump to specified step in current playlist at the end of current step",
             step_name
         )
-        self.invalidate_cache()
-        return result
 
     # Validation and testing
 
@@ -14,7 +14,9 @@ from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.device_registry import DeviceInfo
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
-from .const import DOMAIN
+from .const import DOMAIN, WS_TOPIC_PINGSTATUS
+from .hub import XScheduleHub
+from .status import ControllerStatus
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -45,19 +47,9 @@ async def async_setup_entry(
     """Set up xSchedule controller health binary sensors."""
     _LOGGER.debug("Binary sensor platform setup starting for entry %s", config_entry.entry_id)
 
-    # Get the media player entity from hass.data where it was stored during setup
-    if DOMAIN not in hass.data or "entities" not in hass.data[DOMAIN]:
-        _LOGGER.warning("xSchedule domain data not initialized, cannot create controller sensors")
-        return
-
-    media_player_entity = hass.data[DOMAIN]["entities"].get(config_entry.entry_id)
-
-    if not media_player_entity:
-        _LOGGER.warning("xSchedule media player entity not found for config entry %s", config_entry.entry_id)
-        return
-
-    if not hasattr(media_player_entity, "_controller_status"):
-        _LOGGER.warning("xSchedule media player has no _controller_status attribute")
+    hub: XScheduleHub | None = getattr(config_entry, "runtime_data", None)
+    if hub is None:
+        _LOGGER.warning("xSchedule hub not found for config entry %s", config_entry.entry_id)
         return
 
     # Initialize sensor registry in hass.data for tracking
@@ -67,82 +59,76 @@ async def async_setup_entry(
     sensor_registry = hass.data[SENSOR_REGISTRY_KEY]
 
     # If controller status is empty, try to fetch it
-    if not media_player_entity._controller_status:
-        _LOGGER.info("Controller status empty on setup, triggering media player update")
+    if not hub.controllers:
+        _LOGGER.info("Controller status empty on setup, fetching status")
         try:
-            await media_player_entity.async_update()
+            await hub.async_refresh_status()
         except Exception as err:
-            _LOGGER.error("Failed to update media player for controller status: %s", err)
+            _LOGGER.error("Failed to fetch status for controller status: %s", err)
 
-    _LOGGER.debug("Found %d controllers in media player", len(media_player_entity._controller_status))
+    _LOGGER.debug("Found %d controllers", len(hub.controllers))
 
     # Create a binary sensor for each controller
     sensors = []
-    for controller_data in media_player_entity._controller_status:
-        if "controller" in controller_data and "ip" in controller_data:
-            controller_name = controller_data["controller"]
-            unique_id = f"{DOMAIN}_{config_entry.entry_id}_controller_{controller_name}"
-
-            # Check if sensor already exists in registry
-            if unique_id in sensor_registry:
-                _LOGGER.debug("Sensor %s already exists, skipping", unique_id)
-                continue
-
-            sensor = XScheduleControllerSensor(
-                config_entry,
-                controller_data,
-            )
-            sensors.append(sensor)
-            sensor_registry[unique_id] = sensor
-            _LOGGER.debug("Created sensor for controller: %s", controller_name)
+    for controller in hub.controllers:
+        if not controller.controller or not controller.ip:
+            continue
+        unique_id = f"{DOMAIN}_{config_entry.entry_id}_controller_{controller.controller}"
+
+        # Check if sensor already exists in registry
+        if unique_id in sensor_registry:
+            _LOGGER.debug("Sensor %s already exists, skipping", unique_id)
+            continue
+
+        sensor = XScheduleControllerSensor(
+            config_entry,
+            controller.as_dict(),
+        )
+        sensors.append(sensor)
+        sensor_registry[unique_id] = sensor
+        _LOGGER.debug("Created sensor for controller: %s", controller.controller)
 
     if sensors:
         async_add_entities(sensors, True)
         _LOGGER.info("Created %d controller health sensors", len(sensors))
     else:
         _LOGGER.warning("No controller sensors created (found %d controllers)",
-                       len(media_player_entity._controller_status))
+                       len(hub.controllers))
 
-    # Listen for controller status updates
+    # Follow controller changes straight from the WebSocket (statuses polled
+    # over REST while it is down are routed through it too)
     @callback
-    def handle_controller_update(event):
-        """Handle controller status update events."""
-        if event.data.get("entry_id") != config_entry.entry_id:
-            return
+    def handle_controller_update(changed: tuple[ControllerStatus, ...]) -> None:
+        """Update or create sensors for the controllers that changed."""
+        _LOGGER.debug("Controller status changed for %d controllers", len(changed))
 
-        controllers = event.data.get("controllers", [])
-        _LOGGER.debug("Controller status update event received with %d controllers", len(controllers))
-
-        # Update existing sensors or create new ones
         new_sensors = []
-        for controller_data in controllers:
-            if "controller" in controller_data and "ip" in controller_data:
-                controller_name = controller_data["controller"]
-                unique_id = f"{DOMAIN}_{config_entry.entry_id}_controller_{controller_name}"
-
-                if unique_id in sensor_registry:
-                    # Update existing sensor
-                    sensor_registry[unique_id].update_from_data(controller_data)
-                    _LOGGER.debug("Updated existing sensor: %s", controller_name)
-                else:
-                    # Create new sensor
-                    new_sensor = XScheduleControllerSensor(
-                        config_entry,
-                        controller_data,
-                    )
-                    new_sensors.append(new_sensor)
-                    sensor_registry[unique_id] = new_sensor
-                    _LOGGER.info("Creating new sensor for controller: %s", controller_name)
+        for controller in changed:
+            controller_data = controller.as_dict()
+            unique_id = f"{DOMAIN}_{config_entry.entry_id}_controller_{controller.controller}"
+
+            if unique_id in sensor_registry:
+                # Update existing sensor
+                sensor_registry[unique_id].update_from_data(controller_data)
+                _LOGGER.debug("Updated existing sensor: %s", controller.controller)
+            else:
+                # Create new sensor
+                new_sensor = XScheduleControllerSensor(
+                    config_entry,
+                    controller_data,
+                )
+                new_sensors.append(new_sensor)
+                sensor_registry[unique_id] = new_sensor
+                _LOGGER.info("Creating new sensor for controller: %s", controller.controller)
 
         if new_sensors:
             async_add_entities(new_sensors, True)
             _LOGGER.info("Added %d new controller health sensors", len(new_sensors))
 
-    hass.bus.async_listen(
-        f"{DOMAIN}_controller_status_update",
-        handle_controller_update,
+    config_entry.async_on_unload(
+        hub.websocket.subscribe(WS_TOPIC_PINGSTATUS, handle_controller_update)
     )
-    _LOGGER.debug("Binary sensor platform setup completed, event listener registered")
+    _LOGGER.debug("Binary sensor platform setup completed, subscribed to controller updates")
 
 
 class XScheduleControllerSensor(BinarySensorEntity):
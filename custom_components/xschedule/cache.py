@@ -0,0 +1,216 @@
+"""Stale-while-revalidate cache for xSchedule API data."""
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from typing import Any
+
+_LOGGER = logging.getLogger(__name__)
+
+
+@dataclass(slots=True)
+class CacheEntry:
+    """A cached value with its fetch time and approximate size."""
+
+    value: Any
+    fetched_at: float
+    size: int
+
+
+def _estimate_size(value: Any) -> int:
+    """Return the approximate JSON size of a value in bytes, without encoding it."""
+    if isinstance(value, str):
+        return len(value) + 2
+    if isinstance(value, dict):
+        return 2 + sum(
+            _estimate_size(key) + _estimate_size(item) + 2 for key, item in value.items()
+        )
+    if isinstance(value, (list, tuple)):
+        return 2 + sum(_estimate_size(item) + 1 for item in value)
+    return 8
+
+
+class XScheduleCache:
+    """LRU cache that serves stale entries while refreshing them.
+
+    Reads never block on an expired entry: the stale value is returned
+    immediately and a single background refresh is started for that key.
+    Memory is bounded by entry count and total payload size, evicting the
+    least recently used entries first.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        ttl: float,
+        max_entries: int,
+        max_bytes: int,
+    ) -> None:
+        """Initialize the cache."""
+        self.name = name
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[str, CacheEntry] = OrderedDict()
+        self._total_bytes = 0
+        self._refreshing: dict[str, asyncio.Task] = {}
+        # Token of the latest foreground fetch per key; invalidation drops it
+        self._loading: dict[str, object] = {}
+        self._hits = 0
+        self._stale_hits = 0
+        self._misses = 0
+        self._refreshes = 0
+        self._refresh_errors = 0
+        self._evictions = 0
+
+    def __contains__(self, key: str) -> bool:
+        """Return True if a value (fresh or stale) is cached for key."""
+        return key in self._entries
+
+    def __len__(self) -> int:
+        """Return the number of cached entries."""
+        return len(self._entries)
+
+    @property
+    def stats(self) -> dict[str, int]:
+        """Return cache statistics."""
+        return {
+            "entries": len(self._entries),
+            "bytes": self._total_bytes,
+            "hits": self._hits,
+            "stale_hits": self._stale_hits,
+            "misses": self._misses,
+            "refreshes": self._refreshes,
+            "refresh_errors": self._refresh_errors,
+            "evictions": self._evictions,
+        }
+
+    def is_fresh(self, key: str) -> bool:
+        """Return True if key is cached and within its TTL."""
+        entry = self._entries.get(key)
+        return entry is not None and time.monotonic() - entry.fetched_at < self.ttl
+
+    def peek(self, key: str) -> Any | None:
+        """Return the cached value for key without touching LRU order or stats."""
+        entry = self._entries.get(key)
+        return entry.value if entry is not None else None
+
+    def set(self, key: str, value: Any) -> None:
+        """Store a value and evict least recently used entries over budget."""
+        self._remove(key)
+        entry = CacheEntry(value, time.monotonic(), _estimate_size(value))
+        self._entries[key] = entry
+        self._total_bytes += entry.size
+
+        while len(self._entries) > 1 and (
+            len(self._entries) > self.max_entries
+            or self._total_bytes > self.max_bytes
+        ):
+            evicted_key, evicted = self._entries.popitem(last=False)
+            self._total_bytes -= evicted.size
+            self._evictions += 1
+            _LOGGER.debug("Evicted '%s' from %s cache", evicted_key, self.name)
+
+    def _remove(self, key: str) -> None:
+        """Remove an entry and release its size from the budget."""
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._total_bytes -= entry.size
+
+    def pop(self, key: str) -> None:
+        """Invalidate a single entry.
+
+        A background refresh in flight for the key is cancelled, and a
+        foreground fetch in flight won't be stored, so neither can store
+        data fetched before the invalidation.
+        """
+        self._remove(key)
+        self._loading.pop(key, None)
+        task = self._refreshing.pop(key, None)
+        if task is not None:
+            task.cancel()
+
+    def clear(self) -> None:
+        """Invalidate every entry."""
+        self._entries.clear()
+        self._total_bytes = 0
+        self._loading.clear()
+        self.cancel_refreshes()
+
+    async def async_get(
+        self,
+        key: str,
+        fetch: Callable[[], Awaitable[Any]],
+        force_refresh: bool = False,
+    ) -> Any | None:
+        """Return the value for key, fetching it on a miss.
+
+        Fresh entries are returned directly. Stale entries are returned
+        directly and refreshed in the background. A fetch result of None, or
+        one the key was invalidated during, is returned but not cached.
+        """
+        entry = None if force_refresh else self._entries.get(key)
+
+        if entry is not None:
+            self._entries.move_to_end(key)
+            if time.monotonic() - entry.fetched_at < self.ttl:
+                self._hits += 1
+            else:
+                self._stale_hits += 1
+                self._schedule_refresh(key, fetch)
+            return entry.value
+
+        self._misses += 1
+        token = self._loading[key] = object()
+        try:
+            value = await fetch()
+        finally:
+            current = self._loading.get(key) is token
+            if current:
+                del self._loading[key]
+        if value is not None and current:
+            self.set(key, value)
+        return value
+
+    def _schedule_refresh(
+        self, key: str, fetch: Callable[[], Awaitable[Any]]
+    ) -> None:
+        """Start a background refresh for key unless one is running."""
+        if key in self._refreshing:
+            return
+        _LOGGER.debug("Serving stale '%s' from %s cache, refreshing", key, self.name)
+        task = asyncio.ensure_future(self._refresh(key, fetch))
+        self._refreshing[key] = task
+        task.add_done_callback(lambda done: self._refresh_done(key, done))
+
+    def _refresh_done(self, key: str, task: asyncio.Task) -> None:
+        """Forget a finished refresh task."""
+        if self._refreshing.get(key) is task:
+            del self._refreshing[key]
+
+    async def _refresh(self, key: str, fetch: Callable[[], Awaitable[Any]]) -> None:
+        """Fetch a fresh value for key, keeping the stale one on failure."""
+        try:
+            value = await fetch()
+        except Exception as err:  # pylint: disable=broad-except
+            self._refresh_errors += 1
+            _LOGGER.debug("Background refresh of '%s' failed: %s", key, err)
+            return
+        self._refreshes += 1
+        if value is not None:
+            self.set(key, value)
+
+    async def async_wait_refreshes(self) -> None:
+        """Wait for background refreshes currently in flight."""
+        if self._refreshing:
+            await asyncio.gather(*self._refreshing.values(), return_exceptions=True)
+
+    def cancel_refreshes(self) -> None:
+        """Cancel background refreshes (used on shutdown)."""
+        for task in self._refreshing.values():
+            task.cancel()
+        self._refreshing.clear()
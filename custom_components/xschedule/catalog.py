@@ -0,0 +1,398 @@
+"""Playlist catalog for xSchedule: playlists, steps and schedules."""
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import logging
+import re
+import time
+from dataclasses import dataclass, field, replace
+from typing import Any
+
+from homeassistant.helpers.storage import Store
+
+from .api_client import XScheduleAPIClient, XScheduleAPIError
+from .const import CATALOG_SAVE_DELAY, DEFAULT_CATALOG_CONCURRENCY
+
+_LOGGER = logging.getLogger(__name__)
+
+# nextactive values that are real dates, not "A long time from now"/"N/A"
+_NEXT_ACTIVE_DATE = re.compile(r"\d{4}-\d{2}-\d{2}")
+
+
+def _duration_ms(item: dict[str, Any]) -> int:
+    """Return an xSchedule lengthms field as int milliseconds."""
+    try:
+        return int(item.get("lengthms") or 0)
+    except (TypeError, ValueError):
+        return 0
+
+
+def best_schedule(schedules: list[dict[str, Any]] | None) -> dict[str, Any] | None:
+    """Return the schedule to show for a playlist.
+
+    The active schedule if there is one, otherwise the soonest upcoming
+    one, otherwise the first.
+    """
+    if not schedules:
+        return None
+    for schedule in schedules:
+        if schedule.get("active") == "TRUE" or schedule.get("nextactive") == "NOW!":
+            return schedule
+    upcoming = [
+        schedule
+        for schedule in schedules
+        if _NEXT_ACTIVE_DATE.search(schedule.get("nextactive") or "")
+    ]
+    if upcoming:
+        # "YYYY-MM-DD HH:MM:SS" sorts chronologically as a string
+        return min(upcoming, key=lambda schedule: schedule["nextactive"])
+    return schedules[0]
+
+
+class StepCatalog:
+    """One playlist's steps, indexed once for lookups by name.
+
+    Rebuilt whenever the step list is replaced, so state writes and queue
+    operations look songs up in O(1) instead of scanning the list.
+    """
+
+    __slots__ = ("steps", "durations", "songs", "_by_name")
+
+    def __init__(self, steps: list[dict[str, Any]] | None = None) -> None:
+        """Index steps (GetPlayListSteps format)."""
+        self.steps: list[dict[str, Any]] = steps or []
+        self.durations = tuple(_duration_ms(step) for step in self.steps)
+        # playlist_songs attribute, built once rather than per state write
+        self.songs = [
+            {"name": step.get("name"), "duration": duration}
+            for step, duration in zip(self.steps, self.durations)
+        ]
+        # The first step wins when a name repeats, as a scan would find it
+        self._by_name: dict[str, int] = {}
+        for index, step in enumerate(self.steps):
+            self._by_name.setdefault(step.get("name"), index)
+
+    def __bool__(self) -> bool:
+        """Return True if there are any steps."""
+        return bool(self.steps)
+
+    def __contains__(self, name: object) -> bool:
+        """Return True if a step has this name."""
+        return name in self._by_name
+
+    def index(self, name: str | None) -> int | None:
+        """Return the 0-based position of the named step."""
+        return self._by_name.get(name)
+
+    def get(self, name: str | None) -> dict[str, Any] | None:
+        """Return the named step."""
+        index = self._by_name.get(name)
+        return None if index is None else self.steps[index]
+
+    def duration(self, name: str | None) -> int:
+        """Return the named step's length in milliseconds, 0 if unknown."""
+        index = self._by_name.get(name)
+        return 0 if index is None else self.durations[index]
+
+
+@dataclass(frozen=True, slots=True)
+class PlaylistEntry:
+    """One playlist in the catalog.
+
+    steps/schedules are None until they have been loaded.
+    """
+
+    name: str
+    metadata: dict[str, Any] = field(default_factory=dict)
+    steps: list[dict[str, Any]] | None = None
+    schedules: list[dict[str, Any]] | None = None
+
+
+@dataclass(frozen=True, slots=True)
+class CatalogSnapshot:
+    """Immutable view of every playlist, in xSchedule's order."""
+
+    playlists: dict[str, PlaylistEntry] = field(default_factory=dict)
+    loaded_at: float | None = None
+
+    @property
+    def names(self) -> list[str]:
+        """Return playlist names."""
+        return list(self.playlists)
+
+    @property
+    def metadata(self) -> list[dict[str, Any]]:
+        """Return playlist metadata objects as returned by GetPlayLists."""
+        return [entry.metadata for entry in self.playlists.values() if entry.metadata]
+
+    def get(self, name: str) -> PlaylistEntry | None:
+        """Return the entry for a playlist."""
+        return self.playlists.get(name)
+
+    def with_entry(self, entry: PlaylistEntry) -> CatalogSnapshot:
+        """Return a copy with one playlist entry added or replaced."""
+        playlists = dict(self.playlists)
+        playlists[entry.name] = entry
+        return replace(self, playlists=playlists)
+
+    def as_response(self) -> dict[str, Any]:
+        """Return the snapshot as the get_catalog service response.
+
+        Durations are in milliseconds, steps use the playlist_songs
+        attribute format and each playlist carries its best_schedule.
+        """
+        return {
+            "loaded_at": self.loaded_at,
+            "playlists": [
+                {
+                    "name": entry.name,
+                    "duration": _duration_ms(entry.metadata),
+                    "steps": None
+                    if entry.steps is None
+                    else [
+                        {"name": step.get("name", ""), "duration": _duration_ms(step)}
+                        for step in entry.steps
+                    ],
+                    "schedule": best_schedule(entry.schedules),
+                }
+                for entry in self.playlists.values()
+            ],
+        }
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the snapshot in its storage format."""
+        return {
+            "loaded_at": self.loaded_at,
+            "playlists": [
+                {
+                    "name": entry.name,
+                    "metadata": entry.metadata,
+                    "steps": entry.steps,
+                    "schedules": entry.schedules,
+                }
+                for entry in self.playlists.values()
+            ],
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> CatalogSnapshot:
+        """Build a snapshot from its storage format, skipping malformed entries."""
+        playlists: dict[str, PlaylistEntry] = {}
+        for item in data.get("playlists") or []:
+            if not isinstance(item, dict) or not item.get("name"):
+                continue
+            steps = item.get("steps")
+            schedules = item.get("schedules")
+            playlists[item["name"]] = PlaylistEntry(
+                item["name"],
+                item.get("metadata") if isinstance(item.get("metadata"), dict) else {},
+                steps if isinstance(steps, list) else None,
+                schedules if isinstance(schedules, list) else None,
+            )
+        return cls(playlists, data.get("loaded_at"))
+
+
+class XScheduleCatalog:
+    """Loads and serves the playlist catalog.
+
+    A full load fetches GetPlayLists and then the steps and schedules of
+    every playlist with bounded parallelism, the currently playing playlist
+    first. Reads go through the API client's cache and are mirrored into
+    the snapshot, which is used as the fallback when xSchedule is
+    unreachable.
+
+    With a store, the snapshot survives restarts: it is restored before
+    the entity is added and saved (debounced) whenever it changes.
+    """
+
+    def __init__(
+        self,
+        api_client: XScheduleAPIClient,
+        concurrency: int = DEFAULT_CATALOG_CONCURRENCY,
+        store: Store | None = None,
+    ) -> None:
+        """Initialize the catalog."""
+        self._api_client = api_client
+        self._concurrency = max(1, concurrency)
+        self._store = store
+        self._snapshot = CatalogSnapshot()
+        self._load_task: asyncio.Task | None = None
+        self._load_forced = False  # whether _load_task bypasses the cache
+
+    @property
+    def snapshot(self) -> CatalogSnapshot:
+        """Return the current catalog snapshot."""
+        return self._snapshot
+
+    def _set_snapshot(self, snapshot: CatalogSnapshot) -> None:
+        """Replace the snapshot and schedule a save."""
+        self._snapshot = snapshot
+        if self._store is not None:
+            self._store.async_delay_save(self._snapshot.as_dict, CATALOG_SAVE_DELAY)
+
+    async def async_restore(self) -> CatalogSnapshot:
+        """Load the snapshot persisted by a previous run."""
+        if self._store is None:
+            return self._snapshot
+        try:
+            data = await self._store.async_load()
+        except Exception as err:  # pylint: disable=broad-except
+            _LOGGER.warning("Failed to restore playlist catalog: %s", err)
+            return self._snapshot
+        if isinstance(data, dict):
+            self._snapshot = CatalogSnapshot.from_dict(data)
+            _LOGGER.debug(
+                "Restored catalog of %d playlists from storage",
+                len(self._snapshot.playlists),
+            )
+        return self._snapshot
+
+    async def async_load(
+        self, priority: str | None = None, force_refresh: bool = False
+    ) -> CatalogSnapshot:
+        """Load the full catalog, joining a load that is already running.
+
+        A forced load doesn't join a plain one, which may return cached
+        data; it runs once that one has finished instead.
+        """
+        running = self._load_task
+        if running is None or running.done():
+            self._load_task = asyncio.ensure_future(
+                self._async_load(priority, force_refresh)
+            )
+            self._load_forced = force_refresh
+        elif force_refresh and not self._load_forced:
+            self._load_task = asyncio.ensure_future(
+                self._async_load_after(running, priority)
+            )
+            self._load_forced = True
+        return await asyncio.shield(self._load_task)
+
+    async def _async_load_after(
+        self, running: asyncio.Task, priority: str | None
+    ) -> CatalogSnapshot:
+        """Run a forced load once the running plain one has finished."""
+        with contextlib.suppress(Exception):
+            await running
+        return await self._async_load(priority, True)
+
+    async def _async_load(
+        self, priority: str | None, force_refresh: bool
+    ) -> CatalogSnapshot:
+        """Fetch playlists, then steps and schedules for each of them."""
+        started = time.monotonic()
+        metadata = await self._api_client.get_playlists_with_metadata(force_refresh)
+        if not metadata:
+            _LOGGER.debug("No playlists returned, keeping existing catalog")
+            return self._snapshot
+
+        names = [playlist["name"] for playlist in metadata if playlist.get("name")]
+        # Stable sort: the playing playlist first, the rest in xSchedule order
+        order = sorted(names, key=lambda name: name != priority)
+        semaphore = asyncio.Semaphore(self._concurrency)
+
+        async def load_playlist(name: str) -> tuple[Any, Any]:
+            async with semaphore:
+                return await asyncio.gather(
+                    self._api_client.get_playlist_steps(name, force_refresh),
+                    self._api_client.get_playlist_schedules(name, force_refresh),
+                    return_exceptions=True,
+                )
+
+        results = dict(
+            zip(order, await asyncio.gather(*(load_playlist(name) for name in order)))
+        )
+
+        previous = self._snapshot
+        playlists: dict[str, PlaylistEntry] = {}
+        for playlist in metadata:
+            name = playlist.get("name")
+            if not name:
+                continue
+            steps, schedules = results[name]
+            old = previous.get(name)
+            if isinstance(steps, BaseException):
+                _LOGGER.debug("Failed to load steps for '%s': %s", name, steps)
+                steps = old.steps if old else None
+            if isinstance(schedules, BaseException):
+                _LOGGER.debug("Failed to load schedules for '%s': %s", name, schedules)
+                schedules = old.schedules if old else None
+            playlists[name] = PlaylistEntry(name, playlist, steps, schedules)
+
+        self._set_snapshot(CatalogSnapshot(playlists, time.time()))
+        _LOGGER.debug(
+            "Loaded catalog of %d playlists in %.2fs",
+            len(playlists),
+            time.monotonic() - started,
+        )
+        return self._snapshot
+
+    def _entry(self, name: str) -> PlaylistEntry:
+        """Return the entry for name, or a new empty one."""
+        return self._snapshot.get(name) or PlaylistEntry(name)
+
+    async def async_get_playlists(self, force_refresh: bool = False) -> list[dict[str, Any]]:
+        """Return playlist metadata objects."""
+        metadata = await self._api_client.get_playlists_with_metadata(force_refresh)
+        if not metadata:
+            return self._snapshot.metadata
+
+        snapshot = self._snapshot
+        playlists = {
+            playlist["name"]: replace(
+                snapshot.get(playlist["name"]) or PlaylistEntry(playlist["name"]),
+                metadata=playlist,
+            )
+            for playlist in metadata
+            if playlist.get("name")
+        }
+        self._set_snapshot(replace(snapshot, playlists=playlists))
+        return metadata
+
+    async def async_get_steps(
+        self, name: str, force_refresh: bool = False
+    ) -> list[dict[str, Any]]:
+        """Return the steps of a playlist.
+
+        The snapshot's steps are served, and kept, when xSchedule is
+        unreachable or its reply is malformed.
+        """
+        try:
+            steps = await self._api_client.get_playlist_steps(name, force_refresh)
+        except XScheduleAPIError as err:
+            entry = self._snapshot.get(name)
+            if entry is None or entry.steps is None:
+                raise
+            _LOGGER.debug("Serving catalog steps for '%s': %s", name, err)
+            return entry.steps
+
+        entry = self._entry(name)
+        if entry.steps != steps:
+            self._set_snapshot(self._snapshot.with_entry(replace(entry, steps=steps)))
+        return steps
+
+    async def async_get_schedules(
+        self, name: str, force_refresh: bool = False
+    ) -> list[dict[str, Any]]:
+        """Return the schedules of a playlist."""
+        try:
+            schedules = await self._api_client.get_playlist_schedules(name, force_refresh)
+        except XScheduleAPIError:
+            entry = self._snapshot.get(name)
+            if entry is None or entry.schedules is None:
+                raise
+            _LOGGER.debug("xSchedule unreachable, serving catalog schedules for '%s'", name)
+            return entry.schedules
+
+        entry = self._entry(name)
+        if entry.schedules != schedules:
+            self._set_snapshot(
+                self._snapshot.with_entry(replace(entry, schedules=schedules))
+            )
+        return schedules
+
+    def cancel(self) -> None:
+        """Cancel a load in progress (used on shutdown)."""
+        if self._load_task is not None and not self._load_task.done():
+            self._load_task.cancel()
@@ -0,0 +1,106 @@
+"""Latest-value-wins sending for slider-driven xSchedule commands."""
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """Token bucket allowing `rate` sends per second with bursts of `burst`."""
+
+    def __init__(self, rate: float, burst: int) -> None:
+        """Initialize a full bucket."""
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+
+    def _refill(self) -> None:
+        """Add the tokens earned since the last refill."""
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def async_acquire(self) -> None:
+        """Wait until a token is available and take it."""
+        self._refill()
+        while self._tokens < 1:
+            await asyncio.sleep((1 - self._tokens) / self.rate)
+            self._refill()
+        self._tokens -= 1
+
+
+class LatestValueSender:
+    """Sends one command type, keeping only the newest queued value.
+
+    While a send is in flight (or waiting for a token), a new value replaces
+    the queued one instead of queueing behind it. Every caller whose value
+    was replaced receives the result of the send that carried the newer
+    value, so a burst of slider events becomes at most one send per token
+    and the last value always reaches xSchedule.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        send: Callable[[str], Awaitable[Any]],
+        bucket: TokenBucket,
+    ) -> None:
+        """Initialize the sender."""
+        self.name = name
+        self._send = send
+        self._bucket = bucket
+        self._pending: str | None = None
+        self._waiters: list[asyncio.Future] = []
+        self._task: asyncio.Task | None = None
+        self.sent = 0
+        self.superseded = 0
+
+    async def async_send(self, parameters: str) -> Any:
+        """Queue a value and return the result of the send that carries it."""
+        if self._waiters:
+            _LOGGER.debug(
+                "%s: replacing queued value %s with %s", self.name, self._pending, parameters
+            )
+            self.superseded += 1
+        self._pending = parameters
+        future: asyncio.Future = asyncio.get_running_loop().create_future()
+        self._waiters.append(future)
+        if self._task is None or self._task.done():
+            self._task = asyncio.ensure_future(self._run())
+        return await future
+
+    async def _run(self) -> None:
+        """Send queued values until none are left."""
+        while self._waiters:
+            await self._bucket.async_acquire()
+            parameters, waiters = self._pending, self._waiters
+            self._pending, self._waiters = None, []
+            try:
+                result = await self._send(parameters)
+            except asyncio.CancelledError:
+                for waiter in waiters:
+                    waiter.cancel()
+                raise
+            except Exception as err:  # pylint: disable=broad-except
+                for waiter in waiters:
+                    if not waiter.done():
+                        waiter.set_exception(err)
+            else:
+                self.sent += 1
+                for waiter in waiters:
+                    if not waiter.done():
+                        waiter.set_result(result)
+
+    def cancel(self) -> None:
+        """Cancel the sender and every caller waiting on it."""
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+        for waiter in self._waiters:
+            waiter.cancel()
+        self._pending, self._waiters = None, []
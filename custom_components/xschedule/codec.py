@@ -0,0 +1,34 @@
+"""JSON codec for xSchedule REST bodies and WebSocket frames.
+
+Uses orjson when it is installed (Home Assistant ships it) and the
+standard library otherwise. orjson.JSONDecodeError subclasses
+json.JSONDecodeError, so callers catch the same exception either way.
+"""
+from __future__ import annotations
+
+import json
+from typing import Any
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is part of Home Assistant
+    orjson = None
+
+if orjson is not None:
+    CODEC = "orjson"
+
+    def loads(data: str | bytes) -> Any:
+        """Decode a JSON document."""
+        return orjson.loads(data)
+
+    def dumps(obj: Any) -> str:
+        """Encode obj as a JSON string."""
+        return orjson.dumps(obj).decode()
+
+else:  # pragma: no cover
+    CODEC = "json"
+    loads = json.loads
+
+    def dumps(obj: Any) -> str:
+        """Encode obj as a compact JSON string."""
+        return json.dumps(obj, separators=(",", ":"))
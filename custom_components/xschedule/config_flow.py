@@ -10,6 +10,7 @@ from homeassistant import config_entries
 from homeassistant.const import CONF_HOST, CONF_PORT
 from homeassistant.core import HomeAssistant, callback
 from homeassistant.data_entry_flow import FlowResult
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
 import homeassistant.helpers.config_validation as cv
 
 from .api_client import (
@@ -18,8 +19,14 @@ from .api_client import (
     XScheduleConnectionError,
 )
 from .const import (
+    CONF_CATALOG_CONCURRENCY,
+    CONF_DEAD_LINK_TIMEOUT,
     CONF_PASSWORD,
+    CONF_POSITION_DRIFT,
+    DEFAULT_CATALOG_CONCURRENCY,
     DEFAULT_PORT,
+    DEFAULT_POSITION_DRIFT,
+    DEFAULT_WS_DEAD_LINK_TIMEOUT,
     DOMAIN,
 )
 
@@ -45,6 +52,7 @@ async def validate_connection(
         host=data[CONF_HOST],
         port=data[CONF_PORT],
         password=data.get(CONF_PASSWORD),
+        session=async_get_clientsession(hass),
     )
 
     try:
@@ -156,6 +164,24 @@ class OptionsFlow(config_entries.OptionsFlow):
                         CONF_PASSWORD,
                         default=self.config_entry.data.get(CONF_PASSWORD, ""),
                     ): cv.string,
+                    vol.Optional(
+                        CONF_CATALOG_CONCURRENCY,
+                        default=self.config_entry.data.get(
+                            CONF_CATALOG_CONCURRENCY, DEFAULT_CATALOG_CONCURRENCY
+                        ),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=1, max=16)),
+                    vol.Optional(
+                        CONF_DEAD_LINK_TIMEOUT,
+                        default=self.config_entry.data.get(
+                            CONF_DEAD_LINK_TIMEOUT, DEFAULT_WS_DEAD_LINK_TIMEOUT
+                        ),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=2, max=120)),
+                    vol.Optional(
+                        CONF_POSITION_DRIFT,
+                        default=self.config_entry.data.get(
+                            CONF_POSITION_DRIFT, DEFAULT_POSITION_DRIFT
+                        ),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=0, max=30)),
                 }
             ),
             errors=errors,
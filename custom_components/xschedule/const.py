@@ -7,17 +7,65 @@ CONF_HOST = "host"
 CONF_PORT = "port"
 CONF_PASSWORD = "password"
 CONF_SHOW_PLAY_BUTTONS = "show_play_buttons"
+CONF_CATALOG_CONCURRENCY = "catalog_concurrency"
+CONF_DEAD_LINK_TIMEOUT = "dead_link_timeout"
+CONF_POSITION_DRIFT = "position_drift"
 
 # Default values
 DEFAULT_PORT = 80
 DEFAULT_NAME = "xSchedule"
+DEFAULT_CATALOG_CONCURRENCY = 4  # playlists fetched in parallel during prefetch
+DEFAULT_WS_DEAD_LINK_TIMEOUT = 10  # seconds without any message before reconnecting
+DEFAULT_POSITION_DRIFT = 2  # seconds position may drift from extrapolation (0 = write every update)
+
+# Services
+SERVICE_ENTITY_CONCURRENCY = 4  # entities one service call drives at once
+
+# Internal queue advance (jump at the end of the current step)
+QUEUE_ADVANCE_RETRY_DELAY = 1  # seconds between attempts to arm the next song
+QUEUE_ADVANCE_GUARD = 0.5  # seconds before a step ends when arming is too late
+QUEUE_ADVANCE_ATTEMPTS = 3  # attempts to arm the next song per step
 
 # WebSocket
 WS_RETRY_DELAY = 5  # seconds
-WS_HEARTBEAT_INTERVAL = 60  # seconds (reduced from 30 to lower CPU usage)
+WS_CLOSE_TIMEOUT = 2  # seconds to wait for xSchedule to acknowledge a close
+WS_PROBE_QUERY = "GetQueuedSteps"  # small reply used to probe a quiet socket
+WS_REQUEST_TIMEOUT = 5  # seconds to wait for a correlated response
+WS_FALLBACK_COOLDOWN = 30  # seconds requests use REST after a WebSocket failure
+
+# WebSocket subscription topics (XScheduleWebSocket.subscribe)
+WS_TOPIC_STATUS = "status"  # every status message
+WS_TOPIC_STEP = "step"  # {"step": new, "previous": old} when the step changes
+WS_TOPIC_PINGSTATUS = "pingstatus"  # tuple of ControllerStatus that changed
+WS_TOPIC_COMMAND_RESULT = "command_result"  # {"command": name, "response": {...}}
+WS_TOPIC_QUERY_RESPONSE = "query_response"  # {"query": name, "response": {...}}
 
 # Update intervals
 UPDATE_INTERVAL = 1  # seconds (fallback if WebSocket unavailable)
+POLL_INTERVAL_PAUSED = 5  # seconds between REST polls while paused
+POLL_INTERVAL_IDLE = 10  # seconds between REST polls while idle or unreachable
+
+# HTTP transport
+HTTP_CONNECTION_LIMIT = 4  # max parallel requests per xSchedule host
+STATUS_MICRO_CACHE_TTL = 0.25  # seconds a GetPlayingStatus reply is reused
+
+# Slider-driven commands (volume, seek, brightness): newest value wins
+COALESCE_RATE = 5  # sends per second per command
+COALESCE_BURST = 2  # sends allowed back to back before rate limiting
+
+# API data cache (stale entries are served while refreshing in background)
+CACHE_PLAYLISTS_TTL = 300  # seconds
+CACHE_SCHEDULES_TTL = 300  # seconds
+CACHE_STEPS_TTL = 180  # seconds
+CACHE_MAX_PLAYLISTS = 256  # entries per cache (LRU eviction)
+CACHE_MAX_BYTES = 2 * 1024 * 1024  # approximate payload bytes per cache
+
+# Persistent storage
+STORAGE_VERSION = 1
+STORAGE_KEY_CATALOG = f"{DOMAIN}.catalog"  # suffixed with the host and port
+CATALOG_SAVE_DELAY = 10  # seconds, coalesces catalog writes
+STORAGE_KEY_QUEUE = f"{DOMAIN}.internal_queue"  # suffixed with the config entry id
+QUEUE_SAVE_DELAY = 2  # seconds, coalesces internal queue writes
 
 # API endpoints
 API_QUERY = "xScheduleQuery"
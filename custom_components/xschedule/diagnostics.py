@@ -0,0 +1,52 @@
+"""Diagnostics support for xSchedule."""
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.components.media_player import DOMAIN as MEDIA_PLAYER_DOMAIN
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import entity_registry as er
+
+from .const import CONF_PASSWORD, DOMAIN
+
+TO_REDACT = {CONF_PASSWORD}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    diagnostics: dict[str, Any] = {
+        "entry": async_redact_data(dict(entry.data), TO_REDACT),
+    }
+
+    hub = getattr(entry, "runtime_data", None)
+    if hub is not None:
+        diagnostics["http"] = hub.api_client.connection_stats
+        diagnostics["cache"] = hub.api_client.cache_stats
+        diagnostics["server_sessions"] = hub.api_client.server_sessions
+        diagnostics["shared_by_entries"] = len(hub.entry_ids)
+        diagnostics["polling"] = {
+            "running": hub.poller.running,
+            "polls": hub.poller.polls,
+            "unchanged": hub.poller.unchanged,
+            "failures": hub.poller.failures,
+        }
+        diagnostics["websocket"] = {
+            "connected": hub.websocket.connected,
+            "dead_links": hub.websocket.dead_links,
+            "frames": hub.websocket.frame_stats,
+        }
+
+    entity_id = er.async_get(hass).async_get_entity_id(
+        MEDIA_PLAYER_DOMAIN, DOMAIN, f"{DOMAIN}_{entry.entry_id}"
+    )
+    component = hass.data.get(MEDIA_PLAYER_DOMAIN)
+    entity = component.get_entity(entity_id) if entity_id and component else None
+    if entity is not None and hasattr(entity, "state_writes_skipped"):
+        diagnostics["state_writes_skipped"] = entity.state_writes_skipped
+        diagnostics["queue_advance"] = entity.queue_advance_stats
+
+    return diagnostics
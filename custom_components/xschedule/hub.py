@@ -0,0 +1,187 @@
+"""Per-host connection hub shared by xSchedule config entries and platforms."""
+from __future__ import annotations
+
+import logging
+from collections.abc import Mapping
+from typing import Any
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import CONF_HOST, CONF_PORT
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.helpers.storage import Store
+from homeassistant.util import slugify
+
+from .api_client import XScheduleAPIClient
+from .catalog import XScheduleCatalog
+from .const import (
+    CONF_CATALOG_CONCURRENCY,
+    CONF_DEAD_LINK_TIMEOUT,
+    CONF_PASSWORD,
+    DEFAULT_CATALOG_CONCURRENCY,
+    DEFAULT_WS_DEAD_LINK_TIMEOUT,
+    DOMAIN,
+    POLL_INTERVAL_IDLE,
+    POLL_INTERVAL_PAUSED,
+    STORAGE_KEY_CATALOG,
+    STORAGE_VERSION,
+    UPDATE_INTERVAL,
+    WS_TOPIC_STATUS,
+)
+from .poller import StatusPoller
+from .status import ControllerStatus
+from .websocket import XScheduleWebSocket
+
+_LOGGER = logging.getLogger(__name__)
+
+# hass.data key: (host, port) -> XScheduleHub
+HUBS_KEY = f"{DOMAIN}_hubs"
+
+
+def catalog_store_key(host: str, port: int) -> str:
+    """Return the storage key of a host's catalog, shared by its entries."""
+    return f"{STORAGE_KEY_CATALOG}.{slugify(f'{host}_{port}')}"
+
+
+class XScheduleHub:
+    """One xSchedule host: API client, WebSocket, catalog and status.
+
+    Config entries for the same host share a hub (see async_get_hub), so a
+    duplicate entry opens no extra connections. Platforms read everything
+    from the hub in entry.runtime_data instead of from each other.
+    """
+
+    def __init__(self, hass: HomeAssistant, data: Mapping[str, Any]) -> None:
+        """Initialize the hub from config entry data."""
+        self.host: str = data[CONF_HOST]
+        self.port: int = data[CONF_PORT]
+        # Registry key, fixed at creation: an entry's data can change under it
+        self.key = (self.host, self.port)
+        password = data.get(CONF_PASSWORD)
+
+        # Both transports ride on Home Assistant's shared session
+        session = async_get_clientsession(hass)
+        self.api_client = XScheduleAPIClient(
+            self.host, self.port, password, session=session
+        )
+        # Keyed by host, not entry, as it outlives the entry that created it
+        self.catalog = XScheduleCatalog(
+            self.api_client,
+            data.get(CONF_CATALOG_CONCURRENCY, DEFAULT_CATALOG_CONCURRENCY),
+            Store(hass, STORAGE_VERSION, catalog_store_key(self.host, self.port)),
+        )
+        self.websocket = XScheduleWebSocket(
+            self.host,
+            self.port,
+            password,
+            dead_link_timeout=data.get(
+                CONF_DEAD_LINK_TIMEOUT, DEFAULT_WS_DEAD_LINK_TIMEOUT
+            ),
+            connection_callback=self._handle_connection,
+            session=session,
+        )
+        # Let the API client run queries and commands over the open socket
+        self.api_client.attach_websocket(self.websocket)
+
+        # REST polling while the socket is down; polled statuses go through
+        # the socket's router so every subscriber sees them
+        self.poller = StatusPoller(
+            self.api_client.get_playing_status,
+            self.websocket.dispatch_status,
+            self._poll_interval,
+        )
+
+        # Latest status message, whichever transport carried it
+        self.status: dict[str, Any] = {}
+        self.websocket.subscribe(WS_TOPIC_STATUS, self._handle_status)
+
+        self.entry_ids: set[str] = set()
+        self._started = False
+
+    @property
+    def controllers(self) -> tuple[ControllerStatus, ...]:
+        """Return the controllers in the latest pingstatus."""
+        return self.websocket.controllers
+
+    async def async_start(self) -> None:
+        """Restore the catalog and connect; later calls do nothing."""
+        if self._started:
+            return
+        self._started = True
+        await self.catalog.async_restore()
+        await self.websocket.connect()
+        if not self.websocket.connected:
+            self.poller.start()
+
+    async def async_stop(self) -> None:
+        """Disconnect and release everything the hub holds."""
+        self._started = False
+        self.poller.stop()
+        await self.websocket.disconnect()
+        self.catalog.cancel()
+        await self.api_client.close()
+
+    async def async_refresh_status(self) -> None:
+        """Fetch the playing status and route it to subscribers.
+
+        A reply that came over the WebSocket was routed when it arrived.
+        """
+        status = await self.api_client.get_playing_status()
+        if not self.websocket.routed(status):
+            self.websocket.dispatch_status(status)
+
+    @callback
+    def _handle_status(self, message: dict[str, Any]) -> None:
+        """Keep the latest status message."""
+        self.status = message
+
+    @callback
+    def _handle_connection(self, connected: bool) -> None:
+        """Poll over REST exactly while the WebSocket is down."""
+        if connected:
+            self.poller.stop()
+        elif self._started:
+            self.poller.start()
+
+    def _poll_interval(self) -> float:
+        """Return the REST poll interval for the current state."""
+        state = str(self.status.get("status", "idle")).lower()
+        if state == "playing":
+            return UPDATE_INTERVAL
+        if state == "paused":
+            return POLL_INTERVAL_PAUSED
+        return POLL_INTERVAL_IDLE
+
+
+async def async_get_hub(hass: HomeAssistant, entry: ConfigEntry) -> XScheduleHub:
+    """Return the started hub for the entry's host, creating it if needed.
+
+    The first entry for a host sets its password and options.
+    """
+    hubs: dict[tuple[str, int], XScheduleHub] = hass.data.setdefault(HUBS_KEY, {})
+    key = (entry.data[CONF_HOST], entry.data[CONF_PORT])
+    hub = hubs.get(key)
+    if hub is None:
+        hub = hubs[key] = XScheduleHub(hass, entry.data)
+    elif entry.entry_id not in hub.entry_ids:
+        _LOGGER.debug("Sharing xSchedule connection to %s:%s", *key)
+    hub.entry_ids.add(entry.entry_id)
+    await hub.async_start()
+    return hub
+
+
+async def async_release_hub(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Drop the entry's use of its hub, stopping it when no entry is left.
+
+    The hub is the one in entry.runtime_data, not looked up from entry.data,
+    which the options flow has already changed when the entry reloads.
+    """
+    hub: XScheduleHub | None = getattr(entry, "runtime_data", None)
+    if not isinstance(hub, XScheduleHub):
+        return
+    hub.entry_ids.discard(entry.entry_id)
+    if not hub.entry_ids:
+        hubs: dict[tuple[str, int], XScheduleHub] = hass.data.get(HUBS_KEY, {})
+        if hubs.get(hub.key) is hub:
+            del hubs[hub.key]
+        await hub.async_stop()
@@ -0,0 +1,266 @@
+"""The integration's internal song request queue."""
+from __future__ import annotations
+
+import heapq
+import itertools
+import uuid
+from collections.abc import Callable, Iterable, Iterator
+from typing import Any
+
+
+def _duration_ms(item: dict[str, Any]) -> int:
+    """Return a queue item's lengthms as int milliseconds."""
+    try:
+        return int(item.get("lengthms") or 0)
+    except (TypeError, ValueError):
+        return 0
+
+
+class InternalQueue:
+    """Requested songs: highest priority first, then in the order added.
+
+    Items are dicts with id, name, playlist, priority and lengthms. They
+    live in a heap keyed by (-priority, sequence), so adding, bumping and
+    taking the head are O(log n); superseded heap entries are skipped
+    lazily. Items are also indexed by id and by song name.
+
+    reorder() switches to a manual order, which holds until the next bump
+    re-sorts by priority (keeping the manual order among equal priorities).
+    The ordered list and the state attribute are cached between changes.
+    """
+
+    def __init__(
+        self,
+        items: Iterable[dict[str, Any]] = (),
+        manual: bool | None = None,
+        on_change: Callable[[], None] | None = None,
+    ) -> None:
+        """Initialize the queue, keeping the order of items.
+
+        on_change is called after every later change, e.g. to save.
+        """
+        self._items: dict[str, dict[str, Any]] = {}
+        self._by_name: dict[str, str] = {}
+        self._keys: dict[str, tuple[int, int]] = {}
+        self._heap: list[tuple[int, int, str]] = []
+        self._sequence = itertools.count()
+        self._manual = False
+        self._ordered: list[dict[str, Any]] | None = None
+        self._attribute: list[dict[str, Any]] | None = None
+        self._version = 0
+        self._on_change: Callable[[], None] | None = None
+
+        items = list(items)
+        # An order that isn't by priority was set by hand
+        self._manual = manual if manual is not None else any(
+            first["priority"] < second["priority"]
+            for first, second in zip(items, items[1:])
+        )
+        for item in items:
+            self._insert(item)
+        self._on_change = on_change
+
+    def __len__(self) -> int:
+        """Return the number of queued songs."""
+        return len(self._items)
+
+    def __bool__(self) -> bool:
+        """Return True if any song is queued."""
+        return bool(self._items)
+
+    def __iter__(self) -> Iterator[dict[str, Any]]:
+        """Iterate over the queue in play order."""
+        return iter(self.ordered)
+
+    def __getitem__(self, index: int) -> dict[str, Any]:
+        """Return the item at a position in play order."""
+        if index == 0 and self._items:
+            return self.head
+        return self.ordered[index]
+
+    @property
+    def manual(self) -> bool:
+        """Return True while the order was set by reorder()."""
+        return self._manual
+
+    @property
+    def head(self) -> dict[str, Any] | None:
+        """Return the next song to play."""
+        heap = self._heap
+        while heap:
+            rank, sequence, item_id = heap[0]
+            if self._keys.get(item_id) == (rank, sequence):
+                return self._items[item_id]
+            heapq.heappop(heap)
+        return None
+
+    @property
+    def ordered(self) -> list[dict[str, Any]]:
+        """Return the items in play order."""
+        if self._ordered is None:
+            self._ordered = [
+                self._items[item_id]
+                for _, item_id in sorted(
+                    (key, item_id) for item_id, key in self._keys.items()
+                )
+            ]
+        return self._ordered
+
+    @property
+    def version(self) -> int:
+        """Return a number that changes whenever the queue does."""
+        return self._version
+
+    def get(self, item_id: str) -> dict[str, Any] | None:
+        """Return the item with this id."""
+        return self._items.get(item_id)
+
+    def find(self, name: str) -> dict[str, Any] | None:
+        """Return the queued item for a song name."""
+        item_id = self._by_name.get(name)
+        return None if item_id is None else self._items[item_id]
+
+    def add(self, name: str, playlist: str, lengthms: Any = "0") -> dict[str, Any]:
+        """Queue a song at priority 1 and return its item."""
+        item = {
+            "id": str(uuid.uuid4()),
+            "name": name,
+            "playlist": playlist,
+            "priority": 1,
+            "lengthms": lengthms,
+        }
+        self._insert(item)
+        return item
+
+    def bump(self, item_id: str) -> dict[str, Any]:
+        """Raise an item's priority by one, moving it up past lower ones."""
+        item = self._items[item_id]
+        item["priority"] += 1
+        if self._manual:
+            # Back to priority order, keeping the manual order within each
+            order = self.ordered
+            self._manual = False
+            self._keys = {
+                queued["id"]: (-queued["priority"], next(self._sequence))
+                for queued in order
+            }
+            self._heap = [(*key, queued_id) for queued_id, key in self._keys.items()]
+            heapq.heapify(self._heap)
+        else:
+            # After the items already at the new priority, as a stable sort
+            # would place it
+            self._push(item_id, (-item["priority"], next(self._sequence)))
+        self._changed()
+        return item
+
+    def remove(self, item_id: str) -> dict[str, Any] | None:
+        """Remove and return an item (its heap entry goes stale)."""
+        item = self._items.pop(item_id, None)
+        if item is None:
+            return None
+        del self._keys[item_id]
+        if self._by_name.get(item["name"]) == item_id:
+            del self._by_name[item["name"]]
+        if not self._items:
+            self._heap.clear()
+            self._manual = False
+        self._changed()
+        return item
+
+    def reorder(self, item_ids: list[str]) -> None:
+        """Put the items in this order (every id, each once)."""
+        if sorted(item_ids) != sorted(self._items):
+            raise ValueError("Reorder must list every queued item once")
+        self._manual = True
+        self._keys = {item_id: (0, next(self._sequence)) for item_id in item_ids}
+        self._heap = [(*key, item_id) for item_id, key in self._keys.items()]
+        self._changed()
+
+    def move(self, item_id: str, position: int) -> None:
+        """Move an item to a position in play order (manual order)."""
+        ids = [item["id"] for item in self.ordered if item["id"] != item_id]
+        if len(ids) == len(self._items):
+            raise KeyError(item_id)
+        ids.insert(max(0, min(position, len(ids))), item_id)
+        self.reorder(ids)
+
+    def copy(self) -> InternalQueue:
+        """Return an independent copy, without the change hook."""
+        return InternalQueue([dict(item) for item in self.ordered], self._manual)
+
+    def clear(self) -> None:
+        """Remove every item."""
+        self._items.clear()
+        self._by_name.clear()
+        self._keys.clear()
+        self._heap.clear()
+        self._manual = False
+        self._changed()
+
+    def as_attribute(self) -> list[dict[str, Any]]:
+        """Return the internal_queue state attribute (durations in ms)."""
+        if self._attribute is None:
+            self._attribute = [
+                {
+                    "id": item["id"],
+                    "name": item["name"],
+                    "playlist": item["playlist"],
+                    "priority": item["priority"],
+                    "duration": _duration_ms(item),
+                }
+                for item in self.ordered
+            ]
+        return self._attribute
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the queue in its storage format."""
+        return {"items": [dict(item) for item in self.ordered], "manual": self._manual}
+
+    @classmethod
+    def from_dict(
+        cls, data: dict[str, Any], on_change: Callable[[], None] | None = None
+    ) -> InternalQueue:
+        """Build a queue from its storage format, skipping malformed items."""
+        items = []
+        seen: set[str] = set()
+        for item in data.get("items") or []:
+            try:
+                restored = {
+                    "id": str(item["id"]),
+                    "name": str(item["name"]),
+                    "playlist": item.get("playlist"),
+                    "priority": max(1, int(item.get("priority", 1))),
+                    "lengthms": item.get("lengthms", "0"),
+                }
+            except (AttributeError, KeyError, TypeError, ValueError):
+                continue
+            if restored["id"] not in seen:
+                seen.add(restored["id"])
+                items.append(restored)
+        return cls(items, bool(data.get("manual", False)), on_change)
+
+    def _insert(self, item: dict[str, Any]) -> None:
+        """Add an item after everything already queued at its priority."""
+        item_id = item["id"]
+        self._items[item_id] = item
+        self._by_name.setdefault(item["name"], item_id)
+        rank = 0 if self._manual else -item["priority"]
+        self._push(item_id, (rank, next(self._sequence)))
+        self._changed()
+
+    def _push(self, item_id: str, key: tuple[int, int]) -> None:
+        """Set an item's key; any previous heap entry goes stale."""
+        self._keys[item_id] = key
+        heapq.heappush(self._heap, (*key, item_id))
+        # Drop stale entries once they outnumber the live ones
+        if len(self._heap) > 2 * len(self._keys) + 16:
+            self._heap = [(*key, queued_id) for queued_id, key in self._keys.items()]
+            heapq.heapify(self._heap)
+
+    def _changed(self) -> None:
+        """Drop the cached order and attribute."""
+        self._ordered = None
+        self._attribute = None
+        self._version += 1
+        if self._on_change is not None:
+            self._on_change()
@@ -3,7 +3,7 @@ from __future__ import annotations
 
 import asyncio
 import logging
-import uuid
+from collections.abc import Callable
 from typing import Any
 from datetime import datetime
 
@@ -16,15 +16,18 @@ from homeassistant.components.media_player import (
 )
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import CONF_HOST, CONF_PORT
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.entity import DeviceInfo
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.storage import Store
 from homeassistant.util import dt as dt_util
 
-from .api_client import XScheduleAPIClient, XScheduleAPIError
+from .api_client import CACHE_ALL, XScheduleAPIError
+from .catalog import StepCatalog
 from .const import (
-    CONF_PASSWORD,
+    CONF_POSITION_DRIFT,
     DEFAULT_NAME,
+    DEFAULT_POSITION_DRIFT,
     DOMAIN,
     EVENT_CACHE_INVALIDATED,
     EVENT_MUTE_TOGGLE,
@@ -37,8 +40,15 @@ from .const import (
     EVENT_STOP,
     EVENT_VOLUME_ADJUST,
     EVENT_VOLUME_SET,
+    QUEUE_SAVE_DELAY,
+    STORAGE_KEY_QUEUE,
+    STORAGE_VERSION,
+    WS_TOPIC_STATUS,
 )
-from .websocket import XScheduleWebSocket
+from .hub import XScheduleHub
+from .internal_queue import InternalQueue
+from .queue_advance import QueueAdvancer
+from .status import StatusSnapshot
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -55,22 +65,15 @@ async def async_setup_entry(
     """Set up xSchedule media player from a config entry."""
     _LOGGER.debug("Setting up xSchedule media player")
 
-    host = config_entry.data[CONF_HOST]
-    port = config_entry.data[CONF_PORT]
-    password = config_entry.data.get(CONF_PASSWORD)
-
-    # Create API client
-    api_client = XScheduleAPIClient(host, port, password)
-
-    # Create media player entity
-    entity = XScheduleMediaPlayer(config_entry, api_client, hass)
-
-    # Store entity reference in hass.data for binary_sensor to access
-    if DOMAIN not in hass.data:
-        hass.data[DOMAIN] = {}
-    if "entities" not in hass.data[DOMAIN]:
-        hass.data[DOMAIN]["entities"] = {}
-    hass.data[DOMAIN]["entities"][config_entry.entry_id] = entity
+    # The hub has restored the saved catalog, so playlists and browse_media
+    # are usable before xSchedule has answered
+    entity = XScheduleMediaPlayer(
+        config_entry,
+        hass,
+        queue_store=Store(
+            hass, STORAGE_VERSION, f"{STORAGE_KEY_QUEUE}.{config_entry.entry_id}"
+        ),
+    )
 
     async_add_entities([entity], True)
 
@@ -80,6 +83,9 @@ class XScheduleMediaPlayer(MediaPlayerEntity):
 
     _attr_media_content_type = MediaType.PLAYLIST
     _attr_should_poll = False  # WebSocket provides real-time updates
+    # Large lists for the cards (also pushed over xschedule/subscribe) are
+    # kept out of the recorder
+    _unrecorded_attributes = frozenset({"playlist_songs", "internal_queue"})
     _attr_supported_features = (
         MediaPlayerEntityFeature.PLAY
         | MediaPlayerEntityFeature.PAUSE
@@ -98,13 +104,22 @@ class XScheduleMediaPlayer(MediaPlayerEntity):
     def __init__(
         self,
         config_entry: ConfigEntry,
-        api_client: XScheduleAPIClient,
         hass: HomeAssistant,
+        queue_store: Store | None = None,
     ) -> None:
-        """Initialize the xSchedule media player."""
+        """Initialize the xSchedule media player.
+
+        Connection, cache and catalog come from the host's shared hub in
+        config_entry.runtime_data. The internal queue is saved to
+        queue_store when one is given.
+        """
         self._config_entry = config_entry
-        self._api_client = api_client
         self._hass = hass
+        self._hub: XScheduleHub = config_entry.runtime_data
+        self._api_client = self._hub.api_client
+        self._catalog = self._hub.catalog
+        self._websocket = self._hub.websocket
+        self._unsubscribe_status: Callable[[], None] | None = None
 
         # Entity attributes
         self._attr_name = DEFAULT_NAME
@@ -126,46 +141,72 @@ class XScheduleMediaPlayer(MediaPlayerEntity):
         self._attr_volume_level = None
         self._attr_is_volume_muted = False
 
-        # Additional state
-        self._playlists: list[str] = []
-        self._current_playlist_steps: list[dict[str, Any]] = []
+        # Additional state (playlists start from the restored catalog)
+        self._playlists: list[str] = self._catalog.snapshot.names
+        self._steps = StepCatalog()  # current playlist's steps, indexed
+        self._steps_from_catalog = False  # steps seeded from catalog, revalidate
         self._time_remaining = None
         self._controller_status: list[dict[str, Any]] = []  # Controller health (pingstatus)
-        self._previous_controller_status: list[dict[str, Any]] = []  # For change detection
+        self._status = StatusSnapshot(controllers=())  # Last parsed status message
         
-        # Internal queue management (in-memory, lost on reboot)
-        self._internal_queue: list[dict[str, Any]] = []
+        # xschedule/subscribe clients and the fields last pushed to them
+        self._subscribers: list[Callable[[dict[str, Any]], None]] = []
+        self._published: dict[str, Any] = {}
+
+        # Internal queue management, saved (debounced) to queue_store; a
+        # restored queue waits for the first status to be checked against
+        self._queue_store = queue_store
+        self._internal_queue = InternalQueue(on_change=self._schedule_queue_save)
+        self._restored_queue: dict[str, Any] | None = None
+        self._queue_lock = asyncio.Lock()  # one queue operation (or batch) at a time
+        self._advancer = QueueAdvancer(self.async_jump_to_step, self._handle_jump_rejected)
         self._previous_song: str | None = None  # For song change detection
 
-        # WebSocket connection
-        self._websocket: XScheduleWebSocket | None = None
-        self._setup_websocket()
-
         # Debouncing for WebSocket updates
         self._update_debounce_task: asyncio.Task | None = None
         self._update_debounce_delay = 0.2  # 200ms debounce window
 
-    def _setup_websocket(self) -> None:
-        """Set up WebSocket connection."""
-        host = self._config_entry.data[CONF_HOST]
-        port = self._config_entry.data[CONF_PORT]
-        password = self._config_entry.data.get(CONF_PASSWORD)
+        # Position-only updates are skipped while the frontend's extrapolation
+        # from media_position_updated_at stays within this many seconds
+        self._position_drift = config_entry.data.get(CONF_POSITION_DRIFT, DEFAULT_POSITION_DRIFT)
+        self._state_writes_skipped = 0
 
-        self._websocket = XScheduleWebSocket(
-            host, port, password, self._handle_websocket_update
-        )
+    @property
+    def _current_playlist_steps(self) -> list[dict[str, Any]]:
+        """Return the current playlist's steps."""
+        return self._steps.steps
+
+    @_current_playlist_steps.setter
+    def _current_playlist_steps(self, steps: list[dict[str, Any]] | None) -> None:
+        """Replace the current playlist's steps and rebuild their index."""
+        if steps is not self._steps.steps:
+            self._steps = StepCatalog(steps)
 
     async def async_added_to_hass(self) -> None:
         """Run when entity is added to hass."""
         await super().async_added_to_hass()
 
-        # Connect WebSocket
-        if self._websocket:
-            await self._websocket.connect()
+        # Queue saved by the previous run (before any status can arrive)
+        if self._queue_store is not None:
+            try:
+                data = await self._queue_store.async_load()
+            except Exception as err:  # pylint: disable=broad-except
+                _LOGGER.warning("Failed to restore internal queue: %s", err)
+            else:
+                if isinstance(data, dict) and data.get("items"):
+                    self._restored_queue = data
+
+        # Follow status messages (polled ones too while the socket is down)
+        self._unsubscribe_status = self._websocket.subscribe(
+            WS_TOPIC_STATUS, self._handle_status_message
+        )
 
-            # If WebSocket is connected, it will send data soon
-            # Wait a brief moment for initial data
-            await asyncio.sleep(0.1)
+        # Connect (already done when the entry started a shared hub)
+        await self._hub.async_start()
+
+        # If WebSocket is connected, it will send data soon
+        # Wait a brief moment for initial data
+        await asyncio.sleep(0.1)
 
         # Fetch initial status if controller data not yet populated
         # This handles the case where WebSocket hasn't connected or sent data yet
@@ -179,33 +220,72 @@ class XScheduleMediaPlayer(MediaPlayerEntity):
             _LOGGER.debug("Controller status already populated via WebSocket (%d controllers)",
                          len(self._controller_status))
 
+        # Prefetch every playlist's steps and schedules in the background
+        if self.hass is not None:
+            self.hass.async_create_background_task(
+                self._async_prefetch_catalog(), "xschedule catalog prefetch"
+            )
+
+    async def _async_prefetch_catalog(self, force_refresh: bool = False) -> None:
+        """Load the playlist catalog, current playlist first."""
+        try:
+            snapshot = await self._catalog.async_load(
+                priority=self._attr_media_playlist, force_refresh=force_refresh
+            )
+        except XScheduleAPIError as err:
+            _LOGGER.warning("Failed to prefetch playlist catalog: %s", err)
+            return
+        if snapshot.names and snapshot.names != self._playlists:
+            self._playlists = snapshot.names
+            if self.hass is not None:
+                self.async_write_ha_state()
+
     async def async_will_remove_from_hass(self) -> None:
         """Run when entity will be removed from hass."""
         await super().async_will_remove_from_hass()
 
-        # Disconnect WebSocket
-        if self._websocket:
-            await self._websocket.disconnect()
+        if self._unsubscribe_status is not None:
+            self._unsubscribe_status()
+            self._unsubscribe_status = None
+        self._advancer.cancel()
+
+        # Tell subscribers the stream has ended so they subscribe again to
+        # the entity that replaces this one
+        subscribers, self._subscribers = self._subscribers, []
+        for send in subscribers:
+            send({"type": "removed"})
 
-        # Close API client
-        await self._api_client.close()
+    @callback
+    def _handle_status_message(self, data: dict[str, Any]) -> None:
+        """Handle a routed status message, already parsed by the router."""
+        self._handle_websocket_update(data, self._websocket.status)
 
-    def _handle_websocket_update(self, data: dict[str, Any]) -> None:
-        """Handle WebSocket status update."""
+    def _handle_websocket_update(
+        self, data: dict[str, Any], status: StatusSnapshot | None = None
+    ) -> None:
+        """Handle WebSocket status update (status: data, if already parsed)."""
         _LOGGER.log(TRACE_LEVEL, "WebSocket status update: %s", data)
 
         # Store previous state for change detection
         old_state = self._attr_state
         old_playlist = self._attr_media_playlist
+        old_fingerprint = self._state_fingerprint()
+
+        # Drop only the cached data this update shows to be stale (schedule
+        # started/ended, or a new xSchedule session)
+        invalidated = self._api_client.observe_status(data)
+
+        # Parse once; the rest reacts to typed fields and the diff
+        previous = self._status
+        if status is None:
+            status = StatusSnapshot.from_message(data, previous)
+        self._status = status
+        changed_fields = status.diff(previous)
+        self._advancer.observe(status)
 
         # Update state from status
-        status = data.get("status", "idle").lower()
-        if status == "playing":
-            self._attr_state = MediaPlayerState.PLAYING
-        elif status == "paused":
-            self._attr_state = MediaPlayerState.PAUSED
-        else:
-            self._attr_state = MediaPlayerState.IDLE
+        self._attr_state = status.state
+        if status.state == MediaPlayerState.IDLE:
             # Clear media attributes when idle to prevent stale data
             self._attr_media_title = None
             self._attr_media_playlist = None
@@ -214,81 +294,56 @@ class XScheduleMediaPlayer(MediaPlayerEntity):
             self._time_remaining = None
             # Also clear playlist/queue data if truly stopped (not just between songs)
             # Check: no playlist field AND outputtolights is false
-            if "playlist" not in data and data.get("outputtolights", "false") == "false":
+            if status.playlist is None and not status.output_to_lights:
                 self._current_playlist_steps = []
 
         # Update current media info
-        if "playlist" in data:
-            self._attr_media_playlist = data["playlist"]
+        if status.playlist is not None:
+            self._attr_media_playlist = status.playlist
 
-        if "step" in data:
-            new_song = data["step"]
+        if status.step is not None:
+            new_song = status.step
             # Detect song changes for internal queue management
-            if new_song and new_song != self._previous_song:
+            if "step" in changed_fields and new_song and new_song != self._previous_song:
                 if self._previous_song is not None:  # Skip on first load
                     _LOGGER.debug("Song changed from '%s' to '%s'", self._previous_song, new_song)
                     self._handle_song_started(new_song)
                 self._previous_song = new_song
             self._attr_media_title = new_song
 
-        # Update position and duration (use millisecond fields)
-        if "positionms" in data:
-            # Convert milliseconds to seconds (handle both int and string)
-            try:
-                self._attr_media_position = int(data["positionms"]) / 1000
-                self._attr_media_position_updated_at = dt_util.utcnow()
-            except (ValueError, TypeError):
-                self._attr_media_position = 0
-                self._attr_media_position_updated_at = dt_util.utcnow()
-
-        if "lengthms" in data:
-            # Convert milliseconds to seconds (handle both int and string)
-            try:
-                self._attr_media_duration = int(data["lengthms"]) / 1000
-            except (ValueError, TypeError):
-                self._attr_media_duration = 0
-
-        if "leftms" in data:
-            # Convert milliseconds to seconds (handle both int and string)
-            try:
-                self._time_remaining = int(data["leftms"]) / 1000
-            except (ValueError, TypeError):
-                self._time_remaining = 0
-
-        # Update volume level from status
-        if "volume" in data:
-            # Convert 0-100 to 0-1 (handle both int and string)
-            try:
-                self._attr_volume_level = int(data["volume"]) / 100
-            except (ValueError, TypeError):
-                self._attr_volume_level = None
-
-        # Update controller health status
-        if "pingstatus" in data and isinstance(data["pingstatus"], list):
-            new_status = data["pingstatus"]
-
-            # Only fire event if controller status actually changed
-            if new_status != self._previous_controller_status:
-                self._controller_status = new_status
-                self._previous_controller_status = new_status.copy() if new_status else []
-
-                _LOGGER.debug("Controller status changed: %d controllers found", len(self._controller_status))
-                # Fire event for binary sensors to update (only if entity is attached to hass)
-                if self._hass is not None:
-                    self._hass.bus.async_fire(
-                        f"{DOMAIN}_controller_status_update",
-                        {
-                            "entry_id": self._config_entry.entry_id,
-                            "controllers": self._controller_status,
-                        },
-                    )
-                    _LOGGER.debug("Fired controller_status_update event for %d controllers",
-                                 len(self._controller_status))
-            else:
-                # Status unchanged, just update the reference (no event)
-                self._controller_status = new_status
-
-        # Detect state transitions and invalidate cache
+        # Millisecond fields to seconds; position is applied below, once we
+        # know whether anything else changed
+        reported_position = None
+        if status.position_ms is not None:
+            reported_position = status.position_ms / 1000
+        if status.length_ms is not None:
+            self._attr_media_duration = status.length_ms / 1000
+        if status.left_ms is not None:
+            self._time_remaining = status.left_ms / 1000
+
+        # Update volume level from status (0-100 to 0-1)
+        if status.volume is not None:
+            self._attr_volume_level = status.volume / 100
+
+        # Update controller health status (the binary sensors subscribe to
+        # the WebSocket's pingstatus topic themselves)
+        if "controllers" in changed_fields:
+            self._controller_status = [item.as_dict() for item in status.controllers]
+            _LOGGER.debug("Controller status changed: %d controllers found", len(self._controller_status))
+
+        # Frontends extrapolate position from media_position_updated_at, so a
+        # position that keeps pace with the clock doesn't need a state write
+        changed = self._state_fingerprint() != old_fingerprint
+        if self._restored_queue is not None:
+            changed = self._apply_restored_queue() or changed
+        if reported_position is not None and (
+            changed or self._position_drifted(reported_position, old_state)
+        ):
+            self._attr_media_position = reported_position
+            self._attr_media_position_updated_at = dt_util.utcnow()
+            changed = True
+
+        # Detect state transitions
         if old_state != self._attr_state or old_playlist != self._attr_media_playlist:
             _LOGGER.debug(
                 "State changed: %s → %s, playlist: %s → %s",
@@ -297,44 +352,103 @@ class XScheduleMediaPlayer(MediaPlayerEntity):
                 old_playlist,
                 self._attr_media_playlist,
             )
-            # Invalidate cache when state changes
-            self._api_client.invalidate_cache()
 
-            # Clear entity-level cached playlist steps when playlist changes
-            # This ensures fresh data is fetched for the new playlist
-            if old_playlist != self._attr_media_playlist:
-                self._current_playlist_steps = []
-
-                # Trigger async update to fetch new playlist steps immediately
-                # This prevents the card from showing blank when playlist starts
-                async def fetch_playlist_steps():
-                    """Fetch playlist steps and notify Home Assistant."""
-                    await self.async_update()
-                    # Only schedule state update if entity is still attached to hass
-                    if self.hass is not None:
-                        self.schedule_update_ha_state()
+        # A new server session may have renumbered or edited everything
+        new_session = invalidated >= CACHE_ALL
+        if new_session and self.hass is not None:
+            self.hass.async_create_background_task(
+                self._async_prefetch_catalog(force_refresh=True),
+                "xschedule catalog reload",
+            )
 
-                # Use hass.async_create_task to tie task to HA lifecycle
+        # Playback doesn't change playlist contents, so steps are only
+        # (re)loaded for a new playlist or a new server session
+        if old_playlist != self._attr_media_playlist or new_session:
+            self._current_playlist_steps = []
+            self._steps_from_catalog = False
+
+            # Show the catalog's copy of the steps until fresh ones arrive
+            entry = self._catalog.snapshot.get(self._attr_media_playlist or "")
+            if entry is not None and entry.steps:
+                self._current_playlist_steps = entry.steps
+                self._steps_from_catalog = True
+
+            # Trigger async update to fetch new playlist steps immediately
+            # This prevents the card from showing blank when playlist starts
+            async def fetch_playlist_steps():
+                """Fetch playlist steps and notify Home Assistant."""
+                await self.async_update()
+                # Only schedule state update if entity is still attached to hass
                 if self.hass is not None:
-                    self.hass.async_create_task(fetch_playlist_steps())
+                    self.schedule_update_ha_state()
 
-            # Fire event to notify frontend of cache invalidation
-            if self.hass and self.entity_id:
-                self._hass.bus.fire(
-                    EVENT_CACHE_INVALIDATED,
-                    {
-                        "entity_id": self.entity_id,
-                        "old_state": str(old_state),
-                        "new_state": str(self._attr_state),
-                        "old_playlist": old_playlist,
-                        "new_playlist": self._attr_media_playlist,
-                    },
-                )
+            # Use hass.async_create_task to tie task to HA lifecycle
+            if self.hass is not None:
+                self.hass.async_create_task(fetch_playlist_steps())
+
+        # Tell the frontend which cached data it should refetch
+        if invalidated and self.hass and self.entity_id:
+            self._hass.bus.fire(
+                EVENT_CACHE_INVALIDATED,
+                {
+                    "entity_id": self.entity_id,
+                    "old_state": str(old_state),
+                    "new_state": str(self._attr_state),
+                    "old_playlist": old_playlist,
+                    "new_playlist": self._attr_media_playlist,
+                    "scope": sorted(invalidated),
+                },
+            )
 
         # Schedule entity update with debouncing (only if entity has been added to hass)
-        if self.hass and self.entity_id:
+        if not changed:
+            self._state_writes_skipped += 1
+        elif self.hass and self.entity_id:
             self._schedule_debounced_update()
 
+    def _state_fingerprint(self) -> tuple[Any, ...]:
+        """Return the fields whose change always warrants a state write."""
+        return (
+            self._attr_state,
+            self._attr_media_title,
+            self._attr_media_playlist,
+            self._attr_media_duration,
+            self._attr_volume_level,
+            self._attr_is_volume_muted,
+            self._internal_queue.version,
+            self._controller_status,
+        )
+
+    def _position_drifted(self, position: float, old_state: MediaPlayerState) -> bool:
+        """Return True if position strays from the last written one's extrapolation."""
+        if (
+            self._position_drift <= 0
+            or self._attr_media_position is None
+            or self._attr_media_position_updated_at is None
+        ):
+            return True
+
+        expected = self._attr_media_position
+        if old_state == MediaPlayerState.PLAYING:
+            elapsed = dt_util.utcnow() - self._attr_media_position_updated_at
+            expected += elapsed.total_seconds()
+        return abs(position - expected) > self._position_drift
+
+    @property
+    def state_writes_skipped(self) -> int:
+        """Status updates that changed nothing beyond the extrapolated position."""
+        return self._state_writes_skipped
+
+    @property
+    def queue_advance_stats(self) -> dict[str, Any]:
+        """Jumps that armed the next queued song, retries, and steps missed."""
+        return {
+            "armed": self._advancer.armed,
+            "jumps": self._advancer.jumps,
+            "retries": self._advancer.retries,
+            "missed": self._advancer.missed,
+        }
+
     def _schedule_debounced_update(self) -> None:
         """Schedule a debounced update to avoid excessive state updates.
 
@@ -369,22 +483,25 @@ class XScheduleMediaPlayer(MediaPlayerEntity):
         or when WebSocket is disconnected.
         """
         try:
-            # Get playing status (only if WebSocket not connected)
-            if not self._websocket or not self._websocket.connected:
-                status = await self._api_client.get_playing_status()
-                self._handle_websocket_update(status)
+            # Get playing status (only if WebSocket not connected); the
+            # status topic delivers it here and to every other subscriber
+            if not self._websocket.connected:
+                await self._hub.async_refresh_status()
 
             # Only fetch playlists if we don't have them yet
             # Frontend can force refresh via services if needed
             if not self._playlists:
                 self._playlists = await self._api_client.get_playlists()
 
-            # Get current playlist steps only if playlist is playing
-            # and we don't already have them cached
-            if self._attr_media_playlist and not self._current_playlist_steps:
-                self._current_playlist_steps = await self._api_client.get_playlist_steps(
+            # Get current playlist steps only if playlist is playing and we
+            # don't already have them, or only have the catalog's copy
+            if self._attr_media_playlist and (
+                not self._current_playlist_steps or self._steps_from_catalog
+            ):
+                self._current_playlist_steps = await self._catalog.async_get_steps(
                     self._attr_media_playlist
                 )
+                self._steps_from_catalog = False
 
         except XScheduleAPIError as err:
             _LOGGER.error("Error updating xSchedule state: %s", err)
@@ -410,36 +527,86 @@ class XScheduleMediaPlayer(MediaPlayerEntity):
             "source_list": self._playlists or [],  # Available playlists for frontend selector
         }
 
-        # Add current playlist steps (always include for frontend compatibility)
-        attributes["playlist_songs"] = [
-            {
-                "name": step.get("name"),
-                "duration": int(step.get("lengthms") or 0),  # Convert string to int milliseconds
-            }
-            for step in (self._current_playlist_steps or [])
-        ]
+        # Add current playlist steps. The lists stay attributes (for templates,
+        # automations and other cards) even while xschedule/subscribe streams
+        # them; they are only kept out of the recorder.
+        attributes["playlist_songs"] = self._steps.songs
 
         # Track current song position in playlist (1-indexed)
-        if self._attr_media_title and self._current_playlist_steps:
-            for idx, step in enumerate(self._current_playlist_steps, 1):
-                if step.get("name") == self._attr_media_title:
-                    attributes["media_track"] = idx
-                    break
+        track = self._steps.index(self._attr_media_title) if self._attr_media_title else None
+        if track is not None:
+            attributes["media_track"] = track + 1
 
         # Add internal queue (in-memory, managed by integration)
-        attributes["internal_queue"] = [
-            {
-                "id": item["id"],
-                "name": item["name"],
-                "playlist": item["playlist"],
-                "priority": item["priority"],
-                "duration": int(item.get("lengthms") or 0),  # Convert string to int milliseconds
-            }
-            for item in (self._internal_queue or [])
-        ]
+        attributes["internal_queue"] = self._internal_queue.as_attribute()
 
         return attributes
 
+    @property
+    def subscription_state(self) -> dict[str, Any]:
+        """Return the fields pushed to xschedule/subscribe clients."""
+        updated_at = self._attr_media_position_updated_at
+        return {
+            "state": self.state,
+            "media_position": self._attr_media_position,
+            "media_position_updated_at": updated_at.isoformat() if updated_at else None,
+            "media_duration": self._attr_media_duration,
+            "volume_level": self._attr_volume_level,
+            "is_volume_muted": self._attr_is_volume_muted,
+            **self.extra_state_attributes,
+        }
+
+    @callback
+    def async_subscribe(
+        self, send: Callable[[dict[str, Any]], None]
+    ) -> Callable[[], None]:
+        """Send the current state to send, then only the fields that change.
+
+        Messages are {"type": "snapshot", "state": {...}} once, then
+        {"type": "delta", "changes": {...}, "removed": [...]} after each
+        state write that changed something, and {"type": "removed"} last
+        when the entity is removed or reloaded.
+        """
+        state = self.subscription_state
+        if not self._subscribers:
+            self._published = state
+        self._subscribers.append(send)
+        send({"type": "snapshot", "state": state})
+
+        @callback
+        def unsubscribe() -> None:
+            if send in self._subscribers:
+                self._subscribers.remove(send)
+
+        return unsubscribe
+
+    @callback
+    def async_write_ha_state(self) -> None:
+        """Write the state, then push changed fields to subscribers."""
+        super().async_write_ha_state()
+        self._async_publish()
+
+    @callback
+    def _async_publish(self) -> None:
+        """Push fields that changed since the last push."""
+        if not self._subscribers:
+            return
+        state = self.subscription_state
+        published, self._published = self._published, state
+        changes = {
+            key: value
+            for key, value in state.items()
+            if key not in published or published[key] != value
+        }
+        removed = [key for key in published if key not in state]
+        if not changes and not removed:
+            return
+        message: dict[str, Any] = {"type": "delta", "changes": changes}
+        if removed:
+            message["removed"] = removed
+        for send in list(self._subscribers):
+            send(message)
+
     # Playback control methods
 
     async def async_media_play(self) -> None:
@@ -447,18 +614,9 @@ class XScheduleMediaPlayer(MediaPlayerEntity):
         try:
             # If a playlist is selected, play it; otherwise resume
             if self._attr_media_playlist:
-                if self._websocket and self._websocket.connected:
-                    await self._websocket.send_command(
-                        "Play specified playlist", self._attr_media_playlist
-                    )
-                else:
-                    await self._api_client.play_playlist(self._attr_media_playlist)
+                await self._api_client.play_playlist(self._attr_media_playlist)
             else:
-                # Just send play/resume command
-                if self._websocket and self._websocket.connected:
-                    await self._websocket.send_command("Play")
-                else:
-                    await self._api_client.command("Play")
+                await self._api_client.command("Play")
 
             self._hass.bus.fire(
                 EVENT_PLAY,
@@ -471,10 +629,7 @@ class XScheduleMediaPlayer(MediaPlayerEntity):
     async def async_media_pause(self) -> None:
         """Send pause command."""
         try:
-            if self._websocket and self._websocket.connected:
-                await self._websocket.send_command("Pause")
-            else:
-                await self._api_client.pause()
+            await self._api_client.pause()
 
             self._hass.bus.fire(EVENT_PAUSE, {"entity_id": self.entity_id})
 
@@ -484,10 +639,7 @@ class XScheduleMediaPlayer(MediaPlayerEntity):
     async def async_media_stop(self) -> None:
         """Send stop command."""
         try:
-            if self._websocket and self._websocket.connected:
-                await self._websocket.send_command("Stop")
-            else:
-                await self._api_client.stop()
+            await self._api_client.stop()
 
             self._hass.bus.fire(EVENT_STOP, {"entity_id": self.entity_id})
 
@@ -497,10 +649,7 @@ class XScheduleMediaPlayer(MediaPlayerEntity):
     async def async_turn_off(self) -> None:
         """Turn off - stop all playlists, schedules, and empty queue."""
         try:
-            if self._websocket and self._websocket.connected:
-                await self._websocket.send_command("Stop all now")
-            else:
-                await self._api_client.stop_all_now()
+            await self._api_client.stop_all_now()
 
             _LOGGER.info("Executed 'Stop all now' command")
 
@@ -510,10 +659,7 @@ class XScheduleMediaPlayer(MediaPlayerEntity):
     async def async_media_next_track(self) -> None:
         """Send next track command."""
         try:
-            if self._websocket and self._websocket.connected:
-                await self._websocket.send_command("Next step in current playlist")
-            else:
-                await self._api_client.next_step()
+            await self._api_client.next_step()
 
             self._hass.bus.fire(EVENT_NEXT, {"entity_id": self.entity_id})
 
@@ -523,10 +669,7 @@ class XScheduleMediaPlayer(MediaPlayerEntity):
     async def async_media_previous_track(self) -> None:
         """Send previous track command."""
         try:
-            if self._websocket and self._websocket.connected:
-                await self._websocket.send_command("Prior step in current playlist")
-            else:
-                await self._api_client.previous_step()
+            await self._api_client.previous_step()
 
             self._hass.bus.fire(EVENT_PREVIOUS, {"entity_id": self.entity_id})
 
@@ -538,13 +681,7 @@ class XScheduleMediaPlayer(MediaPlayerEntity):
         try:
             # Convert seconds to milliseconds
             position_ms = int(position * 1000)
-
-            if self._websocket and self._websocket.connected:
-                await self._websocket.send_command(
-                    "Set step position ms", str(position_ms)
-                )
-            else:
-                await self._api_client.set_step_position(position_ms)
+            await self._api_client.set_step_position(position_ms)
 
             self._hass.bus.fire(
                 EVENT_SEEK,
@@ -557,14 +694,9 @@ class XScheduleMediaPlayer(MediaPlayerEntity):
     async def async_select_source(self, source: str) -> None:
         """Select playlist (source) to play."""
         try:
-            if self._websocket and self._websocket.connected:
-                await self._websocket.send_command("Play specified playlist", source)
-            else:
-                await self._api_client.play_playlist(source)
+            await self._api_client.play_playlist(source)
 
             self._attr_media_playlist = source
-            # Invalidate cache when playlist changes
-            self._api_client.invalidate_cache(source)
             self._hass.bus.fire(
                 EVENT_PLAYLIST_CHANGED,
                 {"entity_id": self.entity_id, "playlist": source},
@@ -580,13 +712,7 @@ class XScheduleMediaPlayer(MediaPlayerEntity):
         try:
             # Convert 0-1 to 0-100
             volume_percent = int(volume * 100)
-
-            if self._websocket and self._websocket.connected:
-                await self._websocket.send_command(
-                    "Set volume to", str(volume_percent)
-                )
-            else:
-                await self._api_client.set_volume(volume_percent)
+            await self._api_client.set_volume(volume_percent)
 
             self._attr_volume_level = volume
             self._hass.bus.fire(
@@ -602,10 +728,7 @@ class XScheduleMediaPlayer(MediaPlayerEntity):
         try:
             # xSchedule only has toggle mute, so check current state
             if mute != self._attr_is_volume_muted:
-                if self._websocket and self._websocket.connected:
-                    await self._websocket.send_command("Toggle mute")
-                else:
-                    await self._api_client.toggle_mute()
+                await self._api_client.toggle_mute()
 
                 self._attr_is_volume_muted = mute
                 self._hass.bus.fire(
@@ -621,15 +744,8 @@ class XScheduleMediaPlayer(MediaPlayerEntity):
     async def async_play_song(self, playlist: str, song: str) -> None:
         """Play a specific song (step) from a playlist."""
         try:
-            if self._websocket and self._websocket.connected:
-                await self._websocket.send_command(
-                    "Play playlist step", f"{playlist},{song}"
-                )
-            else:
-                await self._api_client.play_playlist_step(playlist, song)
+            await self._api_client.play_playlist_step(playlist, song)
 
-            # Invalidate cache when playing a song
-            self._api_client.invalidate_cache(playlist)
             self._hass.bus.fire(
                 EVENT_PLAY,
                 {
@@ -647,11 +763,8 @@ class XScheduleMediaPlayer(MediaPlayerEntity):
         """Jump to specified step in current playlist at end of current step."""
         try:
             _LOGGER.debug("Jump to step called: step='%s'", step)
-            # Use REST API for now - WebSocket format needs investigation
-            # WebSocket was returning: {'result': 'failed', 'reference': '', 'message': 'Empty request.'}
-            _LOGGER.debug("Sending via REST API: step='%s'", step)
             result = await self._api_client.jump_to_step_at_end(step)
-            
+
             # Check if command succeeded
             if isinstance(result, dict):
                 if result.get("result") == "ok":
@@ -671,160 +784,333 @@ class XScheduleMediaPlayer(MediaPlayerEntity):
 
     # Internal Queue Management Methods
 
+    async def _async_ensure_steps(self, playlist: str) -> None:
+        """Load the playing playlist's steps if they aren't yet."""
+        if self._current_playlist_steps:
+            return
+        try:
+            self._current_playlist_steps = await self._api_client.get_playlist_steps(playlist)
+        except XScheduleAPIError as err:
+            raise XScheduleAPIError(f"Failed to fetch playlist steps: {err}")
+
     async def async_add_to_internal_queue(self, song_name: str) -> None:
         """Add song to internal queue with priority management."""
-        _LOGGER.debug("Adding '%s' to internal queue", song_name)
+        async with self._queue_lock:
+            _LOGGER.debug("Adding '%s' to internal queue", song_name)
         
-        # 1. Validate song is in current playlist
-        current_playlist = self._attr_media_playlist
-        if not current_playlist:
-            raise XScheduleAPIError("No playlist currently playing")
+            # 1. Validate song is in current playlist
+            current_playlist = self._attr_media_playlist
+            if not current_playlist:
+                raise XScheduleAPIError("No playlist currently playing")
         
-        # Check if song exists in current playlist
-        if not self._current_playlist_steps:
-            # Fetch playlist steps if not already loaded
-            try:
-                steps = await self._api_client.get_playlist_steps(current_playlist)
-                self._current_playlist_steps = steps
-            except XScheduleAPIError as err:
-                raise XScheduleAPIError(f"Failed to fetch playlist steps: {err}")
+            # Check if song exists in current playlist
+            await self._async_ensure_steps(current_playlist)
         
-        song_exists = any(step.get("name") == song_name for step in self._current_playlist_steps)
-        if not song_exists:
-            raise XScheduleAPIError(f"Song '{song_name}' not found in current playlist '{current_playlist}'")
+            if song_name not in self._steps:
+                raise XScheduleAPIError(f"Song '{song_name}' not found in current playlist '{current_playlist}'")
         
-        # 2. Check for duplicates - if exists, bump priority
-        existing_item = next((item for item in self._internal_queue if item["name"] == song_name), None)
-        if existing_item:
-            _LOGGER.info("Song '%s' already in queue, bumping priority", song_name)
-            existing_item["priority"] += 1
-            # Re-sort queue by priority (highest first)
-            self._internal_queue.sort(key=lambda x: x["priority"], reverse=True)
-        else:
-            # 4. Add to queue with UUID
-            song_data = next((step for step in self._current_playlist_steps if step.get("name") == song_name), {})
-            queue_item = {
-                "id": str(uuid.uuid4()),
-                "name": song_name,
-                "playlist": current_playlist,
-                "priority": 1,
-                "lengthms": song_data.get("lengthms", "0")
-            }
-            self._internal_queue.append(queue_item)
-            _LOGGER.info("Added '%s' to internal queue with id %s", song_name, queue_item["id"])
+            # 2. Check for duplicates - if exists, bump priority
+            existing_item = self._internal_queue.find(song_name)
+            if existing_item:
+                _LOGGER.info("Song '%s' already in queue, bumping priority", song_name)
+                self._internal_queue.bump(existing_item["id"])
+            else:
+                # 4. Add to queue with UUID
+                queue_item = self._internal_queue.add(
+                    song_name, current_playlist, str(self._steps.duration(song_name))
+                )
+                _LOGGER.info("Added '%s' to internal queue with id %s", song_name, queue_item["id"])
         
-        # 3. If first song (or only song after priority bump), issue jump command immediately
-        is_first = self._internal_queue[0]["name"] == song_name
-        if is_first:
-            try:
-                _LOGGER.info("Issuing jump command for '%s' (top of queue)", song_name)
-                await self.async_jump_to_step(song_name)
-            except XScheduleAPIError as err:
-                _LOGGER.error("Failed to jump to '%s': %s", song_name, err)
-                # Don't remove from queue - let user retry or remove manually
-                raise XScheduleAPIError(f"Failed to jump to song: {err}")
+            # 3. If first song (or only song after priority bump), issue jump command immediately
+            is_first = self._internal_queue.head["name"] == song_name
+            if is_first:
+                try:
+                    _LOGGER.info("Issuing jump command for '%s' (top of queue)", song_name)
+                    await self._advancer.async_arm(song_name)
+                except XScheduleAPIError as err:
+                    _LOGGER.error("Failed to jump to '%s': %s", song_name, err)
+                    # Don't remove from queue - let user retry or remove manually
+                    raise XScheduleAPIError(f"Failed to jump to song: {err}")
         
-        # 6. Update state (triggers state change event)
-        if self.hass is not None:
-            self.async_write_ha_state()
+            # 6. Update state (triggers state change event)
+            if self.hass is not None:
+                self.async_write_ha_state()
 
     async def async_remove_from_internal_queue(self, queue_item_id: str) -> None:
         """Remove specific item from internal queue by UUID."""
-        _LOGGER.debug("Removing queue item with id '%s'", queue_item_id)
+        async with self._queue_lock:
+            _LOGGER.debug("Removing queue item with id '%s'", queue_item_id)
         
-        # Find and remove item
-        item = next((item for item in self._internal_queue if item["id"] == queue_item_id), None)
-        if not item:
-            raise XScheduleAPIError(f"Queue item with id '{queue_item_id}' not found")
+            # Find and remove item
+            old_head = self._internal_queue.head
+            item = self._internal_queue.remove(queue_item_id)
+            if not item:
+                raise XScheduleAPIError(f"Queue item with id '{queue_item_id}' not found")
         
-        self._internal_queue.remove(item)
-        _LOGGER.info("Removed '%s' from internal queue", item["name"])
+            _LOGGER.info("Removed '%s' from internal queue", item["name"])
         
-        # Update state
-        if self.hass is not None:
-            self.async_write_ha_state()
+            # Update state
+            if self.hass is not None:
+                self.async_write_ha_state()
+
+            # The removed song may be the one armed to play next
+            if item is old_head:
+                await self._async_rearm_head()
 
     async def async_reorder_internal_queue(self, queue_item_ids: list[str]) -> None:
         """Reorder internal queue items."""
-        _LOGGER.debug("Reordering queue: %s", queue_item_ids)
-        
-        # 1. Validate all IDs exist
-        for queue_id in queue_item_ids:
-            if not any(item["id"] == queue_id for item in self._internal_queue):
-                raise XScheduleAPIError(f"Queue item with id '{queue_id}' not found")
+        async with self._queue_lock:
+            _LOGGER.debug("Reordering queue: %s", queue_item_ids)
         
-        # Validate count matches
-        if len(queue_item_ids) != len(self._internal_queue):
-            raise XScheduleAPIError(
-                f"Invalid reorder: expected {len(self._internal_queue)} items, got {len(queue_item_ids)}"
-            )
+            # 1. Validate all IDs exist
+            for queue_id in queue_item_ids:
+                if self._internal_queue.get(queue_id) is None:
+                    raise XScheduleAPIError(f"Queue item with id '{queue_id}' not found")
         
-        # Store old first item
-        old_first_id = self._internal_queue[0]["id"] if self._internal_queue else None
+            # Validate count matches
+            if len(queue_item_ids) != len(self._internal_queue):
+                raise XScheduleAPIError(
+                    f"Invalid reorder: expected {len(self._internal_queue)} items, got {len(queue_item_ids)}"
+                )
         
-        # 2. Reorder internal list
-        id_to_item = {item["id"]: item for item in self._internal_queue}
-        self._internal_queue = [id_to_item[queue_id] for queue_id in queue_item_ids]
-        _LOGGER.info("Reordered internal queue")
+            # Store old first item
+            old_first = self._internal_queue.head
         
-        # 3. If first item changed, issue jump command
-        new_first_id = self._internal_queue[0]["id"] if self._internal_queue else None
-        if old_first_id != new_first_id and new_first_id:
-            new_first_song = self._internal_queue[0]["name"]
+            # 2. Reorder internal list
             try:
-                _LOGGER.info("First item changed to '%s', issuing jump command", new_first_song)
-                await self.async_jump_to_step(new_first_song)
-            except XScheduleAPIError as err:
-                _LOGGER.error("Failed to jump to '%s': %s", new_first_song, err)
-                # Don't revert reorder - let user fix manually
-                raise XScheduleAPIError(f"Reordered but failed to jump: {err}")
+                self._internal_queue.reorder(queue_item_ids)
+            except ValueError as err:
+                raise XScheduleAPIError(f"Invalid reorder: {err}") from err
+            _LOGGER.info("Reordered internal queue")
         
-        # Update state
-        if self.hass is not None:
-            self.async_write_ha_state()
+            # 3. If first item changed, issue jump command
+            new_first = self._internal_queue.head
+            if new_first is not None and new_first is not old_first:
+                new_first_song = new_first["name"]
+                try:
+                    _LOGGER.info("First item changed to '%s', issuing jump command", new_first_song)
+                    await self._advancer.async_arm(new_first_song)
+                except XScheduleAPIError as err:
+                    _LOGGER.error("Failed to jump to '%s': %s", new_first_song, err)
+                    # Don't revert reorder - let user fix manually
+                    raise XScheduleAPIError(f"Reordered but failed to jump: {err}")
+        
+            # Update state
+            if self.hass is not None:
+                self.async_write_ha_state()
 
     async def async_clear_internal_queue(self) -> None:
         """Clear entire internal queue."""
-        _LOGGER.info("Clearing internal queue (%d items)", len(self._internal_queue))
-        self._internal_queue = []
-        if self.hass is not None:
-            self.async_write_ha_state()
+        async with self._queue_lock:
+            _LOGGER.info("Clearing internal queue (%d items)", len(self._internal_queue))
+            self._internal_queue.clear()
+            self._advancer.cancel()
+            if self.hass is not None:
+                self.async_write_ha_state()
+
+    async def async_add_many_to_internal_queue(self, songs: list[str]) -> None:
+        """Add several songs to the internal queue in one batch."""
+        await self.async_apply_queue_ops([{"op": "add", "song": song} for song in songs])
+
+    async def async_apply_queue_ops(self, operations: list[dict[str, Any]]) -> None:
+        """Apply queue operations all-or-nothing.
+
+        Each operation is a dict with op (add, remove, bump or move) and
+        song or queue_item_id; move also takes position. They run against a
+        copy of the queue, so a failing one leaves the queue untouched.
+        Whatever the batch size, the state is written and saved once, and
+        at most one jump is issued, to the final head.
+        """
+        async with self._queue_lock:
+            if any(operation["op"] == "add" for operation in operations):
+                if not self._attr_media_playlist:
+                    raise XScheduleAPIError("No playlist currently playing")
+                await self._async_ensure_steps(self._attr_media_playlist)
+
+            queue = self._internal_queue.copy()
+            for index, operation in enumerate(operations):
+                try:
+                    self._apply_queue_op(queue, operation)
+                except XScheduleAPIError as err:
+                    raise XScheduleAPIError(
+                        f"Operation {index + 1} ({operation['op']}) failed: {err}"
+                    ) from err
+
+            old_head = self._internal_queue.head
+            self._internal_queue = InternalQueue(
+                queue.ordered, queue.manual, on_change=self._schedule_queue_save
+            )
+            self._schedule_queue_save()
+            _LOGGER.info(
+                "Applied %d queue operations (%d items queued)",
+                len(operations),
+                len(self._internal_queue),
+            )
+            if self.hass is not None:
+                self.async_write_ha_state()
+
+            new_head = self._internal_queue.head
+            if new_head is None:
+                self._advancer.cancel()
+            elif old_head is None or new_head["id"] != old_head["id"]:
+                await self._async_rearm_head("Queue updated but failed to jump")
+
+    async def _async_rearm_head(self, failure: str = "Failed to jump to song") -> None:
+        """Arm the new head of the queue to play next, or nothing if it's empty.
+
+        Must be called with the queue lock held.
+        """
+        head = self._internal_queue.head
+        if head is None:
+            self._advancer.cancel()
+            return
+        try:
+            _LOGGER.info("Head of queue is now '%s', issuing jump command", head["name"])
+            await self._advancer.async_arm(head["name"])
+        except XScheduleAPIError as err:
+            _LOGGER.error("Failed to jump to '%s': %s", head["name"], err)
+            raise XScheduleAPIError(f"{failure}: {err}")
+
+    def _apply_queue_op(self, queue: InternalQueue, operation: dict[str, Any]) -> None:
+        """Apply one queue operation to queue."""
+        op = operation["op"]
+        song = operation.get("song")
+        if op == "add":
+            if not song or song not in self._steps:
+                raise XScheduleAPIError(
+                    f"Song '{song}' not found in current playlist '{self._attr_media_playlist}'"
+                )
+            existing = queue.find(song)
+            if existing is not None:
+                queue.bump(existing["id"])
+            else:
+                queue.add(song, self._attr_media_playlist, str(self._steps.duration(song)))
+            return
+
+        queue_item_id = operation.get("queue_item_id")
+        if queue_item_id:
+            item = queue.get(queue_item_id)
+        elif song:
+            item = queue.find(song)
+        else:
+            raise XScheduleAPIError("Needs a song or queue_item_id")
+        if item is None:
+            raise XScheduleAPIError(f"'{queue_item_id or song}' is not queued")
+
+        if op == "remove":
+            queue.remove(item["id"])
+        elif op == "bump":
+            queue.bump(item["id"])
+        elif op == "move":
+            if operation.get("position") is None:
+                raise XScheduleAPIError("Move needs a position")
+            queue.move(item["id"], operation["position"])
+        else:
+            raise XScheduleAPIError(f"Unknown operation '{op}'")
 
     def _handle_song_started(self, song_name: str) -> None:
-        """Handle song start - remove from queue and advance if needed."""
+        """Handle song start - remove it from the queue and arm the next one.
+
+        The head is armed at the start of every step, not only after a
+        queued song, so a jump that was lost (or undone by a manual skip)
+        is put back while there is still time.
+        """
         if not self._internal_queue:
             return
         
         # Search queue for matching song name
-        matching_item = next((item for item in self._internal_queue if item["name"] == song_name), None)
-        if not matching_item:
-            return  # Song not in queue
-        
-        _LOGGER.info("Song '%s' started playing, removing from queue", song_name)
-        self._internal_queue.remove(matching_item)
+        matching_item = self._internal_queue.find(song_name)
+        if matching_item:
+            _LOGGER.info("Song '%s' started playing, removing from queue", song_name)
+            self._internal_queue.remove(matching_item["id"])
+
+        # Songs queued from another playlist can't be jumped to from this one
+        stale = [
+            item
+            for item in self._internal_queue
+            if self._attr_media_playlist and item["playlist"] != self._attr_media_playlist
+        ]
+        for item in stale:
+            _LOGGER.info(
+                "Dropping '%s' from the queue: it is in '%s', not '%s'",
+                item["name"], item["playlist"], self._attr_media_playlist,
+            )
+            self._internal_queue.remove(item["id"])
         
-        # If queue not empty, issue jump for next song
+        # If queue not empty, have the next song follow this one
         if self._internal_queue:
-            next_song = self._internal_queue[0]["name"]
-            _LOGGER.info("Queue has %d items remaining, scheduling jump to '%s'", 
+            next_song = self._internal_queue.head["name"]
+            _LOGGER.info("Queue has %d items remaining, arming '%s'",
                         len(self._internal_queue), next_song)
-            # Schedule jump command asynchronously
-            asyncio.create_task(self._jump_to_next_queued_song(next_song))
+            self._advancer.arm(next_song)
         else:
             _LOGGER.info("Queue is now empty")
         
         # Update state
+        if (matching_item or stale) and self.hass is not None:
+            self.async_write_ha_state()
+
+    @callback
+    def _handle_jump_rejected(self, song_name: str) -> None:
+        """Drop a queued song xSchedule refused to jump to, and arm the next.
+
+        A batch holding the queue lock re-arms its own head, so it is left
+        alone.
+        """
+        head = self._internal_queue.head
+        if head is None or head["name"] != song_name or self._queue_lock.locked():
+            return
+        _LOGGER.warning("Dropping '%s' from the queue: xSchedule can't jump to it", song_name)
+        self._internal_queue.remove(head["id"])
+        if self._internal_queue:
+            self._advancer.arm(self._internal_queue.head["name"])
         if self.hass is not None:
             self.async_write_ha_state()
 
-    async def _jump_to_next_queued_song(self, song_name: str) -> None:
-        """Jump to the next queued song (helper for async scheduling)."""
-        try:
-            await self.async_jump_to_step(song_name)
-        except XScheduleAPIError as err:
-            _LOGGER.error("Failed to auto-advance to '%s': %s", song_name, err)
-            # Keep in queue for manual retry
+    @callback
+    def _schedule_queue_save(self) -> None:
+        """Save the internal queue once a burst of changes has settled."""
+        if self._queue_store is not None:
+            self._queue_store.async_delay_save(self._queue_data, QUEUE_SAVE_DELAY)
+
+    def _queue_data(self) -> dict[str, Any]:
+        """Return the internal queue in its storage format."""
+        return self._internal_queue.as_dict()
+
+    def _apply_restored_queue(self) -> bool:
+        """Install the queue saved by the previous run, checked against status.
+
+        Songs from a playlist other than the one playing, songs no longer in
+        it and the song already playing are dropped. The jump to the head is
+        issued again, as the one before the restart may never have landed.
+        Returns True if the queue changed.
+        """
+        saved = InternalQueue.from_dict(self._restored_queue)
+        self._restored_queue = None
+        kept = [
+            item
+            for item in saved
+            if item["playlist"] == self._attr_media_playlist
+            and item["name"] != self._attr_media_title
+            and (not self._steps or item["name"] in self._steps)
+        ]
+        if len(kept) < len(saved):
+            _LOGGER.info(
+                "Dropped %d restored queue items no longer playable in '%s'",
+                len(saved) - len(kept),
+                self._attr_media_playlist,
+            )
+            self._schedule_queue_save()
+        if not kept:
+            return False
 
+        self._internal_queue = InternalQueue(
+            kept, saved.manual, on_change=self._schedule_queue_save
+        )
+        head = self._internal_queue.head["name"]
+        _LOGGER.info("Restored %d queued songs, next up '%s'", len(kept), head)
+        self._advancer.arm(head)
+        return True
 
     async def async_browse_media(
         self,
@@ -836,7 +1122,7 @@ class XScheduleMediaPlayer(MediaPlayerEntity):
             "Browse media called: type=%s, id=%s", media_content_type, media_content_id
         )
 
-        # Root level: Show all playlists
+        # Root level: Show all playlists (from the prefetched catalog when loaded)
         if media_content_type is None:
             return await self._async_build_playlists_browser()
 
@@ -851,7 +1137,7 @@ class XScheduleMediaPlayer(MediaPlayerEntity):
         """Build root level showing all playlists."""
         children = []
 
-        for playlist_name in self._playlists:
+        for playlist_name in self._catalog.snapshot.names or self._playlists:
             children.append(
                 BrowseMedia(
                     can_expand=True,
@@ -881,17 +1167,17 @@ class XScheduleMediaPlayer(MediaPlayerEntity):
         self, playlist_name: str
     ) -> BrowseMedia:
         """Build songs list for a specific playlist."""
-        # Fetch playlist steps via API
+        # Fetch playlist steps via the catalog
         try:
-            steps_data = await self._api_client.get_playlist_steps(playlist_name)
+            steps_data = await self._catalog.async_get_steps(playlist_name)
         except Exception as err:
             _LOGGER.error("Error fetching playlist steps for %s: %s", playlist_name, err)
             steps_data = []
 
+        steps = StepCatalog(steps_data)
         children = []
-        for step in steps_data:
+        for step, duration_ms in zip(steps.steps, steps.durations):
             step_name = step.get("name", "Unknown")
-            duration_ms = int(step.get("lengthms") or 0)
 
             browse_item = BrowseMedia(
                 can_expand=False,
@@ -927,7 +1213,6 @@ class XScheduleMediaPlayer(MediaPlayerEntity):
     ) -> None:
         """Play media from media browser."""
         _LOGGER.info("Play media called: type=%s, id=%s, kwargs=%s", media_type, media_id, kwargs)
-        _LOGGER.info("WebSocket connected: %s", self._websocket and self._websocket.connected if self._websocket else False)
 
         # Parse media_id
         if "|||" in media_id:
@@ -935,23 +1220,11 @@ class XScheduleMediaPlayer(MediaPlayerEntity):
             playlist, song = media_id.split("|||", 1)
 
             try:
-                # Use WebSocket for async command
-                if self._websocket and self._websocket.connected:
-                    _LOGGER.info("Sending WebSocket command: Play playlist step with params: %s,%s", playlist, song)
-                    result = await self._websocket.send_command(
-                        "Play playlist step", f"{playlist},{song}"
-                    )
-                    _LOGGER.info("WebSocket command result: %s", result)
-                else:
-                    # Fallback to REST API
-                    _LOGGER.info("Using REST API fallback: play_playlist_step(%s, %s)", playlist, song)
-                    result = await self._api_client.play_playlist_step(playlist, song)
-                    _LOGGER.info("REST API result: %s", result)
+                result = await self._api_client.play_playlist_step(playlist, song)
+                _LOGGER.debug("Play playlist step result: %s", result)
 
                 _LOGGER.info("Successfully played song %s from playlist %s", song, playlist)
 
-                # Invalidate cache
-                self._api_client.invalidate_cache(playlist)
                 self._hass.bus.fire(
                     EVENT_PLAY,
                     {
@@ -968,14 +1241,8 @@ class XScheduleMediaPlayer(MediaPlayerEntity):
             playlist = media_id
 
             try:
-                if self._websocket and self._websocket.connected:
-                    _LOGGER.info("Sending WebSocket command: Play specified playlist with params: %s", playlist)
-                    result = await self._websocket.send_command("Play specified playlist", playlist)
-                    _LOGGER.info("WebSocket command result: %s", result)
-                else:
-                    _LOGGER.info("Using REST API fallback: play_playlist(%s)", playlist)
-                    result = await self._api_client.play_playlist(playlist)
-                    _LOGGER.info("REST API result: %s", result)
+                result = await self._api_client.play_playlist(playlist)
+                _LOGGER.debug("Play specified playlist result: %s", result)
 
                 _LOGGER.info("Successfully played playlist %s", playlist)
 
@@ -990,7 +1257,22 @@ class XScheduleMediaPlayer(MediaPlayerEntity):
     async def async_get_playlist_schedules(self, playlist: str, force_refresh: bool = False) -> list[dict[str, Any]]:
         """Get schedule information for a playlist."""
         try:
-            return await self._api_client.get_playlist_schedules(playlist, force_refresh)
+            return await self._catalog.async_get_schedules(playlist, force_refresh)
         except XScheduleAPIError as err:
             _LOGGER.error("Error getting playlist schedules: %s", err)
             return []
+
+    async def async_get_playlists_with_metadata(self, force_refresh: bool = False) -> list[dict[str, Any]]:
+        """Get playlist objects with metadata (duration, loop status, etc.)."""
+        return await self._catalog.async_get_playlists(force_refresh)
+
+    async def async_get_catalog(self, force_refresh: bool = False) -> dict[str, Any]:
+        """Get every playlist with its duration, steps and schedule to show."""
+        try:
+            snapshot = await self._catalog.async_load(
+                priority=self._attr_media_playlist, force_refresh=force_refresh
+            )
+        except XScheduleAPIError as err:
+            _LOGGER.error("Error loading playlist catalog: %s", err)
+            snapshot = self._catalog.snapshot
+        return snapshot.as_response()
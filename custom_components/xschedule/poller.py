@@ -0,0 +1,94 @@
+"""REST status polling while the xSchedule WebSocket is down."""
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from .api_client import XScheduleAPIError
+from .const import POLL_INTERVAL_IDLE
+
+_LOGGER = logging.getLogger(__name__)
+
+# Fields that change on every reply without saying anything about playback
+_VOLATILE_FIELDS = frozenset({"time"})
+
+
+class StatusPoller:
+    """Polls GetPlayingStatus at an interval chosen after each reply.
+
+    Replies identical to the previous one (apart from the clock) are not
+    passed on, so a paused or idle player costs one request per interval
+    and nothing else. stop() cancels the poll in flight, so a reconnected
+    WebSocket takes over at once.
+    """
+
+    def __init__(
+        self,
+        poll: Callable[[], Awaitable[dict[str, Any]]],
+        on_status: Callable[[dict[str, Any]], None],
+        interval: Callable[[], float],
+    ) -> None:
+        """Initialize the poller."""
+        self._poll = poll
+        self._on_status = on_status
+        self._interval = interval
+        self._task: asyncio.Task | None = None
+        self._last: dict[str, Any] | None = None
+        self.polls = 0
+        self.unchanged = 0
+        self.failures = 0
+
+    @property
+    def running(self) -> bool:
+        """Return True while polling."""
+        return self._task is not None and not self._task.done()
+
+    def start(self, delay: float | None = None) -> None:
+        """Start polling after delay (default: one interval)."""
+        if self.running:
+            return
+        _LOGGER.info("xSchedule WebSocket down, polling status over REST")
+        self._last = None
+        self._task = asyncio.ensure_future(
+            self._run(self._interval() if delay is None else delay)
+        )
+
+    def stop(self) -> None:
+        """Stop polling."""
+        if not self.running:
+            return
+        _LOGGER.info("xSchedule WebSocket back, stopped REST polling")
+        self._task.cancel()
+        self._task = None
+
+    async def _run(self, delay: float) -> None:
+        """Poll until stopped."""
+        await asyncio.sleep(delay)
+        while True:
+            self.polls += 1
+            interval = POLL_INTERVAL_IDLE  # unreachable: poll slowly
+            try:
+                self._handle(await self._poll())
+                interval = self._interval()
+            except XScheduleAPIError as err:
+                self.failures += 1
+                _LOGGER.debug("Status poll failed: %s", err)
+            except Exception:  # pylint: disable=broad-except
+                self.failures += 1
+                _LOGGER.exception("Unexpected error polling xSchedule status")
+            await asyncio.sleep(interval)
+
+    def _handle(self, status: dict[str, Any]) -> None:
+        """Pass a reply on unless nothing in it changed."""
+        if not isinstance(status, dict):
+            return
+        significant = {
+            key: value for key, value in status.items() if key not in _VOLATILE_FIELDS
+        }
+        if significant == self._last:
+            self.unchanged += 1
+            return
+        self._last = significant
+        self._on_status(status)
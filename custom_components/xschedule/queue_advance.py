@@ -0,0 +1,159 @@
+"""Arms xSchedule's jump at the end of the step for the next queued song."""
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections.abc import Awaitable, Callable
+
+from homeassistant.components.media_player import MediaPlayerState
+
+from .api_client import XScheduleAPIError, XScheduleConnectionError
+from .const import (
+    QUEUE_ADVANCE_ATTEMPTS,
+    QUEUE_ADVANCE_GUARD,
+    QUEUE_ADVANCE_RETRY_DELAY,
+)
+from .status import StatusSnapshot
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class QueueAdvancer:
+    """Keeps the next queued song armed to follow the current step.
+
+    xSchedule's "jump at the end of the current step" only takes effect if
+    it lands before the step ends. arm() sends it as soon as a step starts,
+    rather than reacting once the previous song is reported playing, and
+    retries timeouts and connection errors a few times while the step has
+    time left. The time left is extrapolated from the last status's leftms
+    (or position and length), so it stays right between status messages.
+
+    Sending the same jump twice is harmless, so a retry after a timed-out
+    command (which may have run) is safe. A jump xSchedule rejects is not
+    retried: on_rejected is told, so the song can be dropped. Only one
+    target is ever in flight: arming another cancels the previous one.
+    """
+
+    def __init__(
+        self,
+        jump: Callable[[str], Awaitable[None]],
+        on_rejected: Callable[[str], None] | None = None,
+    ) -> None:
+        """Initialize with the coroutine that sends the jump.
+
+        jump raises XScheduleAPIError unless xSchedule accepted it, and
+        XScheduleConnectionError if it couldn't be sent or wasn't answered.
+        """
+        self._jump = jump
+        self._on_rejected = on_rejected
+        self._task: asyncio.Task | None = None
+        self._step: str | None = None
+        self._ends_at: float | None = None
+        # (song, step it follows): being sent, and confirmed
+        self._pending: tuple[str, str | None] | None = None
+        self._armed: tuple[str, str | None] | None = None
+        self.jumps = 0
+        self.retries = 0
+        self.missed = 0
+
+    @property
+    def running(self) -> bool:
+        """Return True while a jump is being sent or retried."""
+        return self._task is not None and not self._task.done()
+
+    @property
+    def armed(self) -> str | None:
+        """Return the song confirmed to follow the current step."""
+        if self._armed is not None and self._armed[1] == self._step:
+            return self._armed[0]
+        return None
+
+    def remaining(self) -> float | None:
+        """Return the seconds left in the current step, None if unknown."""
+        if self._ends_at is None:
+            return None
+        return max(0.0, self._ends_at - time.monotonic())
+
+    def observe(self, status: StatusSnapshot) -> None:
+        """Track the current step and when it ends."""
+        if status.step is not None and status.step != self._step:
+            self._step = status.step
+        left_ms = status.left_ms
+        if left_ms is None and status.length_ms is not None and status.position_ms is not None:
+            left_ms = status.length_ms - status.position_ms
+        if status.state == MediaPlayerState.PLAYING and left_ms is not None:
+            self._ends_at = time.monotonic() + max(0, left_ms) / 1000
+        else:
+            # Paused or stopped: the step isn't running out
+            self._ends_at = None
+
+    def arm(self, target: str) -> None:
+        """Have target follow the current step, retrying in the background."""
+        key = (target, self._step)
+        if self._armed == key or (self.running and self._pending == key):
+            return
+        self.cancel()
+        self._pending = key
+        self._task = asyncio.ensure_future(self._run(target, self._step))
+
+    async def async_arm(self, target: str) -> None:
+        """Send the jump to target now, raising if xSchedule rejects it."""
+        self.cancel()
+        step = self._step
+        await self._jump(target)
+        self.jumps += 1
+        self._armed = (target, step)
+
+    def cancel(self) -> None:
+        """Stop any jump in flight and forget the armed one."""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        self._pending = None
+        self._armed = None
+
+    def _budget(self) -> float | None:
+        """Return the seconds left to land a jump, None if unbounded."""
+        remaining = self.remaining()
+        return None if remaining is None else remaining - QUEUE_ADVANCE_GUARD
+
+    async def _run(self, target: str, step: str | None) -> None:
+        """Send the jump until it is confirmed, rejected or out of attempts.
+
+        Each attempt is bounded by the transport's own timeout.
+        """
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                await self._jump(target)
+            except XScheduleConnectionError as err:
+                _LOGGER.debug("Jump to '%s' not confirmed (attempt %d): %s", target, attempt, err)
+            except XScheduleAPIError as err:
+                # A rejection is final; resending it would be rejected too
+                self.missed += 1
+                _LOGGER.warning("xSchedule rejected the jump to '%s': %s", target, err)
+                # This task is finishing, so on_rejected may arm another song
+                self._task = None
+                self._pending = None
+                if self._on_rejected is not None:
+                    self._on_rejected(target)
+                return
+            else:
+                self.jumps += 1
+                self._armed = (target, step)
+                _LOGGER.debug("'%s' armed to follow '%s'", target, step)
+                return
+
+            if self._step != step:
+                return  # the step ended; the next one is armed afresh
+            budget = self._budget()
+            if attempt >= QUEUE_ADVANCE_ATTEMPTS or (
+                budget is not None and budget <= QUEUE_ADVANCE_RETRY_DELAY
+            ):
+                self.missed += 1
+                _LOGGER.error("Could not arm '%s' before the end of '%s'", target, step)
+                return
+            self.retries += 1
+            await asyncio.sleep(QUEUE_ADVANCE_RETRY_DELAY)
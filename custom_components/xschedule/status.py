@@ -0,0 +1,152 @@
+"""Typed snapshots of xSchedule playing status messages."""
+from __future__ import annotations
+
+import sys
+from dataclasses import dataclass, fields
+from typing import Any
+
+from homeassistant.components.media_player import MediaPlayerState
+
+_STATES = {
+    "playing": MediaPlayerState.PLAYING,
+    "paused": MediaPlayerState.PAUSED,
+}
+
+
+def _ms(value: Any) -> int:
+    """Return an xSchedule millisecond field as int, 0 if malformed."""
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return 0
+
+
+def _optional_ms(data: dict[str, Any], key: str) -> int | None:
+    """Return a millisecond field, None if the message doesn't carry it."""
+    value = data.get(key)
+    return None if value is None else _ms(value)
+
+
+def _name(value: Any) -> str | None:
+    """Return a name field interned, so equal names compare by identity."""
+    return None if value is None else sys.intern(str(value))
+
+
+@dataclass(frozen=True, slots=True)
+class ControllerStatus:
+    """Ping result for one output controller."""
+
+    controller: str
+    ip: str
+    result: str
+    fail_count: int = 0
+
+    @classmethod
+    def from_message(cls, data: dict[str, Any]) -> ControllerStatus:
+        """Build from a pingstatus entry."""
+        return cls(
+            sys.intern(str(data.get("controller", ""))),
+            str(data.get("ip", "")),
+            sys.intern(str(data.get("result", "Failed"))),
+            _ms(data.get("failcount")),
+        )
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the entry in xSchedule's pingstatus format."""
+        return {
+            "controller": self.controller,
+            "ip": self.ip,
+            "result": self.result,
+            "failcount": str(self.fail_count),
+        }
+
+
+def changed_controllers(
+    controllers: tuple[ControllerStatus, ...] | None,
+    previous: tuple[ControllerStatus, ...] | None,
+) -> tuple[ControllerStatus, ...]:
+    """Return the controllers that are new or changed since previous."""
+    if not controllers:
+        return ()
+    before = {item.controller: item for item in previous or ()}
+    return tuple(item for item in controllers if before.get(item.controller) != item)
+
+
+@dataclass(frozen=True, slots=True)
+class StatusSnapshot:
+    """One GetPlayingStatus message, parsed once.
+
+    Fields are None when the message doesn't carry them, except
+    controllers: xSchedule omits pingstatus from some messages, so the
+    previous snapshot's list carries over and only differs when a
+    controller actually changed.
+    """
+
+    state: MediaPlayerState = MediaPlayerState.IDLE
+    playlist: str | None = None
+    step: str | None = None
+    position_ms: int | None = None
+    length_ms: int | None = None
+    left_ms: int | None = None
+    volume: int | None = None
+    output_to_lights: bool = False
+    controllers: tuple[ControllerStatus, ...] | None = None
+
+    @classmethod
+    def from_message(
+        cls,
+        data: dict[str, Any],
+        previous: StatusSnapshot | None = None,
+        previous_pingstatus: list[Any] | None = None,
+    ) -> StatusSnapshot:
+        """Parse a status message.
+
+        previous_pingstatus is the list previous was parsed from. The
+        WebSocket decoder hands an unchanged pingstatus back as that same
+        list, whose controllers are then reused rather than parsed again.
+        """
+        pingstatus = data.get("pingstatus")
+        if isinstance(pingstatus, list) and previous is not None and (
+            pingstatus is previous_pingstatus
+        ):
+            controllers = previous.controllers
+        elif isinstance(pingstatus, list):
+            controllers = tuple(
+                ControllerStatus.from_message(item)
+                for item in pingstatus
+                if isinstance(item, dict)
+            )
+        else:
+            controllers = previous.controllers if previous is not None else None
+
+        volume = data.get("volume")
+        try:
+            volume = None if volume is None else int(volume)
+        except (TypeError, ValueError):
+            volume = None
+
+        return cls(
+            _STATES.get(str(data.get("status", "idle")).lower(), MediaPlayerState.IDLE),
+            _name(data.get("playlist")),
+            _name(data.get("step")),
+            _optional_ms(data, "positionms"),
+            _optional_ms(data, "lengthms"),
+            _optional_ms(data, "leftms"),
+            volume,
+            data.get("outputtolights") == "true",
+            controllers,
+        )
+
+    def diff(self, previous: StatusSnapshot | None) -> frozenset[str]:
+        """Return the names of the fields that differ from previous."""
+        if previous is None:
+            return STATUS_FIELDS
+        return frozenset(
+            name
+            for name in _FIELD_NAMES
+            if getattr(self, name) != getattr(previous, name)
+        )
+
+
+_FIELD_NAMES = tuple(field.name for field in fields(StatusSnapshot))
+STATUS_FIELDS = frozenset(_FIELD_NAMES)
@@ -2,24 +2,56 @@
 from __future__ import annotations
 
 import asyncio
+import itertools
 import json
 import logging
+import time
 from collections.abc import Callable
 from typing import Any
 
 import aiohttp
 
-from .const import WS_HEARTBEAT_INTERVAL, WS_RETRY_DELAY
+from .api_client import XScheduleConnectionError, XScheduleRequestTimeout
+from .codec import dumps, loads
+from .const import (
+    DEFAULT_WS_DEAD_LINK_TIMEOUT,
+    WS_CLOSE_TIMEOUT,
+    WS_PROBE_QUERY,
+    WS_REQUEST_TIMEOUT,
+    WS_RETRY_DELAY,
+    WS_TOPIC_COMMAND_RESULT,
+    WS_TOPIC_PINGSTATUS,
+    WS_TOPIC_QUERY_RESPONSE,
+    WS_TOPIC_STATUS,
+    WS_TOPIC_STEP,
+)
+from .status import ControllerStatus, StatusSnapshot, changed_controllers
 
 _LOGGER = logging.getLogger(__name__)
 
+# aiohttp 3.11 deprecated a bare float ws_connect timeout for ClientWSTimeout
+if hasattr(aiohttp, "ClientWSTimeout"):
+    _WS_CONNECT_TIMEOUT: Any = aiohttp.ClientWSTimeout(ws_close=WS_CLOSE_TIMEOUT)
+else:
+    _WS_CONNECT_TIMEOUT = WS_CLOSE_TIMEOUT
+
 # Define custom TRACE level for very verbose logging
 TRACE_LEVEL = 5
 logging.addLevelName(TRACE_LEVEL, "TRACE")
 
 
 class XScheduleWebSocket:
-    """WebSocket connection manager for xSchedule real-time updates."""
+    """WebSocket connection manager for xSchedule real-time updates.
+
+    Liveness is tracked from the time of the last received message. A probe
+    is sent only after the socket has been quiet for half of
+    dead_link_timeout; if nothing at all arrives within dead_link_timeout
+    the link is treated as dead and reconnected straight away.
+
+    Consumers subscribe() to topics (see WS_TOPIC_* in const.py); each
+    message is routed only to the topics it concerns, and step and
+    pingstatus subscribers only hear about changes.
+    """
 
     def __init__(
         self,
@@ -27,26 +59,137 @@ class XScheduleWebSocket:
         port: int,
         password: str | None = None,
         status_callback: Callable[[dict[str, Any]], None] | None = None,
+        dead_link_timeout: float = DEFAULT_WS_DEAD_LINK_TIMEOUT,
+        connection_callback: Callable[[bool], None] | None = None,
+        session: aiohttp.ClientSession | None = None,
     ) -> None:
-        """Initialize the WebSocket manager."""
+        """Initialize the WebSocket manager.
+
+        As with the API client, pass Home Assistant's shared session to
+        connect through it; without one the manager creates its own.
+        """
         self.host = host
         self.port = port
         self.password = password
         self._ws_url = f"ws://{host}:{port}/"
-        self._status_callback = status_callback
+        self._connection_callback = connection_callback
+        self._subscribers: dict[str, list[Callable[[Any], None]]] = {}
+        if status_callback is not None:
+            self.subscribe(WS_TOPIC_STATUS, status_callback)
+
+        # Last step and controllers seen, so only changes are published
+        self._step: str | None = None
+        self._controllers: tuple[ControllerStatus, ...] = ()
+        self._pingstatus_seen: list[dict[str, Any]] | None = None
+        self._status: StatusSnapshot | None = None
+        # Last GetPlayingStatus reply, routed when it arrived
+        self._status_reply: dict[str, Any] | None = None
+        self._dead_link_timeout = dead_link_timeout
 
         self._ws: aiohttp.ClientWebSocketResponse | None = None
-        self._session: aiohttp.ClientSession | None = None
+        self._session = session
+        self._own_session = session is None
         self._running = False
         self._reconnect_task: asyncio.Task | None = None
-        self._heartbeat_task: asyncio.Task | None = None
+        self._probe_task: asyncio.Task | None = None
         self._connected = False
 
+        # Liveness: monotonic time of the last message of any kind
+        self._last_received = 0.0
+        self._dead_links = 0
+
+        # Request/response correlation: Reference -> (future, sent message)
+        self._references = itertools.count(1)
+        self._pending: dict[str, tuple[asyncio.Future, dict[str, Any]]] = {}
+
+        # Repeated frames: the last raw frame, and the last pingstatus tail
+        # (from '"pingstatus"' to the end of the frame) with its decoded list
+        self._last_frame: str | None = None
+        self._pingstatus_tail: str | None = None
+        self._pingstatus: list[dict[str, Any]] | None = None
+        self._frame_stats = {"duplicate": 0, "decoded": 0, "pingstatus_reused": 0}
+
     @property
     def connected(self) -> bool:
         """Return if WebSocket is connected."""
         return self._connected and self._ws is not None and not self._ws.closed
 
+    @property
+    def dead_links(self) -> int:
+        """Return how many silent (half-open) connections were dropped."""
+        return self._dead_links
+
+    @property
+    def controllers(self) -> tuple[ControllerStatus, ...]:
+        """Return the controllers in the last pingstatus routed."""
+        return self._controllers
+
+    @property
+    def status(self) -> StatusSnapshot | None:
+        """Return the last status routed, parsed (set before subscribers run)."""
+        return self._status
+
+    def routed(self, message: Any) -> bool:
+        """Return True if message is a status reply this socket already routed."""
+        return message is not None and message is self._status_reply
+
+    @property
+    def frame_stats(self) -> dict[str, int]:
+        """Return counts of skipped, decoded and partly decoded frames."""
+        return dict(self._frame_stats)
+
+    def subscribe(
+        self, topic: str, callback: Callable[[Any], None]
+    ) -> Callable[[], None]:
+        """Call callback for every message on topic; returns an unsubscribe."""
+        subscribers = self._subscribers.setdefault(topic, [])
+        subscribers.append(callback)
+
+        def unsubscribe() -> None:
+            if callback in subscribers:
+                subscribers.remove(callback)
+
+        return unsubscribe
+
+    def _publish(self, topic: str, payload: Any) -> None:
+        """Send payload to each subscriber of topic."""
+        for callback in list(self._subscribers.get(topic, ())):
+            try:
+                callback(payload)
+            except Exception as err:  # pylint: disable=broad-except
+                _LOGGER.exception("Error in %s subscriber: %s", topic, err)
+
+    def dispatch_status(self, message: dict[str, Any]) -> None:
+        """Route a status message to status, step and pingstatus subscribers.
+
+        Also used for statuses polled over REST while the socket is down,
+        so subscribers see one stream whichever transport carried it. The
+        message is parsed once, into status, before anyone is called.
+        """
+        previous = self._status
+        status = self._status = StatusSnapshot.from_message(
+            message, previous, self._pingstatus_seen
+        )
+        pingstatus = message.get("pingstatus")
+        # A pingstatus list reused from the previous frame can't have changed
+        new_pingstatus = isinstance(pingstatus, list) and pingstatus is not self._pingstatus_seen
+        if new_pingstatus:
+            self._pingstatus_seen = pingstatus
+
+        self._publish(WS_TOPIC_STATUS, message)
+
+        step = message.get("step")
+        if step is not None and step != self._step:
+            previous, self._step = self._step, step
+            self._publish(WS_TOPIC_STEP, {"step": step, "previous": previous})
+
+        if new_pingstatus:
+            controllers = status.controllers or ()
+            changed = changed_controllers(controllers, self._controllers)
+            self._controllers = controllers
+            if changed:
+                self._publish(WS_TOPIC_PINGSTATUS, changed)
+
     async def connect(self) -> bool:
         """Connect to xSchedule WebSocket."""
         if self._running:
@@ -70,12 +213,7 @@ class XScheduleWebSocket:
             except asyncio.CancelledError:
                 pass
 
-        if self._heartbeat_task:
-            self._heartbeat_task.cancel()
-            try:
-                await self._heartbeat_task
-            except asyncio.CancelledError:
-                pass
+        await self._cancel_probe()
 
         # Close WebSocket
         if self._ws and not self._ws.closed:
@@ -83,11 +221,19 @@ class XScheduleWebSocket:
             self._ws = None
 
         # Close session
-        if self._session:
+        if self._own_session and self._session:
             await self._session.close()
             self._session = None
 
         self._connected = False
+        self._fail_pending("WebSocket disconnected")
+
+    def _fail_pending(self, reason: str) -> None:
+        """Fail every request still waiting for a response."""
+        pending, self._pending = self._pending, {}
+        for future, _ in pending.values():
+            if not future.done():
+                future.set_exception(XScheduleConnectionError(reason))
 
     async def _connection_loop(self) -> None:
         """Main connection loop with automatic reconnection."""
@@ -95,32 +241,24 @@ class XScheduleWebSocket:
         max_retry_delay = 60  # Maximum 60 seconds between retries
 
         while self._running:
+            connected_at: float | None = None
             try:
                 if self._session is None:
                     self._session = aiohttp.ClientSession()
 
                 _LOGGER.info("Connecting to xSchedule WebSocket at %s", self._ws_url)
-                async with self._session.ws_connect(self._ws_url) as ws:
+                # A short close timeout: a dead link won't answer the close frame
+                async with self._session.ws_connect(
+                    self._ws_url, timeout=_WS_CONNECT_TIMEOUT
+                ) as ws:
                     self._ws = ws
                     self._connected = True
+                    connected_at = time.monotonic()
                     retry_count = 0  # Reset retry count on successful connection
 
                     _LOGGER.info("WebSocket connected to xSchedule")
-
-                    # Start heartbeat
-                    if self._heartbeat_task is None or self._heartbeat_task.done():
-                        self._heartbeat_task = asyncio.create_task(self._heartbeat())
-
-                    # Listen for messages
-                    async for msg in ws:
-                        if msg.type == aiohttp.WSMsgType.TEXT:
-                            await self._handle_message(msg.data)
-                        elif msg.type == aiohttp.WSMsgType.ERROR:
-                            _LOGGER.error("WebSocket error: %s", ws.exception())
-                            break
-                        elif msg.type == aiohttp.WSMsgType.CLOSED:
-                            _LOGGER.warning("WebSocket closed")
-                            break
+                    self._notify_connection(True)
+                    await self._listen(ws)
 
             except aiohttp.ClientError as err:
                 _LOGGER.warning("WebSocket connection error: %s", err)
@@ -130,105 +268,237 @@ class XScheduleWebSocket:
                 self._connected = False
                 if self._ws:
                     self._ws = None
-
-                # Cancel heartbeat
-                if self._heartbeat_task:
-                    self._heartbeat_task.cancel()
-                    try:
-                        await self._heartbeat_task
-                    except asyncio.CancelledError:
-                        pass
-                    self._heartbeat_task = None
+                self._fail_pending("WebSocket disconnected")
+                await self._cancel_probe()
+                if connected_at is not None:
+                    self._notify_connection(False)
+
+            if not self._running:
+                break
+
+            # A connection that was up reconnects at once; only a link that
+            # drops straight after connecting (or fails to connect) backs off
+            if (
+                connected_at is not None
+                and time.monotonic() - connected_at >= self._dead_link_timeout
+            ):
+                _LOGGER.info("Reconnecting to xSchedule WebSocket")
+                continue
 
             # Exponential backoff for reconnection
-            if self._running:
-                retry_count += 1
-                delay = min(WS_RETRY_DELAY * (2 ** (retry_count - 1)), max_retry_delay)
-                _LOGGER.info("Reconnecting in %d seconds...", delay)
-                await asyncio.sleep(delay)
-
-    async def _heartbeat(self) -> None:
-        """Send periodic heartbeat to keep connection alive."""
+            retry_count += 1
+            delay = min(WS_RETRY_DELAY * (2 ** (retry_count - 1)), max_retry_delay)
+            _LOGGER.info("Reconnecting in %d seconds...", delay)
+            await asyncio.sleep(delay)
+
+    def _notify_connection(self, connected: bool) -> None:
+        """Tell the connection callback the socket came up or went down."""
+        if self._connection_callback is None:
+            return
+        try:
+            self._connection_callback(connected)
+        except Exception as err:  # pylint: disable=broad-except
+            _LOGGER.exception("Error in WebSocket connection callback: %s", err)
+
+    async def _listen(self, ws: aiohttp.ClientWebSocketResponse) -> None:
+        """Read messages until the socket closes or the link goes silent."""
+        probe_after = self._dead_link_timeout / 2
+        self._last_received = time.monotonic()
+        self._last_frame = None  # a new connection's first frame always counts
+
+        while True:
+            quiet = time.monotonic() - self._last_received
+            if quiet >= self._dead_link_timeout:
+                self._dead_links += 1
+                _LOGGER.warning(
+                    "No data from xSchedule for %.1fs, treating connection as dead",
+                    quiet,
+                )
+                return
+            if quiet >= probe_after:
+                self._probe()
+                wait = self._dead_link_timeout - quiet
+            else:
+                wait = probe_after - quiet
+
+            try:
+                msg = await ws.receive(timeout=wait)
+            except asyncio.TimeoutError:
+                continue
+            self._last_received = time.monotonic()
+
+            if msg.type == aiohttp.WSMsgType.TEXT:
+                await self._handle_message(msg.data)
+            elif msg.type == aiohttp.WSMsgType.ERROR:
+                _LOGGER.error("WebSocket error: %s", ws.exception())
+                return
+            elif msg.type in (
+                aiohttp.WSMsgType.CLOSE,
+                aiohttp.WSMsgType.CLOSING,
+                aiohttp.WSMsgType.CLOSED,
+            ):
+                _LOGGER.warning("WebSocket closed")
+                return
+
+    def _probe(self) -> None:
+        """Ask xSchedule for a small reply, unless a probe is already out.
+
+        Any message proves the link is alive, so the reply itself is
+        ignored. It is correlated, so it never reaches the status callback.
+        """
+        if self._probe_task is not None and not self._probe_task.done():
+            return
+        _LOGGER.debug("WebSocket quiet, probing xSchedule")
+        self._probe_task = asyncio.create_task(self._async_probe())
+
+    async def _async_probe(self) -> None:
+        """Send the liveness probe."""
         try:
-            while self._running and self.connected:
-                await asyncio.sleep(WS_HEARTBEAT_INTERVAL)
-                if self._ws and not self._ws.closed:
-                    # Single query as keepalive - xSchedule pushes updates via WebSocket
-                    await self.send_query("GetPlayingStatus")
+            await self.async_query(WS_PROBE_QUERY, timeout=self._dead_link_timeout)
+        except XScheduleConnectionError:
+            pass
+
+    async def _cancel_probe(self) -> None:
+        """Cancel an outstanding probe."""
+        if self._probe_task is None:
+            return
+        self._probe_task.cancel()
+        try:
+            await self._probe_task
         except asyncio.CancelledError:
             pass
-        except Exception as err:  # pylint: disable=broad-except
-            _LOGGER.error("Heartbeat error: %s", err)
+        self._probe_task = None
+
+    def _decode(self, data: str) -> Any:
+        """Decode a frame, reusing the pingstatus list if it hasn't changed.
+
+        xSchedule sends pingstatus last, so a frame whose tail from
+        '"pingstatus"' matches the previous one only needs its head decoded.
+        """
+        index = data.rfind('"pingstatus"')
+        if index > 0:
+            tail = data[index:]
+            if tail == self._pingstatus_tail:
+                head = data[:index].rstrip().rstrip(",")
+                try:
+                    message = loads(head + "}")
+                except json.JSONDecodeError:
+                    pass
+                else:
+                    self._frame_stats["pingstatus_reused"] += 1
+                    message["pingstatus"] = self._pingstatus
+                    return message
+
+        message = loads(data)
+        self._frame_stats["decoded"] += 1
+        # Only cache a tail that holds nothing but the pingstatus list
+        if (
+            index > 0
+            and isinstance(message, dict)
+            and isinstance(message.get("pingstatus"), list)
+            and next(reversed(message)) == "pingstatus"
+        ):
+            self._pingstatus_tail = data[index:]
+            self._pingstatus = message["pingstatus"]
+        return message
 
     async def _handle_message(self, data: str) -> None:
         """Handle incoming WebSocket message."""
-        try:
-            message = json.loads(data)
-            _LOGGER.log(TRACE_LEVEL, "Received WebSocket message: %s", message)
+        # xSchedule repeats the same status frame while paused or idle;
+        # responses to requests carry a unique Reference so never repeat
+        if data == self._last_frame:
+            self._frame_stats["duplicate"] += 1
+            return
+        self._last_frame = data
 
-            # xSchedule sends status updates - call callback for all messages
-            # Not just those with "status" key
-            if isinstance(message, dict) and self._status_callback:
-                self._status_callback(message)
+        try:
+            message = self._decode(data)
+            if _LOGGER.isEnabledFor(TRACE_LEVEL):
+                _LOGGER.log(TRACE_LEVEL, "Received WebSocket message: %s", message)
+
+            if not isinstance(message, dict):
+                return
+
+            # Responses to our own requests carry the Reference we sent
+            reference = message.get("reference") or message.get("Reference")
+            pending = self._pending.pop(reference, None) if reference else None
+            if pending is not None:
+                future, sent = pending
+                if not future.done():
+                    future.set_result(message)
+                if sent["Type"] == "Command":
+                    self._publish(
+                        WS_TOPIC_COMMAND_RESULT,
+                        {"command": sent["Command"], "response": message},
+                    )
+                    return
+                self._publish(
+                    WS_TOPIC_QUERY_RESPONSE,
+                    {"query": sent["Query"], "response": message},
+                )
+                # Only a status reply is also a status update
+                if sent["Query"] != "GetPlayingStatus":
+                    return
+                self._status_reply = message
+
+            # xSchedule sends status updates - route all other messages,
+            # not just those with a "status" key
+            self.dispatch_status(message)
 
         except json.JSONDecodeError as err:
             _LOGGER.error("Failed to decode WebSocket message: %s", err)
         except Exception as err:  # pylint: disable=broad-except
             _LOGGER.exception("Error handling WebSocket message: %s", err)
 
-    async def send_query(
-        self, query_name: str, parameters: str = "", reference: str = ""
-    ) -> bool:
-        """Send a query via WebSocket."""
+    async def async_query(
+        self, query_name: str, parameters: str = "", timeout: float = WS_REQUEST_TIMEOUT
+    ) -> Any:
+        """Run a query over the socket and return xSchedule's response."""
+        return await self._request(
+            {"Type": "Query", "Query": query_name, "Parameters": parameters},
+            timeout,
+        )
+
+    async def async_command(
+        self, command_name: str, parameters: str = "", timeout: float = WS_REQUEST_TIMEOUT
+    ) -> Any:
+        """Run a command over the socket and return xSchedule's response."""
+        return await self._request(
+            {"Type": "Command", "Command": command_name, "Parameters": parameters},
+            timeout,
+        )
+
+    async def _request(
+        self, message: dict[str, Any], timeout: float
+    ) -> Any:
+        """Send a message with a fresh Reference and wait for its response.
+
+        Raises XScheduleConnectionError if the message could not be sent and
+        XScheduleRequestTimeout if it was sent but no response arrived.
+        """
         if not self.connected:
-            _LOGGER.warning("Cannot send query, WebSocket not connected")
-            return False
-
-        message = {
-            "Type": "Query",
-            "Query": query_name,
-            "Parameters": parameters,
-        }
-
-        if reference:
-            message["Reference"] = reference
+            raise XScheduleConnectionError("WebSocket not connected")
 
+        reference = f"ha{next(self._references)}"
+        message["Reference"] = reference
         if self.password:
             message["Pass"] = self.password
 
+        future: asyncio.Future = asyncio.get_running_loop().create_future()
+        self._pending[reference] = (future, message)
         try:
-            await self._ws.send_json(message)
-            _LOGGER.debug("Sent query: %s", query_name)
-            return True
-        except Exception as err:  # pylint: disable=broad-except
-            _LOGGER.error("Error sending query: %s", err)
-            return False
-
-    async def send_command(
-        self, command_name: str, parameters: str = "", reference: str = ""
-    ) -> bool:
-        """Send a command via WebSocket."""
-        if not self.connected:
-            _LOGGER.warning("Cannot send command, WebSocket not connected")
-            return False
-
-        message = {
-            "Type": "Command",
-            "Command": command_name,
-            "Parameters": parameters,
-        }
-
-        if reference:
-            message["Reference"] = reference
-
-        if self.password:
-            message["Pass"] = self.password
-
-        try:
-            await self._ws.send_json(message)
-            _LOGGER.debug("Sent command: %s with parameters: %s (full message: %s)", 
-                         command_name, parameters, message)
-            return True
-        except Exception as err:  # pylint: disable=broad-except
-            _LOGGER.error("Error sending command: %s", err)
-            return False
+            try:
+                await self._ws.send_json(message, dumps=dumps)
+            except Exception as err:  # pylint: disable=broad-except
+                raise XScheduleConnectionError(f"WebSocket send failed: {err}") from err
+            _LOGGER.debug("Sent %s %s (reference %s)", message["Type"],
+                          message.get("Query") or message.get("Command"), reference)
+            try:
+                async with asyncio.timeout(timeout):
+                    return await future
+            except asyncio.TimeoutError as err:
+                raise XScheduleRequestTimeout(
+                    f"No WebSocket response to {reference} within {timeout}s"
+                ) from err
+        finally:
+            self._pending.pop(reference, None)
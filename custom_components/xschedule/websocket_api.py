@@ -0,0 +1,45 @@
+"""Home Assistant websocket commands for the xSchedule cards."""
+from __future__ import annotations
+
+from typing import Any
+
+import voluptuous as vol
+
+from homeassistant.components import websocket_api
+from homeassistant.core import HomeAssistant, callback
+import homeassistant.helpers.config_validation as cv
+
+
+@callback
+def async_register_websocket_commands(hass: HomeAssistant) -> None:
+    """Register the xschedule websocket commands."""
+    websocket_api.async_register_command(hass, websocket_subscribe)
+
+
+@websocket_api.websocket_command(
+    {
+        vol.Required("type"): "xschedule/subscribe",
+        vol.Required("entity_id"): cv.entity_id,
+    }
+)
+@callback
+def websocket_subscribe(
+    hass: HomeAssistant,
+    connection: websocket_api.ActiveConnection,
+    msg: dict[str, Any],
+) -> None:
+    """Stream a player's state: a snapshot, then only the fields that change."""
+    component = hass.data.get("media_player")
+    entity = component.get_entity(msg["entity_id"]) if component else None
+    if entity is None or not hasattr(entity, "async_subscribe"):
+        connection.send_error(
+            msg["id"], websocket_api.ERR_NOT_FOUND, f"{msg['entity_id']} is not an xSchedule player"
+        )
+        return
+
+    @callback
+    def forward(message: dict[str, Any]) -> None:
+        connection.send_message(websocket_api.event_message(msg["id"], message))
+
+    connection.send_result(msg["id"])
+    connection.subscriptions[msg["id"]] = entity.async_subscribe(forward)
@@ -155,6 +155,9 @@ class XScheduleCard extends i {
     this._lastPlaylistSongs = [];
     this._forceExpandPlaylists = false;
     this._lastFetchedPlaylist = null; // Track playlist fetched via browse
+    this._playerUnsub = null; // xschedule/subscribe subscription (promise)
+    this._live = null; // Fields streamed by xschedule/subscribe
+    this._playerUnsupported = false; // Integration lacks xschedule/subscribe
 
     // Track previous values for render optimization
     this._previousState = null;
@@ -228,6 +231,71 @@ class XScheduleCard extends i {
       clearInterval(this._progressInterval);
       this._progressInterval = null;
     }
+    this._unsubscribeFromPlayer();
+  }
+
+  _subscribeToPlayer() {
+    // Stream the large lists (songs, queue) over xschedule/subscribe: a
+    // snapshot, then only the fields that change. Attributes stay the
+    // fallback for older integrations and other players.
+    if (this._playerUnsub || this._playerUnsupported || !this._hass?.connection?.subscribeMessage) return;
+    const subscription = this._hass.connection
+      .subscribeMessage(message => this._handlePlayerMessage(message), {
+        type: 'xschedule/subscribe',
+        entity_id: this.config.entity,
+      })
+      .catch(err => {
+        // An older integration lacks the command; other errors (such as the
+        // entity not being back yet after a reload) retry on the next update
+        if (err?.code === 'unknown_command') {
+          console.debug('xschedule/subscribe not available, using attributes', err);
+          this._playerUnsupported = true;
+        }
+        if (this._playerUnsub === subscription) {
+          this._playerUnsub = null;
+          this._live = null;
+        }
+        return null;
+      });
+    this._playerUnsub = subscription;
+  }
+
+  _unsubscribeFromPlayer() {
+    if (this._playerUnsub) {
+      this._playerUnsub.then(unsub => unsub && unsub());
+      this._playerUnsub = null;
+    }
+    this._live = null;
+  }
+
+  _handlePlayerMessage(message) {
+    if (message.type === 'removed') {
+      // The entity was removed or reloaded: drop the stale lists and
+      // subscribe again to its replacement
+      this._unsubscribeFromPlayer();
+      if (this._hass) {
+        this.hass = this._hass;
+      }
+      return;
+    }
+    const fields = message.type === 'snapshot' ? message.state : message.changes;
+    if (message.type === 'snapshot') {
+      this._live = {};
+    }
+    Object.assign(this._live, fields);
+    (message.removed || []).forEach(key => delete this._live[key]);
+
+    if (this._hass && ('playlist_songs' in fields || 'internal_queue' in fields)) {
+      this.hass = this._hass; // Re-derive songs and queue
+    }
+  }
+
+  _listAttribute(name) {
+    // Prefer the streamed value, fall back to the state attribute
+    if (this._live && name in this._live) {
+      return this._live[name];
+    }
+    return this._entity.attributes[name];
   }
 
   set hass(hass) {
@@ -238,11 +306,15 @@ class XScheduleCard extends i {
     this._entity = hass.states[entityId];
 
     if (this._entity) {
+      if (this._isXSchedulePlayer()) {
+        this._subscribeToPlayer();
+      }
+
       // Extract playlists from source_list and sort alphabetically
       this._playlists = (this._entity.attributes.source_list || []).sort((a, b) => a.localeCompare(b));
 
       const currentPlaylist = this._entity.attributes.media_playlist || this._entity.attributes.playlist;
-      const playlistSongs = this._entity.attributes.playlist_songs || [];
+      const playlistSongs = this._listAttribute('playlist_songs') || [];
       const isIdle = this._entity.state === 'idle' ||
                      this._entity.state === 'off' ||
                      this._entity.state === 'unavailable' ||
@@ -263,7 +335,7 @@ class XScheduleCard extends i {
       this._songs = playlistSongs.length > 0 ? playlistSongs : this._lastPlaylistSongs;
 
       // Extract internal queue (managed by integration)
-      this._queue = this._entity.attributes.internal_queue || [];
+      this._queue = this._listAttribute('internal_queue') || [];
     }
 
     // Trigger update check
@@ -291,15 +363,15 @@ class XScheduleCard extends i {
       const titleChanged = this._entity.attributes.media_title !== this._previousTitle;
       const playlistChanged = (this._entity.attributes.media_playlist || this._entity.attributes.playlist) !== this._previousPlaylist;
       const playlistsChanged = JSON.stringify(this._entity.attributes.source_list) !== this._previousPlaylists;
-      const songsChanged = JSON.stringify(this._entity.attributes.playlist_songs) !== this._previousSongs;
-      const queueChanged = JSON.stringify(this._entity.attributes.internal_queue) !== this._previousQueue;
+      const songsChanged = JSON.stringify(this._listAttribute('playlist_songs')) !== this._previousSongs;
+      const queueChanged = JSON.stringify(this._listAttribute('internal_queue')) !== this._previousQueue;
       const mediaPositionUpdatedAtChanged = this._entity.attributes.media_position_updated_at !== this._previousMediaPositionUpdatedAt;
 
       // Check if we need to fetch songs via browse_media (for non-xSchedule players)
       const currentPlaylist = this._entity.attributes.media_playlist || this._entity.attributes.playlist;
       if (currentPlaylist && currentPlaylist !== this._lastFetchedPlaylist) {
         // Use playlist_songs if available (xSchedule player)
-        if (this._entity.attributes.playlist_songs) {
+        if (this._listAttribute('playlist_songs')) {
           // Songs are already in attributes, no need to fetch
           this._lastFetchedPlaylist = currentPlaylist;
         } else {
@@ -317,8 +389,8 @@ class XScheduleCard extends i {
       this._previousTitle = this._entity.attributes.media_title;
       this._previousPlaylist = this._entity.attributes.media_playlist || this._entity.attributes.playlist;
       this._previousPlaylists = JSON.stringify(this._entity.attributes.source_list);
-      this._previousSongs = JSON.stringify(this._entity.attributes.playlist_songs);
-      this._previousQueue = JSON.stringify(this._entity.attributes.internal_queue);
+      this._previousSongs = JSON.stringify(this._listAttribute('playlist_songs'));
+      this._previousQueue = JSON.stringify(this._listAttribute('internal_queue'));
       this._previousMediaPositionUpdatedAt = this._entity.attributes.media_position_updated_at;
 
       // Allow first render, or only if something meaningful changed
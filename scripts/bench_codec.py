@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""Compare the stdlib json module with the integration's JSON codec.
+
+Payloads come from tests/fixtures/api_responses.py, scaled up where the
+real replies get large (long playlists, the GetModels stash blob).
+
+Usage (from the repository root):
+    python scripts/bench_codec.py [--number N]
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import timeit
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "custom_components" / "xschedule"))
+
+import codec  # noqa: E402  (codec.py has no Home Assistant imports)
+from tests.fixtures.api_responses import (  # noqa: E402
+    PLAYING_STATUS_FULL,
+    PLAYLIST_STEPS_HALLOWEEN,
+    PLAYLISTS_RESPONSE,
+)
+
+
+def _long_playlist(steps: int) -> dict:
+    """Return a GetPlayListSteps reply with the given number of steps."""
+    template = PLAYLIST_STEPS_HALLOWEEN["steps"]
+    return {
+        "steps": [
+            dict(template[i % len(template)], name=f"Song {i}", id=str(i))
+            for i in range(steps)
+        ],
+        "reference": "",
+    }
+
+
+def _stash_blob(models: int) -> dict:
+    """Return a GetModels-sized reply: one big stashed JSON string."""
+    return {
+        "result": "ok",
+        "data": json.dumps(
+            [{"name": f"Model {i}", "type": "Arches", "nodes": 50} for i in range(models)]
+        ),
+    }
+
+
+PAYLOADS = {
+    "status frame": PLAYING_STATUS_FULL,
+    "playlists": PLAYLISTS_RESPONSE,
+    "steps (3)": PLAYLIST_STEPS_HALLOWEEN,
+    "steps (500)": _long_playlist(500),
+    "stash blob": _stash_blob(2000),
+}
+
+
+def main() -> None:
+    """Print decode/encode timings per payload."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--number", type=int, default=2000, help="iterations per timing")
+    args = parser.parse_args()
+
+    print(f"codec: {codec.CODEC}, {args.number} iterations, microseconds per call")
+    print(f"{'payload':<14}{'bytes':>9}{'json.loads':>12}{'loads':>9}{'json.dumps':>12}{'dumps':>9}")
+    for name, payload in PAYLOADS.items():
+        text = json.dumps(payload)
+        timings = [
+            timeit.timeit(lambda: func(arg), number=args.number) / args.number * 1e6
+            for func, arg in (
+                (json.loads, text),
+                (codec.loads, text),
+                (json.dumps, payload),
+                (codec.dumps, payload),
+            )
+        ]
+        print(f"{name:<14}{len(text):>9}" + "".join(
+            f"{value:>{width}.1f}" for value, width in zip(timings, (12, 9, 12, 9))
+        ))
+
+
+if __name__ == "__main__":
+    main()
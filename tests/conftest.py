@@ -1,4 +1,6 @@
 """Shared fixtures for xSchedule tests."""
+from contextlib import ExitStack
+
 import pytest
 from unittest.mock import AsyncMock, MagicMock, patch
 from homeassistant.core import HomeAssistant
@@ -10,6 +12,7 @@ from custom_components.xschedule.const import (
     CONF_PASSWORD,
     DEFAULT_NAME,
 )
+from custom_components.xschedule.hub import XScheduleHub
 
 # Enable loading custom integrations
 pytest_plugins = "pytest_homeassistant_custom_component"
@@ -55,10 +58,34 @@ def mock_api_client():
     client.get_schedules = AsyncMock(return_value=[
         {"name": "Schedule 1", "playlist": "Playlist 1"},
     ])
+    client.observe_status = MagicMock(return_value=frozenset())
     client.close = AsyncMock()
     return client
 
 
+@pytest.fixture
+def attach_hub():
+    """Return a function that gives a config entry its hub, as setup does.
+
+    The hub is built with the given API client (and catalog, if given);
+    patch custom_components.xschedule.hub.XScheduleWebSocket around the
+    call to control its WebSocket.
+    """
+    def attach(hass, config_entry, api_client, catalog=None) -> XScheduleHub:
+        with ExitStack() as stack:
+            stack.enter_context(
+                patch("custom_components.xschedule.hub.XScheduleAPIClient", return_value=api_client)
+            )
+            if catalog is not None:
+                stack.enter_context(
+                    patch("custom_components.xschedule.hub.XScheduleCatalog", return_value=catalog)
+                )
+            config_entry.runtime_data = XScheduleHub(hass, config_entry.data)
+        return config_entry.runtime_data
+
+    return attach
+
+
 @pytest.fixture
 def mock_websocket():
     """Return a mock WebSocket client."""
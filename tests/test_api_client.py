@@ -2,14 +2,19 @@
 import pytest
 from unittest.mock import AsyncMock, MagicMock, patch
 from aiohttp import ClientError, ClientResponseError
+import asyncio
 import time
 
 from custom_components.xschedule.api_client import (
+    CACHE_ALL,
+    SCHEDULE_SCOPE,
     XScheduleAPIClient,
     XScheduleAPIError,
     XScheduleConnectionError,
     XScheduleAuthError,
+    XScheduleRequestTimeout,
 )
+from custom_components.xschedule.const import HTTP_CONNECTION_LIMIT
 
 
 @pytest.fixture
@@ -57,25 +62,206 @@ class TestAPIClientInit:
         assert api_client_no_password._get_password_hash() is None
 
 
+class TestTransport:
+    """Test URL templates and connection reuse tracking."""
+
+    def test_query_url_encodes_spaces_as_percent20(self, api_client_no_password):
+        """Test query URLs use %20 for spaces, never +."""
+        url = api_client_no_password._build_url(
+            api_client_no_password._query_url, "GetPlayListSteps", "My Playlist"
+        )
+
+        assert url == (
+            "http://192.168.1.100:80/xScheduleQuery"
+            "?Query=GetPlayListSteps&Parameters=My%20Playlist"
+        )
+
+    def test_command_url_appends_password_hash(self, api_client):
+        """Test command URLs carry the pre-computed password hash last."""
+        url = api_client._build_url(api_client._command_url, "Set volume to", "50")
+
+        assert url.startswith(
+            "http://192.168.1.100:80/xScheduleCommand"
+            "?Command=Set%20volume%20to&Parameters=50&Pass="
+        )
+        assert url.endswith(api_client._get_password_hash())
+
+    @pytest.mark.asyncio
+    async def test_query_uses_template(self, api_client_no_password):
+        """Test query() sends the templated URL."""
+        with patch.object(
+            api_client_no_password, '_request', new=AsyncMock(return_value={})
+        ) as mock_request:
+            await api_client_no_password.query("GetPlayingStatus")
+
+        mock_request.assert_called_once_with(
+            "http://192.168.1.100:80/xScheduleQuery?Query=GetPlayingStatus"
+        )
+
+    def test_connection_reuse_counters(self, api_client):
+        """Test responses on a known connection count as reused."""
+        first = MagicMock()
+        second = MagicMock()
+
+        for protocol in (first, first, second):
+            response = MagicMock()
+            response.connection.protocol = protocol
+            api_client._track_connection(response)
+
+        stats = api_client.connection_stats
+        assert stats["requests"] == 3
+        assert stats["connections_new"] == 2
+        assert stats["connections_reused"] == 1
+
+    @pytest.mark.asyncio
+    async def test_shared_session_not_closed(self):
+        """Test a session passed in by Home Assistant is left open."""
+        shared_session = MagicMock()
+        shared_session.close = AsyncMock()
+        client = XScheduleAPIClient("192.168.1.100", 80, session=shared_session)
+
+        await client.close()
+
+        shared_session.close.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_queued_request_timeout_starts_when_sent(self):
+        """Test time waiting for a request slot doesn't count as the request's."""
+        response = MagicMock()
+        response.json = AsyncMock(return_value={"result": "ok"})
+        request = MagicMock()
+        request.__aenter__ = AsyncMock(return_value=response)
+        request.__aexit__ = AsyncMock(return_value=None)
+        session = MagicMock(get=MagicMock(return_value=request))
+        client = XScheduleAPIClient("192.168.1.100", 80, session=session)
+
+        for _ in range(HTTP_CONNECTION_LIMIT):
+            await client._request_slots.acquire()
+        pending = asyncio.ensure_future(client._request("http://xschedule/", timeout=0.01))
+        await asyncio.sleep(0.05)
+        client._request_slots.release()
+
+        assert await pending == {"result": "ok"}
+
+
+class TestQueryCoalescing:
+    """Test single-flight coalescing of identical queries."""
+
+    @pytest.mark.asyncio
+    async def test_identical_queries_share_one_request(self, api_client):
+        """Test concurrent identical queries issue one HTTP request."""
+        release = asyncio.Event()
+
+        async def slow_request(url):
+            await release.wait()
+            return {"steps": [{"name": "Song 1"}]}
+
+        with patch.object(api_client, '_request', side_effect=slow_request) as mock_request:
+            waiters = [
+                asyncio.ensure_future(api_client.query("GetPlayListSteps", "Halloween"))
+                for _ in range(3)
+            ]
+            await asyncio.sleep(0)
+            release.set()
+            results = await asyncio.gather(*waiters)
+
+        assert mock_request.call_count == 1
+        assert all(result == {"steps": [{"name": "Song 1"}]} for result in results)
+        assert api_client.connection_stats["queries_coalesced"] == 2
+        assert api_client._inflight == {}
+
+    @pytest.mark.asyncio
+    async def test_different_parameters_not_coalesced(self, api_client):
+        """Test queries with different parameters are sent separately."""
+        with patch.object(api_client, '_request', new=AsyncMock(return_value={})) as mock_request:
+            await asyncio.gather(
+                api_client.query("GetPlayListSteps", "Halloween"),
+                api_client.query("GetPlayListSteps", "Background"),
+            )
+
+        assert mock_request.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_error_propagates_to_all_waiters(self, api_client):
+        """Test a failed request fails every coalesced waiter."""
+        with patch.object(
+            api_client, '_request', side_effect=XScheduleConnectionError("down")
+        ):
+            results = await asyncio.gather(
+                api_client.query("GetPlayLists"),
+                api_client.query("GetPlayLists"),
+                return_exceptions=True,
+            )
+
+        assert all(isinstance(result, XScheduleConnectionError) for result in results)
+
+    @pytest.mark.asyncio
+    async def test_playing_status_micro_cache(self, api_client):
+        """Test back-to-back GetPlayingStatus calls reuse the last reply."""
+        with patch.object(
+            api_client, '_request', new=AsyncMock(return_value={"status": "idle"})
+        ) as mock_request:
+            await api_client.get_playing_status()
+            await api_client.get_playing_status()
+
+        assert mock_request.call_count == 1
+
+    @pytest.mark.asyncio
+    async def test_command_clears_status_micro_cache(self, api_client):
+        """Test a command forces the next status query to hit xSchedule."""
+        with patch.object(
+            api_client, '_request', new=AsyncMock(return_value={"status": "idle"})
+        ) as mock_request:
+            await api_client.get_playing_status()
+            await api_client.command("Stop")
+            await api_client.get_playing_status()
+
+        assert mock_request.call_count == 3
+
+    @pytest.mark.asyncio
+    async def test_status_from_before_command_not_cached(self, api_client):
+        """Test a status query overtaken by a command doesn't fill the micro-cache."""
+        release = asyncio.Event()
+
+        async def request(url):
+            if "GetPlayingStatus" in url:
+                await release.wait()
+                return {"status": "playing"}
+            return {"result": "ok"}
+
+        with patch.object(api_client, '_request', side_effect=request) as mock_request:
+            before = asyncio.ensure_future(api_client.get_playing_status())
+            await asyncio.sleep(0)
+            await api_client.command("Stop")
+            release.set()
+            assert await before == {"status": "playing"}
+
+            await api_client.get_playing_status()
+
+        assert mock_request.call_count == 3
+        assert api_client._status_micro_cache is not None
+
+
 class TestCaching:
     """Test caching behavior."""
 
     def test_cache_valid_within_ttl(self, api_client):
         """Test cache is valid within TTL."""
-        current_time = time.time()
-        assert api_client._is_cache_valid(current_time, 300) is True
+        api_client._schedule_cache.set("Playlist 1", [{"test": "data"}])
+        assert api_client._schedule_cache.is_fresh("Playlist 1") is True
 
     def test_cache_invalid_after_ttl(self, api_client):
         """Test cache is invalid after TTL expires."""
-        old_time = time.time() - 400  # 400 seconds ago
-        assert api_client._is_cache_valid(old_time, 300) is False
+        api_client._schedule_cache.set("Playlist 1", [{"test": "data"}])
+        api_client._schedule_cache._entries["Playlist 1"].fetched_at -= 400  # 400 seconds ago
+        assert api_client._schedule_cache.is_fresh("Playlist 1") is False
 
     def test_invalidate_specific_playlist(self, api_client):
         """Test invalidating cache for specific playlist."""
         # Add some cache entries
-        api_client._schedule_cache["Playlist 1"] = ([{"test": "data"}], time.time())
-        api_client._steps_cache["Playlist 1"] = ([{"step": "data"}], time.time())
-        api_client._schedule_cache["Playlist 2"] = ([{"test": "data2"}], time.time())
+        api_client._schedule_cache.set("Playlist 1", [{"test": "data"}])
+        api_client._steps_cache.set("Playlist 1", [{"step": "data"}])
+        api_client._schedule_cache.set("Playlist 2", [{"test": "data2"}])
 
         # Invalidate only Playlist 1
         api_client.invalidate_cache("Playlist 1")
@@ -87,8 +273,8 @@ class TestCaching:
     def test_invalidate_all_cache(self, api_client):
         """Test invalidating all cache."""
         # Add cache entries
-        api_client._schedule_cache["Playlist 1"] = ([{"test": "data"}], time.time())
-        api_client._steps_cache["Playlist 1"] = ([{"step": "data"}], time.time())
+        api_client._schedule_cache.set("Playlist 1", [{"test": "data"}])
+        api_client._steps_cache.set("Playlist 1", [{"step": "data"}])
 
         # Invalidate all
         api_client.invalidate_cache()
@@ -97,6 +283,250 @@ class TestCaching:
         assert len(api_client._steps_cache) == 0
 
 
+class TestWebSocketTransport:
+    """Test queries and commands over an attached WebSocket."""
+
+    @pytest.fixture
+    def websocket(self, api_client):
+        """Attach a connected mock WebSocket."""
+        ws = MagicMock()
+        ws.connected = True
+        ws.async_query = AsyncMock(return_value={"steps": [{"name": "Song"}], "reference": "ha1"})
+        ws.async_command = AsyncMock(return_value={"result": "ok", "reference": "ha2"})
+        api_client.attach_websocket(ws)
+        return ws
+
+    @pytest.mark.asyncio
+    async def test_query_uses_websocket(self, api_client, websocket):
+        """Test queries skip HTTP while the socket is connected."""
+        with patch.object(api_client, '_request', new=AsyncMock()) as mock_request:
+            steps = await api_client.get_playlist_steps("Halloween")
+
+        assert steps == [{"name": "Song"}]
+        websocket.async_query.assert_called_once_with("GetPlayListSteps", "Halloween")
+        mock_request.assert_not_called()
+        assert api_client.connection_stats["websocket_requests"] == 1
+
+    @pytest.mark.asyncio
+    async def test_command_returns_websocket_result(self, api_client, websocket):
+        """Test commands return xSchedule's acknowledgement from the socket."""
+        websocket.async_command.return_value = {"result": "failed", "message": "Unknown step"}
+
+        result = await api_client.jump_to_step_at_end("Nope")
+
+        assert result["result"] == "failed"
+        websocket.async_command.assert_called_once_with(
+            "Jump to specified step in current playlist at the end of current step", "Nope"
+        )
+
+    @pytest.mark.asyncio
+    async def test_disconnected_websocket_uses_rest(self, api_client, websocket):
+        """Test REST is used while the socket is down."""
+        websocket.connected = False
+
+        with patch.object(api_client, '_request', new=AsyncMock(return_value={"result": "ok"})) as mock_request:
+            await api_client.pause()
+
+        websocket.async_command.assert_not_called()
+        mock_request.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_query_timeout_retried_over_rest(self, api_client, websocket):
+        """Test an unanswered query is repeated over REST."""
+        websocket.async_query.side_effect = XScheduleRequestTimeout("no reply")
+
+        with patch.object(api_client, '_request', new=AsyncMock(return_value={"status": "idle"})):
+            status = await api_client.get_playing_status()
+
+        assert status == {"status": "idle"}
+        assert api_client.connection_stats["websocket_fallbacks"] == 1
+
+    @pytest.mark.asyncio
+    async def test_unsent_command_falls_back_to_rest(self, api_client, websocket):
+        """Test a command that couldn't be sent is sent over REST."""
+        websocket.async_command.side_effect = XScheduleConnectionError("send failed")
+
+        with patch.object(api_client, '_request', new=AsyncMock(return_value={"result": "ok"})) as mock_request:
+            result = await api_client.next_step()
+
+        assert result == {"result": "ok"}
+        mock_request.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_unanswered_command_not_repeated(self, api_client, websocket):
+        """Test a sent-but-unanswered command isn't run a second time."""
+        websocket.async_command.side_effect = XScheduleRequestTimeout("no reply")
+
+        with patch.object(api_client, '_request', new=AsyncMock()) as mock_request:
+            with pytest.raises(XScheduleRequestTimeout):
+                await api_client.next_step()
+
+        mock_request.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_websocket_auth_failure(self, api_client, websocket):
+        """Test a password rejection over the socket raises XScheduleAuthError."""
+        websocket.async_query.return_value = {"result": "failed", "message": "Incorrect password"}
+
+        with pytest.raises(XScheduleAuthError):
+            await api_client.query("GetPlayingStatus")
+
+
+class TestInvalidationSemantics:
+    """Test which commands and status changes invalidate cached data."""
+
+    def _fill(self, api_client):
+        """Populate every cache."""
+        api_client._playlists_cache.set("metadata", [{"name": "Playlist 1"}])
+        api_client._steps_cache.set("Playlist 1", [{"name": "Song"}])
+        api_client._schedule_cache.set("Playlist 1", [{"name": "Nightly"}])
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize(
+        "method,args",
+        [
+            ("pause", ()),
+            ("next_step", ()),
+            ("previous_step", ()),
+            ("play_playlist", ("Playlist 1",)),
+            ("play_playlist_step", ("Playlist 1", "Song")),
+            ("enqueue_step", ("Playlist 1", "Song")),
+            ("clear_queue", ()),
+            ("jump_to_step_at_end", ("Song",)),
+            ("set_volume", (50,)),
+        ],
+    )
+    async def test_transport_commands_keep_cache(self, api_client, method, args):
+        """Test playback, queue and volume commands don't invalidate anything."""
+        self._fill(api_client)
+
+        with patch.object(api_client, '_request', new=AsyncMock(return_value={"result": "ok"})):
+            await getattr(api_client, method)(*args)
+
+        assert "metadata" in api_client._playlists_cache
+        assert "Playlist 1" in api_client._steps_cache
+        assert "Playlist 1" in api_client._schedule_cache
+
+    @pytest.mark.asyncio
+    async def test_stop_all_invalidates_schedules_only(self, api_client):
+        """Test stopping schedules drops schedule data but keeps steps."""
+        self._fill(api_client)
+
+        with patch.object(api_client, '_request', new=AsyncMock(return_value={"result": "ok"})):
+            await api_client.stop_all_now()
+
+        assert "Playlist 1" not in api_client._schedule_cache
+        assert "metadata" not in api_client._playlists_cache
+        assert "Playlist 1" in api_client._steps_cache
+
+    @pytest.mark.asyncio
+    async def test_failed_command_keeps_cache(self, api_client):
+        """Test a rejected command doesn't invalidate."""
+        self._fill(api_client)
+
+        with patch.object(
+            api_client, '_request',
+            new=AsyncMock(return_value={"result": "failed", "message": "Unknown"}),
+        ):
+            await api_client.command("Change show folder", "Other")
+
+        assert "Playlist 1" in api_client._steps_cache
+
+    @pytest.mark.asyncio
+    async def test_show_folder_change_invalidates_everything(self, api_client):
+        """Test changing show folder clears all caches."""
+        self._fill(api_client)
+
+        with patch.object(api_client, '_request', new=AsyncMock(return_value={"result": "ok"})):
+            await api_client.command("Change show folder", "Christmas")
+
+        assert len(api_client._playlists_cache) == 0
+        assert len(api_client._steps_cache) == 0
+        assert len(api_client._schedule_cache) == 0
+
+    def test_status_transitions_keep_cache(self, api_client):
+        """Test play/pause/idle and playlist changes within a session keep the cache."""
+        self._fill(api_client)
+
+        for status in (
+            {"status": "playing", "playlist": "Playlist 1", "playlistid": "1", "version": "2025.10"},
+            {"status": "paused", "playlist": "Playlist 1", "playlistid": "1", "version": "2025.10"},
+            {"status": "playing", "playlist": "Playlist 2", "playlistid": "2", "version": "2025.10"},
+            {"status": "idle", "version": "2025.10"},
+        ):
+            assert api_client.observe_status(status) == frozenset()
+
+        assert "Playlist 1" in api_client._steps_cache
+        assert api_client.server_sessions == 0
+
+    def test_schedule_change_invalidates_schedules(self, api_client):
+        """Test a schedule starting drops schedules and playlist metadata."""
+        self._fill(api_client)
+        api_client.observe_status({"status": "idle"})
+
+        invalidated = api_client.observe_status(
+            {"status": "playing", "playlist": "Playlist 1", "schedulename": "Nightly", "scheduleid": "17"}
+        )
+
+        assert invalidated == SCHEDULE_SCOPE
+        assert "Playlist 1" not in api_client._schedule_cache
+        assert "Playlist 1" in api_client._steps_cache
+
+    def test_first_status_invalidates_nothing(self, api_client):
+        """Test the first status only records the session."""
+        self._fill(api_client)
+
+        assert api_client.observe_status(
+            {"status": "playing", "playlist": "Playlist 1", "schedulename": "Nightly", "scheduleid": "17"}
+        ) == frozenset()
+
+    @pytest.mark.parametrize(
+        "before,after",
+        [
+            ({"version": "2025.10"}, {"version": "2025.11"}),
+            (
+                {"playlist": "Playlist 1", "playlistid": "11"},
+                {"playlist": "Playlist 1", "playlistid": "4"},
+            ),
+            (
+                {"schedulename": "Nightly", "scheduleid": "17"},
+                {"schedulename": "Nightly", "scheduleid": "3"},
+            ),
+        ],
+    )
+    def test_new_server_session_invalidates_everything(self, api_client, before, after):
+        """Test a restart (new version or renumbered ids) clears all caches."""
+        api_client.observe_status({"status": "playing", **before})
+        self._fill(api_client)
+
+        assert api_client.observe_status({"status": "playing", **after}) == CACHE_ALL
+
+        assert len(api_client._playlists_cache) == 0
+        assert len(api_client._steps_cache) == 0
+        assert len(api_client._schedule_cache) == 0
+        assert api_client.server_sessions == 1
+
+        # The new session's ids are the baseline from now on
+        assert api_client.observe_status({"status": "playing", **after}) == frozenset()
+
+    @pytest.mark.asyncio
+    async def test_renumbered_playlists_invalidate_steps(self, api_client):
+        """Test GetPlayLists returning new ids for known playlists clears steps."""
+        responses = [
+            {"playlists": [{"name": "Playlist 1", "id": "11"}]},
+            {"playlists": [{"name": "Playlist 1", "id": "2"}]},
+        ]
+        with patch.object(api_client, '_request', new=AsyncMock(side_effect=responses)):
+            await api_client.get_playlists_with_metadata()
+            self._fill(api_client)
+            playlists = await api_client.get_playlists_with_metadata(force_refresh=True)
+
+        assert playlists == [{"name": "Playlist 1", "id": "2"}]
+        assert len(api_client._steps_cache) == 0
+        assert len(api_client._schedule_cache) == 0
+        assert api_client.server_sessions == 1
+
+
 class TestAPIRequests:
     """Test API request methods."""
 
@@ -135,7 +565,7 @@ class TestAPIRequests:
     async def test_get_playlist_steps_with_cache(self, api_client):
         """Test get_playlist_steps uses cache when valid."""
         cached_data = [{"name": "Song 1"}, {"name": "Song 2"}]
-        api_client._steps_cache["Test Playlist"] = (cached_data, time.time())
+        api_client._steps_cache.set("Test Playlist", cached_data)
 
         # Should return cached data without calling API
         result = await api_client.get_playlist_steps("Test Playlist")
@@ -146,7 +576,7 @@ class TestAPIRequests:
     async def test_get_playlist_steps_force_refresh(self, api_client):
         """Test get_playlist_steps with force_refresh bypasses cache."""
         cached_data = [{"name": "Old Song"}]
-        api_client._steps_cache["Test Playlist"] = (cached_data, time.time())
+        api_client._steps_cache.set("Test Playlist", cached_data)
 
         new_data = [{"name": "New Song"}]
         mock_response = {"steps": new_data}
@@ -161,7 +591,7 @@ class TestAPIRequests:
     async def test_get_schedules_with_cache(self, api_client):
         """Test get_playlist_schedules uses cache when valid."""
         cached_data = [{"name": "Schedule 1"}]
-        api_client._schedule_cache["TestPlaylist"] = (cached_data, time.time())
+        api_client._schedule_cache.set("TestPlaylist", cached_data)
 
         result = await api_client.get_playlist_schedules("TestPlaylist")
 
@@ -169,18 +599,44 @@ class TestAPIRequests:
 
     @pytest.mark.asyncio
     async def test_get_schedules_expired_cache(self, api_client):
-        """Test get_playlist_schedules fetches fresh data when cache expired."""
+        """Test expired schedules are served stale and refreshed in background."""
         cached_data = [{"name": "Old Schedule"}]
-        old_time = time.time() - 400  # Expired
-        api_client._schedule_cache["TestPlaylist"] = (cached_data, old_time)
+        api_client._schedule_cache.set("TestPlaylist", cached_data)
+        api_client._schedule_cache._entries["TestPlaylist"].fetched_at -= 400  # Expired
 
         new_data = [{"name": "New Schedule"}]
         mock_response = {"schedules": new_data}
 
         with patch.object(api_client, '_request', new=AsyncMock(return_value=mock_response)):
+            # Stale value returned immediately, refresh runs in background
+            result = await api_client.get_playlist_schedules("TestPlaylist")
+            assert result == cached_data
+
+            await api_client._schedule_cache.async_wait_refreshes()
             result = await api_client.get_playlist_schedules("TestPlaylist")
 
             assert result == new_data
+            assert api_client._request.call_count == 1
+
+    @pytest.mark.asyncio
+    async def test_get_playlists_with_metadata_cached(self, api_client):
+        """Test playlist metadata is cached without prior initialization."""
+        mock_response = {"playlists": [{"name": "Halloween", "lengthms": "1000"}]}
+
+        with patch.object(api_client, '_request', new=AsyncMock(return_value=mock_response)):
+            first = await api_client.get_playlists_with_metadata()
+            second = await api_client.get_playlists_with_metadata()
+            refreshed = await api_client.get_playlists_with_metadata(force_refresh=True)
+
+            assert first == second == refreshed == mock_response["playlists"]
+            assert api_client._request.call_count == 2
+
+    def test_cache_stats(self, api_client):
+        """Test per-cache statistics are exposed."""
+        stats = api_client.cache_stats
+
+        assert set(stats) == {"playlists", "schedules", "steps"}
+        assert stats["steps"]["hits"] == 0
 
     @pytest.mark.asyncio
     async def test_play_playlist_success(self, api_client):
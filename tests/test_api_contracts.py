@@ -220,6 +220,17 @@ class TestGetPlaylistStepsContract:
             assert isinstance(result, list)
             assert len(result) == 0
 
+    @pytest.mark.asyncio
+    async def test_malformed_playlist_steps_raise(self, api_client):
+        """A reply without a steps list is an error, not an empty playlist."""
+        from custom_components.xschedule.api_client import XScheduleResponseError
+
+        with patch.object(api_client, '_request', new=AsyncMock(return_value={"result": "failed"})):
+            with pytest.raises(XScheduleResponseError):
+                await api_client.get_playlist_steps("Halloween")
+
+        assert "Halloween" not in api_client._steps_cache
+
 
 class TestGetQueuedStepsContract:
     """Verify GetQueuedSteps response parsing."""
@@ -447,9 +458,9 @@ class TestCaching:
         import time
 
         # Add cache entries
-        api_client._steps_cache["Halloween"] = ([{"name": "Song 1"}], time.time())
-        api_client._schedule_cache["Halloween"] = ([{"name": "Sched 1"}], time.time())
-        api_client._steps_cache["Background"] = ([{"name": "Song 2"}], time.time())
+        api_client._steps_cache.set("Halloween", [{"name": "Song 1"}])
+        api_client._schedule_cache.set("Halloween", [{"name": "Sched 1"}])
+        api_client._steps_cache.set("Background", [{"name": "Song 2"}])
 
         # Invalidate only Halloween
         api_client.invalidate_cache("Halloween")
@@ -463,8 +474,8 @@ class TestCaching:
         import time
 
         # Add cache entries
-        api_client._steps_cache["Halloween"] = ([{"name": "Song 1"}], time.time())
-        api_client._schedule_cache["Background"] = ([{"name": "Sched 1"}], time.time())
+        api_client._steps_cache.set("Halloween", [{"name": "Song 1"}])
+        api_client._schedule_cache.set("Background", [{"name": "Sched 1"}])
 
         # Invalidate all
         api_client.invalidate_cache()
@@ -10,6 +10,7 @@ from homeassistant.core import HomeAssistant
 from custom_components.xschedule import async_setup_entry
 from custom_components.xschedule.binary_sensor import XScheduleControllerSensor, clean_controller_name
 from custom_components.xschedule.const import DOMAIN, CONF_PASSWORD, DEFAULT_NAME
+from custom_components.xschedule.websocket import XScheduleWebSocket
 
 
 class TestCleanControllerName:
@@ -186,44 +187,43 @@ class TestControllerSensor:
         assert sensor.available is True
 
 
-class TestControllerStatusEvents:
-    """Test controller status update events."""
+class TestControllerStatusSubscription:
+    """Test sensors follow the WebSocket's pingstatus topic."""
 
-    async def test_event_data_structure(self, hass: HomeAssistant):
-        """Test the structure of controller status update events."""
-        # Track fired events
-        events = []
-
-        async def event_listener(event):
-            events.append(event)
-
-        hass.bus.async_listen(
-            f"{DOMAIN}_controller_status_update",
-            event_listener,
+    async def test_changed_controllers_update_sensors(self, hass: HomeAssistant, mock_config_entry):
+        """Test a change updates its sensor and a new controller adds one."""
+        from custom_components.xschedule.binary_sensor import (
+            SENSOR_REGISTRY_KEY,
+            async_setup_entry as async_setup_binary_sensors,
         )
 
-        # Fire a mock event with expected structure
-        test_controllers = [
-            {
-                "controller": "Test Controller",
-                "ip": "192.168.1.100",
-                "result": "Ok",
-                "failcount": "0",
-            }
-        ]
-
-        hass.bus.async_fire(
-            f"{DOMAIN}_controller_status_update",
-            {
-                "entry_id": "test_entry_id",
-                "controllers": test_controllers,
-            },
-        )
-        await hass.async_block_till_done()
-
-        # Verify event was received with correct structure
-        assert len(events) == 1
-        assert events[0].data["entry_id"] == "test_entry_id"
-        assert "controllers" in events[0].data
-        assert len(events[0].data["controllers"]) == 1
-        assert events[0].data["controllers"][0]["controller"] == "Test Controller"
+        tree = {"controller": "Tree", "ip": "192.168.1.101", "result": "Ok", "failcount": "0"}
+        websocket = XScheduleWebSocket("192.168.1.100", 80)
+        websocket.dispatch_status({"status": "idle", "pingstatus": [tree]})
+        mock_config_entry.add_to_hass(hass)
+        mock_config_entry.runtime_data = Mock(websocket=websocket, controllers=websocket.controllers)
+        add_entities = Mock()
+
+        await async_setup_binary_sensors(hass, mock_config_entry, add_entities)
+        sensors = hass.data[SENSOR_REGISTRY_KEY]
+        tree_sensor = next(iter(sensors.values()))
+        assert tree_sensor.is_on
+
+        pumpkins = {"controller": "Pumpkins", "ip": "192.168.1.103", "result": "Ok"}
+        with patch.object(tree_sensor, "update_from_data", wraps=tree_sensor.update_from_data) as update:
+            websocket.dispatch_status(
+                {"status": "idle", "pingstatus": [dict(tree, result="Failed"), dict(pumpkins)]}
+            )
+
+        update.assert_called_once()
+        assert not tree_sensor.is_on
+        assert add_entities.call_count == 2
+        assert [sensor.name for sensor in add_entities.call_args.args[0]] == ["Pumpkins Health"]
+
+        # Unchanged controllers are not touched
+        with patch.object(tree_sensor, "update_from_data") as update:
+            websocket.dispatch_status(
+                {"status": "idle", "pingstatus": [dict(tree, result="Failed"), dict(pumpkins)]}
+            )
+        update.assert_not_called()
+
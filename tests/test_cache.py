@@ -0,0 +1,168 @@
+"""Tests for the xSchedule stale-while-revalidate cache."""
+import asyncio
+from unittest.mock import AsyncMock
+
+import pytest
+
+from custom_components.xschedule.cache import XScheduleCache
+
+
+@pytest.fixture
+def cache():
+    """Create a small cache instance."""
+    return XScheduleCache("test", ttl=60, max_entries=3, max_bytes=10_000)
+
+
+def expire(cache, key):
+    """Age an entry past its TTL."""
+    cache._entries[key].fetched_at -= cache.ttl + 1
+
+
+class TestCacheReads:
+    """Test hit, miss and stale reads."""
+
+    @pytest.mark.asyncio
+    async def test_miss_fetches_and_stores(self, cache):
+        """Test a miss awaits the fetch and caches the value."""
+        fetch = AsyncMock(return_value=["a"])
+
+        assert await cache.async_get("k", fetch) == ["a"]
+        assert await cache.async_get("k", fetch) == ["a"]
+
+        fetch.assert_called_once()
+        assert cache.stats["misses"] == 1
+        assert cache.stats["hits"] == 1
+
+    @pytest.mark.asyncio
+    async def test_none_result_not_cached(self, cache):
+        """Test a fetch returning None is not stored."""
+        fetch = AsyncMock(return_value=None)
+
+        assert await cache.async_get("k", fetch) is None
+        assert "k" not in cache
+
+    @pytest.mark.asyncio
+    async def test_stale_served_while_refreshing(self, cache):
+        """Test an expired entry is returned immediately and refreshed."""
+        cache.set("k", ["old"])
+        expire(cache, "k")
+        release = asyncio.Event()
+
+        async def slow_fetch():
+            await release.wait()
+            return ["new"]
+
+        assert await cache.async_get("k", slow_fetch) == ["old"]
+        # A second stale read doesn't start another refresh
+        assert await cache.async_get("k", slow_fetch) == ["old"]
+        assert len(cache._refreshing) == 1
+
+        release.set()
+        await cache.async_wait_refreshes()
+
+        assert cache.peek("k") == ["new"]
+        assert cache.is_fresh("k")
+        assert cache.stats["stale_hits"] == 2
+        assert cache.stats["refreshes"] == 1
+
+    @pytest.mark.asyncio
+    async def test_failed_refresh_keeps_stale_value(self, cache):
+        """Test a refresh error leaves the stale entry in place."""
+        cache.set("k", ["old"])
+        expire(cache, "k")
+
+        await cache.async_get("k", AsyncMock(side_effect=RuntimeError("down")))
+        await cache.async_wait_refreshes()
+
+        assert cache.peek("k") == ["old"]
+        assert cache.stats["refresh_errors"] == 1
+
+    @pytest.mark.asyncio
+    async def test_force_refresh_bypasses_entry(self, cache):
+        """Test force_refresh fetches even when fresh."""
+        cache.set("k", ["old"])
+
+        assert await cache.async_get("k", AsyncMock(return_value=["new"]), True) == ["new"]
+
+    @pytest.mark.asyncio
+    async def test_invalidation_cancels_refresh(self, cache):
+        """Test popping a key drops a refresh that was in flight."""
+        cache.set("k", ["old"])
+        expire(cache, "k")
+        release = asyncio.Event()
+
+        async def slow_fetch():
+            await release.wait()
+            return ["pre-invalidation"]
+
+        await cache.async_get("k", slow_fetch)
+        cache.pop("k")
+        release.set()
+        await asyncio.sleep(0)
+
+        assert "k" not in cache
+
+    @pytest.mark.asyncio
+    async def test_invalidation_discards_miss_fetch(self, cache):
+        """Test a miss fetch in flight when the key is popped isn't stored."""
+        release = asyncio.Event()
+
+        async def slow_fetch():
+            await release.wait()
+            return ["pre-invalidation"]
+
+        read = asyncio.ensure_future(cache.async_get("k", slow_fetch))
+        await asyncio.sleep(0)
+        cache.pop("k")
+        release.set()
+
+        assert await read == ["pre-invalidation"]
+        assert "k" not in cache
+
+
+class TestCacheBounds:
+    """Test LRU eviction by entry count and payload size."""
+
+    def test_evicts_least_recently_used_entry(self, cache):
+        """Test the oldest untouched entry is evicted over max_entries."""
+        cache.set("a", [1])
+        cache.set("b", [2])
+        cache.set("c", [3])
+        cache._entries.move_to_end("a")  # "a" read recently
+        cache.set("d", [4])
+
+        assert "b" not in cache
+        assert all(key in cache for key in ("a", "c", "d"))
+        assert cache.stats["evictions"] == 1
+
+    def test_evicts_by_payload_size(self):
+        """Test entries are evicted when total bytes exceed the budget."""
+        cache = XScheduleCache("test", ttl=60, max_entries=100, max_bytes=100)
+        cache.set("a", "x" * 60)
+        cache.set("b", "y" * 60)
+
+        assert "a" not in cache
+        assert "b" in cache
+        assert cache.stats["bytes"] <= 100
+
+    def test_single_oversized_entry_kept(self):
+        """Test the newest entry is kept even if it alone exceeds the budget."""
+        cache = XScheduleCache("test", ttl=60, max_entries=100, max_bytes=10)
+        cache.set("a", "x" * 60)
+
+        assert "a" in cache
+
+    def test_size_estimated_from_structure(self, cache):
+        """Test entries are sized close to their JSON length."""
+        cache.set("k", [{"name": "Thriller", "lengthms": "357000"}])
+
+        encoded = '[{"name":"Thriller","lengthms":"357000"}]'
+        assert cache.stats["bytes"] == pytest.approx(len(encoded), abs=4)
+
+    def test_clear_resets_size(self, cache):
+        """Test clearing releases the byte budget."""
+        cache.set("a", [1, 2, 3])
+        cache.clear()
+
+        assert len(cache) == 0
+        assert cache.stats["bytes"] == 0
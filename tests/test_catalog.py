@@ -0,0 +1,361 @@
+"""Tests for the xSchedule playlist catalog."""
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from custom_components.xschedule.api_client import XScheduleConnectionError, XScheduleResponseError
+from custom_components.xschedule.catalog import (
+    CatalogSnapshot,
+    StepCatalog,
+    XScheduleCatalog,
+    best_schedule,
+)
+from custom_components.xschedule.const import CATALOG_SAVE_DELAY
+
+
+PLAYLISTS = [
+    {"name": "Halloween", "lengthms": "600000"},
+    {"name": "Christmas", "lengthms": "900000"},
+    {"name": "Background", "lengthms": "300000"},
+]
+
+
+@pytest.fixture
+def mock_api_client():
+    """Create a mock API client serving three playlists."""
+    client = MagicMock()
+    client.get_playlists_with_metadata = AsyncMock(return_value=PLAYLISTS)
+    client.get_playlist_steps = AsyncMock(
+        side_effect=lambda name, force_refresh=False: [{"name": f"{name} Song"}]
+    )
+    client.get_playlist_schedules = AsyncMock(
+        side_effect=lambda name, force_refresh=False: [{"name": f"{name} Schedule"}]
+    )
+    return client
+
+
+class TestCatalogLoad:
+    """Test the full catalog prefetch."""
+
+    @pytest.mark.asyncio
+    async def test_load_builds_snapshot(self, mock_api_client):
+        """Test every playlist gets its steps and schedules."""
+        catalog = XScheduleCatalog(mock_api_client)
+
+        snapshot = await catalog.async_load()
+
+        assert snapshot.names == ["Halloween", "Christmas", "Background"]
+        assert snapshot.get("Christmas").steps == [{"name": "Christmas Song"}]
+        assert snapshot.get("Christmas").schedules == [{"name": "Christmas Schedule"}]
+        assert snapshot.get("Christmas").metadata == PLAYLISTS[1]
+        assert snapshot.loaded_at is not None
+
+    @pytest.mark.asyncio
+    async def test_playing_playlist_loaded_first(self, mock_api_client):
+        """Test the priority playlist is requested before the others."""
+        catalog = XScheduleCatalog(mock_api_client, concurrency=1)
+
+        await catalog.async_load(priority="Background")
+
+        requested = [call.args[0] for call in mock_api_client.get_playlist_steps.call_args_list]
+        assert requested == ["Background", "Halloween", "Christmas"]
+
+    @pytest.mark.asyncio
+    async def test_concurrency_is_bounded(self, mock_api_client):
+        """Test no more than `concurrency` playlists load at once."""
+        active = 0
+        peak = 0
+
+        async def slow_steps(name, force_refresh=False):
+            nonlocal active, peak
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.01)
+            active -= 1
+            return []
+
+        mock_api_client.get_playlist_steps.side_effect = slow_steps
+        catalog = XScheduleCatalog(mock_api_client, concurrency=2)
+
+        await catalog.async_load()
+
+        assert peak == 2
+
+    @pytest.mark.asyncio
+    async def test_partial_failure_keeps_other_playlists(self, mock_api_client):
+        """Test one failing playlist doesn't fail the whole load."""
+        def steps(name, force_refresh=False):
+            if name == "Christmas":
+                raise XScheduleConnectionError("timeout")
+            return [{"name": f"{name} Song"}]
+
+        mock_api_client.get_playlist_steps.side_effect = steps
+        catalog = XScheduleCatalog(mock_api_client)
+
+        snapshot = await catalog.async_load()
+
+        assert snapshot.get("Christmas").steps is None
+        assert snapshot.get("Halloween").steps == [{"name": "Halloween Song"}]
+
+    @pytest.mark.asyncio
+    async def test_concurrent_loads_share_one_sweep(self, mock_api_client):
+        """Test a load requested during a load joins it."""
+        catalog = XScheduleCatalog(mock_api_client)
+
+        await asyncio.gather(catalog.async_load(), catalog.async_load())
+
+        mock_api_client.get_playlists_with_metadata.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_forced_load_follows_plain_load(self, mock_api_client):
+        """Test a forced load during a plain one runs after it, and forced loads join."""
+        catalog = XScheduleCatalog(mock_api_client)
+
+        await asyncio.gather(
+            catalog.async_load(),
+            catalog.async_load(force_refresh=True),
+            catalog.async_load(force_refresh=True),
+        )
+
+        assert [
+            call.args for call in mock_api_client.get_playlists_with_metadata.call_args_list
+        ] == [(False,), (True,)]
+
+    @pytest.mark.asyncio
+    async def test_empty_playlists_keeps_snapshot(self, mock_api_client):
+        """Test an empty/failed playlist fetch doesn't wipe the catalog."""
+        catalog = XScheduleCatalog(mock_api_client)
+        await catalog.async_load()
+
+        mock_api_client.get_playlists_with_metadata.return_value = []
+        snapshot = await catalog.async_load()
+
+        assert snapshot.names == ["Halloween", "Christmas", "Background"]
+
+
+class TestCatalogReads:
+    """Test read-through accessors."""
+
+    @pytest.mark.asyncio
+    async def test_get_steps_updates_snapshot(self, mock_api_client):
+        """Test a steps read is mirrored into the snapshot."""
+        catalog = XScheduleCatalog(mock_api_client)
+
+        steps = await catalog.async_get_steps("Halloween")
+
+        assert steps == [{"name": "Halloween Song"}]
+        assert catalog.snapshot.get("Halloween").steps == steps
+
+    @pytest.mark.asyncio
+    async def test_offline_serves_snapshot(self, mock_api_client):
+        """Test catalog data is served when xSchedule is unreachable."""
+        catalog = XScheduleCatalog(mock_api_client)
+        await catalog.async_load()
+
+        mock_api_client.get_playlist_steps.side_effect = XScheduleConnectionError("down")
+        mock_api_client.get_playlist_schedules.side_effect = XScheduleConnectionError("down")
+
+        assert await catalog.async_get_steps("Halloween") == [{"name": "Halloween Song"}]
+        assert await catalog.async_get_schedules("Halloween") == [
+            {"name": "Halloween Schedule"}
+        ]
+
+    @pytest.mark.asyncio
+    async def test_malformed_steps_keep_snapshot(self, mock_api_client):
+        """Test a malformed steps reply doesn't replace the snapshot's steps."""
+        catalog = XScheduleCatalog(mock_api_client)
+        await catalog.async_load()
+
+        mock_api_client.get_playlist_steps.side_effect = XScheduleResponseError("no steps")
+        await catalog.async_load(force_refresh=True)
+
+        assert await catalog.async_get_steps("Halloween") == [{"name": "Halloween Song"}]
+        assert catalog.snapshot.get("Halloween").steps == [{"name": "Halloween Song"}]
+
+    @pytest.mark.asyncio
+    async def test_offline_without_snapshot_raises(self, mock_api_client):
+        """Test the API error surfaces when nothing is cached."""
+        catalog = XScheduleCatalog(mock_api_client)
+        mock_api_client.get_playlist_steps.side_effect = XScheduleConnectionError("down")
+
+        with pytest.raises(XScheduleConnectionError):
+            await catalog.async_get_steps("Halloween")
+
+    @pytest.mark.asyncio
+    async def test_get_playlists_falls_back_to_snapshot(self, mock_api_client):
+        """Test playlist metadata comes from the snapshot when the fetch is empty."""
+        catalog = XScheduleCatalog(mock_api_client)
+        await catalog.async_load()
+
+        mock_api_client.get_playlists_with_metadata.return_value = []
+
+        assert await catalog.async_get_playlists() == PLAYLISTS
+
+
+class TestCatalogPersistence:
+    """Test the warm-start snapshot kept in HA storage."""
+
+    @pytest.fixture
+    def mock_store(self):
+        """Create a mock Store."""
+        store = MagicMock()
+        store.async_load = AsyncMock(return_value=None)
+        store.async_delay_save = MagicMock()
+        return store
+
+    @pytest.mark.asyncio
+    async def test_snapshot_round_trip(self, mock_api_client):
+        """Test the storage format restores an identical snapshot."""
+        catalog = XScheduleCatalog(mock_api_client)
+        snapshot = await catalog.async_load()
+
+        assert CatalogSnapshot.from_dict(snapshot.as_dict()) == snapshot
+
+    @pytest.mark.asyncio
+    async def test_restore_serves_without_network(self, mock_api_client, mock_store):
+        """Test a restored catalog answers before xSchedule is reachable."""
+        mock_store.async_load.return_value = {
+            "loaded_at": 1700000000.0,
+            "playlists": [
+                {"name": "Halloween", "metadata": PLAYLISTS[0],
+                 "steps": [{"name": "Thriller"}], "schedules": []},
+                {"bogus": True},
+            ],
+        }
+        mock_api_client.get_playlist_steps.side_effect = XScheduleConnectionError("down")
+        catalog = XScheduleCatalog(mock_api_client, store=mock_store)
+
+        snapshot = await catalog.async_restore()
+
+        assert snapshot.names == ["Halloween"]
+        assert await catalog.async_get_steps("Halloween") == [{"name": "Thriller"}]
+
+    @pytest.mark.asyncio
+    async def test_restore_ignores_unreadable_store(self, mock_api_client, mock_store):
+        """Test a corrupt store leaves an empty catalog."""
+        mock_store.async_load.side_effect = ValueError("bad json")
+        catalog = XScheduleCatalog(mock_api_client, store=mock_store)
+
+        snapshot = await catalog.async_restore()
+
+        assert snapshot.names == []
+
+    @pytest.mark.asyncio
+    async def test_changes_schedule_debounced_save(self, mock_api_client, mock_store):
+        """Test snapshot updates are written through the delayed save."""
+        catalog = XScheduleCatalog(mock_api_client, store=mock_store)
+
+        await catalog.async_load()
+        await catalog.async_get_steps("Halloween")
+        # A read that returns what the snapshot already has isn't saved
+        assert mock_store.async_delay_save.call_count == 1
+
+        mock_api_client.get_playlist_steps.side_effect = None
+        mock_api_client.get_playlist_steps.return_value = [{"name": "Monster Mash"}]
+        await catalog.async_get_steps("Halloween")
+
+        assert mock_store.async_delay_save.call_count == 2
+        data_func, delay = mock_store.async_delay_save.call_args.args
+        assert delay == CATALOG_SAVE_DELAY
+        assert [p["name"] for p in data_func()["playlists"]] == [
+            "Halloween", "Christmas", "Background"
+        ]
+
+
+class TestCatalogResponse:
+    """Test the get_catalog service response."""
+
+    def test_active_schedule_preferred(self):
+        """Test an active schedule wins over upcoming ones."""
+        schedules = [
+            {"name": "Later", "active": "FALSE", "nextactive": "2025-10-23 18:00:00"},
+            {"name": "Now", "active": "TRUE", "nextactive": "NOW!"},
+        ]
+
+        assert best_schedule(schedules)["name"] == "Now"
+
+    def test_soonest_upcoming_schedule(self):
+        """Test the earliest dated schedule is chosen when none is active."""
+        schedules = [
+            {"name": "Never", "active": "FALSE", "nextactive": "A long time from now"},
+            {"name": "Friday", "active": "FALSE", "nextactive": "2025-10-24 18:00:00"},
+            {"name": "Thursday", "active": "FALSE", "nextactive": "2025-10-23 18:00:00"},
+        ]
+
+        assert best_schedule(schedules)["name"] == "Thursday"
+
+    def test_undated_schedules_fall_back_to_first(self):
+        """Test the first schedule is used when none has a date."""
+        schedules = [{"name": "A", "nextactive": "N/A"}, {"name": "B", "nextactive": ""}]
+
+        assert best_schedule(schedules)["name"] == "A"
+        assert best_schedule([]) is None
+        assert best_schedule(None) is None
+
+    @pytest.mark.asyncio
+    async def test_response_has_durations_steps_and_schedule(self, mock_api_client):
+        """Test every playlist is summarised in one response."""
+        mock_api_client.get_playlist_steps.side_effect = (
+            lambda name, force_refresh=False: [{"name": f"{name} Song", "lengthms": "180000"}]
+        )
+        catalog = XScheduleCatalog(mock_api_client)
+
+        response = (await catalog.async_load()).as_response()
+
+        assert [p["name"] for p in response["playlists"]] == [
+            "Halloween", "Christmas", "Background"
+        ]
+        assert response["playlists"][1] == {
+            "name": "Christmas",
+            "duration": 900000,
+            "steps": [{"name": "Christmas Song", "duration": 180000}],
+            "schedule": {"name": "Christmas Schedule"},
+        }
+
+    def test_unloaded_steps_reported_as_none(self):
+        """Test a playlist whose steps never loaded is distinguishable from an empty one."""
+        snapshot = CatalogSnapshot.from_dict(
+            {"playlists": [{"name": "Halloween", "metadata": {"lengthms": "bad"}}]}
+        )
+
+        assert snapshot.as_response()["playlists"] == [
+            {"name": "Halloween", "duration": 0, "steps": None, "schedule": None}
+        ]
+
+
+class TestStepCatalog:
+    """Test the indexed step list."""
+
+    STEPS = [
+        {"name": "Thriller", "id": "1", "lengthms": "180000"},
+        {"name": "Ghostbusters", "id": "2", "lengthms": "240000"},
+        {"name": "Monster Mash", "id": "3", "lengthms": "bad"},
+        {"name": "Thriller", "id": "4", "lengthms": "5000"},
+    ]
+
+    def test_lookups(self):
+        """Test name lookups, the first step winning a repeated name."""
+        steps = StepCatalog(self.STEPS)
+
+        assert "Ghostbusters" in steps and "Missing" not in steps
+        assert steps.index("Thriller") == 0
+        assert steps.get("Ghostbusters") is self.STEPS[1]
+        assert steps.index("Missing") is None and steps.get("Missing") is None
+
+    def test_durations(self):
+        """Test lengths are parsed once."""
+        steps = StepCatalog(self.STEPS)
+
+        assert steps.durations == (180000, 240000, 0, 5000)
+        assert steps.duration("Ghostbusters") == 240000
+        assert steps.duration("Monster Mash") == 0 and steps.duration("Missing") == 0
+        assert steps.songs[2] == {"name": "Monster Mash", "duration": 0}
+
+    def test_empty(self):
+        """Test an empty catalog is falsy and finds nothing."""
+        steps = StepCatalog()
+
+        assert not steps
+        assert steps.steps == [] and steps.songs == []
+        assert steps.duration("Thriller") == 0
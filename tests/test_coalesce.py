@@ -0,0 +1,151 @@
+"""Tests for latest-value-wins command sending."""
+import asyncio
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from custom_components.xschedule.api_client import (
+    XScheduleAPIClient,
+    XScheduleConnectionError,
+)
+from custom_components.xschedule.coalesce import LatestValueSender, TokenBucket
+
+
+class GatedSend:
+    """Send function that blocks until released, recording each value."""
+
+    def __init__(self):
+        self.sent = []
+        self.release = asyncio.Event()
+
+    async def __call__(self, parameters):
+        self.sent.append(parameters)
+        await self.release.wait()
+        return {"result": "ok", "value": parameters}
+
+
+class TestTokenBucket:
+    """Test the send rate limit."""
+
+    @pytest.mark.asyncio
+    async def test_burst_then_rate_limited(self):
+        """Test `burst` tokens are immediate and the next one waits."""
+        bucket = TokenBucket(rate=50, burst=2)
+
+        await bucket.async_acquire()
+        await bucket.async_acquire()
+        with patch("custom_components.xschedule.coalesce.asyncio.sleep") as mock_sleep:
+            mock_sleep.side_effect = lambda delay: bucket.__setattr__("_tokens", 1.0)
+            await bucket.async_acquire()
+
+        assert mock_sleep.call_args.args[0] == pytest.approx(0.02, abs=0.005)
+
+
+class TestLatestValueSender:
+    """Test queued values are replaced by newer ones."""
+
+    @pytest.mark.asyncio
+    async def test_values_replaced_while_in_flight(self):
+        """Test only the first and the newest value are sent during a drag."""
+        send = GatedSend()
+        sender = LatestValueSender("Set volume to", send, TokenBucket(1000, 10))
+
+        calls = []
+        for value in range(10, 60, 10):
+            calls.append(asyncio.ensure_future(sender.async_send(str(value))))
+            await asyncio.sleep(0)
+        send.release.set()
+        results = await asyncio.gather(*calls)
+
+        assert send.sent == ["10", "50"]
+        assert results[0]["value"] == "10"
+        # Replaced callers get the result of the send carrying the newest value
+        assert all(result["value"] == "50" for result in results[1:])
+        assert sender.superseded == 3
+
+    @pytest.mark.asyncio
+    async def test_values_replaced_while_rate_limited(self):
+        """Test values arriving while waiting for a token collapse into one send."""
+        send = AsyncMock(side_effect=lambda value: {"result": "ok", "value": value})
+        sender = LatestValueSender("Set step position ms", send, TokenBucket(20, 1))
+
+        await sender.async_send("1000")
+        await asyncio.gather(*(sender.async_send(str(ms)) for ms in (2000, 3000, 4000)))
+
+        assert [call.args[0] for call in send.call_args_list] == ["1000", "4000"]
+
+    @pytest.mark.asyncio
+    async def test_error_reaches_every_waiter(self):
+        """Test a failed send raises for all callers it carried."""
+        send = GatedSend()
+        sender = LatestValueSender("Set volume to", send, TokenBucket(1000, 10))
+        first = asyncio.ensure_future(sender.async_send("10"))
+        await asyncio.sleep(0)
+
+        send.release.set()
+        await first
+        send.release.clear()
+
+        async def fail(parameters):
+            raise XScheduleConnectionError("down")
+
+        sender._send = fail
+        results = await asyncio.gather(
+            sender.async_send("20"), sender.async_send("30"), return_exceptions=True
+        )
+
+        assert all(isinstance(result, XScheduleConnectionError) for result in results)
+
+    @pytest.mark.asyncio
+    async def test_cancel_releases_waiters(self):
+        """Test cancelling the sender cancels in-flight and queued callers."""
+        send = GatedSend()
+        sender = LatestValueSender("Set volume to", send, TokenBucket(1000, 10))
+        calls = [asyncio.ensure_future(sender.async_send(v)) for v in ("10", "20")]
+        await asyncio.sleep(0)
+
+        sender.cancel()
+        results = await asyncio.gather(*calls, return_exceptions=True)
+
+        assert all(isinstance(result, asyncio.CancelledError) for result in results)
+
+
+class TestClientCoalescing:
+    """Test which API client commands are coalesced."""
+
+    @pytest.fixture
+    def api_client(self):
+        """Create API client instance."""
+        return XScheduleAPIClient(host="192.168.1.100", port=80)
+
+    @pytest.mark.asyncio
+    async def test_volume_drag_sends_latest(self, api_client):
+        """Test a burst of volume changes ends on the final value."""
+        sent = []
+
+        async def send(command_name, parameters):
+            sent.append((command_name, parameters))
+            await asyncio.sleep(0.01)
+            return {"result": "ok"}
+
+        with patch.object(api_client, "_send_command", side_effect=send):
+            calls = []
+            for volume in range(0, 101, 5):
+                calls.append(asyncio.ensure_future(api_client.set_volume(volume)))
+                await asyncio.sleep(0.001)
+            await asyncio.gather(*calls)
+
+        assert sent[0] == ("Set volume to", "0")
+        assert sent[-1] == ("Set volume to", "100")
+        assert len(sent) < 10
+        assert api_client.connection_stats["commands_coalesced"] == 21 - len(sent)
+
+    @pytest.mark.asyncio
+    async def test_relative_commands_not_coalesced(self, api_client):
+        """Test every relative adjustment is sent."""
+        with patch.object(
+            api_client, "_send_command", new=AsyncMock(return_value={"result": "ok"})
+        ) as mock_send:
+            await asyncio.gather(*(api_client.adjust_volume(5) for _ in range(4)))
+
+        assert mock_send.call_count == 4
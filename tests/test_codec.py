@@ -0,0 +1,28 @@
+"""Tests for the JSON codec."""
+import json
+
+import pytest
+
+from custom_components.xschedule import codec
+from tests.fixtures.api_responses import PLAYING_STATUS_FULL, PLAYLIST_STEPS_HALLOWEEN
+
+
+class TestCodec:
+    """Test the codec matches the stdlib json module."""
+
+    def test_orjson_used_when_installed(self):
+        """Test the fast codec is picked up (Home Assistant ships orjson)."""
+        pytest.importorskip("orjson")
+        assert codec.CODEC == "orjson"
+
+    @pytest.mark.parametrize("payload", [PLAYING_STATUS_FULL, PLAYLIST_STEPS_HALLOWEEN])
+    def test_round_trip(self, payload):
+        """Test encoding and decoding agree with json."""
+        assert codec.loads(json.dumps(payload)) == payload
+        assert json.loads(codec.dumps(payload)) == payload
+        assert isinstance(codec.dumps(payload), str)
+
+    def test_decode_error_is_json_decode_error(self):
+        """Test malformed input raises the exception callers already catch."""
+        with pytest.raises(json.JSONDecodeError):
+            codec.loads("{invalid json}")
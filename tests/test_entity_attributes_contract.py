@@ -26,6 +26,7 @@ def mock_api_client():
     ])
     client.jump_to_step_at_end = AsyncMock(return_value={"result": "ok"})
     client.invalidate_cache = MagicMock()
+    client.observe_status = MagicMock(return_value=frozenset())
     client.close = AsyncMock()
     return client
 
@@ -36,13 +37,14 @@ def mock_websocket():
     ws = MagicMock()
     ws.connect = AsyncMock()
     ws.disconnect = AsyncMock()
-    ws.send_command = AsyncMock()
     ws.connected = True  # Mark as connected so async_update doesn't re-fetch status
     return ws
 
 
 @pytest.fixture
-async def media_player_entity(hass: HomeAssistant, mock_api_client, mock_websocket):
+async def media_player_entity(
+    hass: HomeAssistant, mock_api_client, mock_websocket, attach_hub
+):
     """Create media player entity for testing."""
     config_entry = MockConfigEntry(
         domain=DOMAIN,
@@ -54,12 +56,9 @@ async def media_player_entity(hass: HomeAssistant, mock_api_client, mock_websock
         },
     )
 
-    with patch('custom_components.xschedule.media_player.XScheduleWebSocket', return_value=mock_websocket):
-        entity = XScheduleMediaPlayer(
-            config_entry=config_entry,
-            api_client=mock_api_client,
-            hass=hass,
-        )
+    with patch('custom_components.xschedule.hub.XScheduleWebSocket', return_value=mock_websocket):
+        attach_hub(hass, config_entry, mock_api_client)
+        entity = XScheduleMediaPlayer(config_entry=config_entry, hass=hass)
 
     entity.entity_id = "media_player.xschedule_test"
     await entity.async_added_to_hass()
@@ -0,0 +1,204 @@
+"""Tests for the per-host connection hub."""
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from homeassistant.const import CONF_HOST, CONF_PORT
+from homeassistant.core import HomeAssistant
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.xschedule.const import CONF_PASSWORD, DOMAIN
+from custom_components.xschedule.hub import (
+    HUBS_KEY,
+    XScheduleHub,
+    async_get_hub,
+    async_release_hub,
+    catalog_store_key,
+)
+
+HOST_DATA = {"host": "192.168.1.100", "port": 80, "password": ""}
+
+
+@pytest.fixture
+def mock_websocket():
+    """Create a mock WebSocket that is down."""
+    ws = MagicMock()
+    ws.connect = AsyncMock()
+    ws.disconnect = AsyncMock()
+    ws.connected = False
+    return ws
+
+
+@pytest.fixture
+def mock_api_client():
+    """Create a mock API client."""
+    client = MagicMock()
+    client.get_playing_status = AsyncMock(return_value={"status": "idle"})
+    client.close = AsyncMock()
+    return client
+
+
+def make_entry(hass, **data):
+    """Create an entry for the test host."""
+    entry = MockConfigEntry(domain=DOMAIN, data={**HOST_DATA, **data})
+    entry.add_to_hass(hass)
+    return entry
+
+
+class TestFallbackPolling:
+    """Test REST polling follows the WebSocket connection."""
+
+    @pytest.mark.asyncio
+    async def test_polls_only_while_websocket_down(
+        self, hass: HomeAssistant, mock_api_client, mock_websocket
+    ):
+        """Test starting while down polls, and a reconnect stops it."""
+        with patch("custom_components.xschedule.hub.XScheduleWebSocket", return_value=mock_websocket), patch(
+            "custom_components.xschedule.hub.XScheduleAPIClient", return_value=mock_api_client
+        ):
+            hub = XScheduleHub(hass, HOST_DATA)
+        assert not hub.poller.running
+
+        await hub.async_start()
+        assert hub.poller.running
+
+        hub._handle_connection(True)
+        assert not hub.poller.running
+        hub._handle_connection(False)
+        assert hub.poller.running
+
+        await hub.async_stop()
+        assert not hub.poller.running
+
+    @pytest.mark.asyncio
+    async def test_interval_follows_state(self, hass: HomeAssistant, mock_api_client):
+        """Test polling is fast while playing and slow otherwise."""
+        with patch("custom_components.xschedule.hub.XScheduleAPIClient", return_value=mock_api_client):
+            hub = XScheduleHub(hass, HOST_DATA)
+
+        for status, interval in (("Playing", 1), ("paused", 5), ("idle", 10)):
+            hub.websocket.dispatch_status({"status": status})
+            assert hub._poll_interval() == interval
+
+    @pytest.mark.asyncio
+    async def test_refresh_routes_controllers(self, hass: HomeAssistant, mock_api_client):
+        """Test a REST refresh reaches the router's controller list."""
+        mock_api_client.get_playing_status.return_value = {
+            "status": "idle",
+            "pingstatus": [{"controller": "Tree", "ip": "192.168.1.101", "result": "Ok"}],
+        }
+        with patch("custom_components.xschedule.hub.XScheduleAPIClient", return_value=mock_api_client):
+            hub = XScheduleHub(hass, HOST_DATA)
+
+        await hub.async_refresh_status()
+
+        assert [controller.controller for controller in hub.controllers] == ["Tree"]
+
+    @pytest.mark.asyncio
+    async def test_refresh_skips_reply_routed_by_socket(self, hass: HomeAssistant, mock_api_client):
+        """Test a status answered over the WebSocket isn't routed a second time."""
+        with patch("custom_components.xschedule.hub.XScheduleAPIClient", return_value=mock_api_client):
+            hub = XScheduleHub(hass, HOST_DATA)
+        reply = {"status": "idle"}
+        mock_api_client.get_playing_status.return_value = reply
+        hub.websocket._status_reply = reply
+
+        with patch.object(hub.websocket, "dispatch_status") as dispatch:
+            await hub.async_refresh_status()
+            dispatch.assert_not_called()
+
+            mock_api_client.get_playing_status.return_value = {"status": "idle"}
+            await hub.async_refresh_status()
+            dispatch.assert_called_once()
+
+
+class TestSharedHub:
+    """Test entries for one host share a hub."""
+
+    @pytest.mark.asyncio
+    async def test_entries_share_hub_until_last_released(
+        self, hass: HomeAssistant, mock_websocket
+    ):
+        """Test a second entry reuses the connection and the last one stops it."""
+        first, second = make_entry(hass), make_entry(hass)
+        other_host = make_entry(hass, host="192.168.1.200")
+
+        with patch("custom_components.xschedule.hub.XScheduleWebSocket", return_value=mock_websocket):
+            for entry in (first, second, other_host):
+                entry.runtime_data = await async_get_hub(hass, entry)
+        hub = first.runtime_data
+        assert second.runtime_data is hub
+        assert other_host.runtime_data is not hub
+        mock_websocket.connect.assert_called()
+        assert mock_websocket.connect.call_count == 2  # one per host
+
+        await async_release_hub(hass, first)
+        mock_websocket.disconnect.assert_not_called()
+        assert hub in hass.data[HUBS_KEY].values()
+
+        await async_release_hub(hass, second)
+        mock_websocket.disconnect.assert_called_once()
+        assert hub not in hass.data[HUBS_KEY].values()
+        await async_release_hub(hass, other_host)
+
+    @pytest.mark.asyncio
+    async def test_host_change_stops_old_hub(
+        self, hass: HomeAssistant, mock_api_client, mock_websocket
+    ):
+        """Test moving an entry to another host through options stops its old hub."""
+        entry = make_entry(hass)
+        mock_api_client.validate_connection = AsyncMock(return_value=True)
+        new_websocket = MagicMock(connect=AsyncMock(), disconnect=AsyncMock(), connected=False)
+
+        with patch("custom_components.xschedule.PLATFORMS", []), patch(
+            "custom_components.xschedule._copy_cards_to_www", AsyncMock(return_value={})
+        ), patch(
+            "custom_components.xschedule.hub.XScheduleAPIClient", return_value=mock_api_client
+        ), patch(
+            "custom_components.xschedule.config_flow.XScheduleAPIClient",
+            return_value=mock_api_client,
+        ), patch(
+            "custom_components.xschedule.hub.XScheduleWebSocket",
+            side_effect=[mock_websocket, new_websocket],
+        ):
+            assert await hass.config_entries.async_setup(entry.entry_id)
+            old_hub = entry.runtime_data
+
+            flow = await hass.config_entries.options.async_init(entry.entry_id)
+            await hass.config_entries.options.async_configure(
+                flow["flow_id"],
+                user_input={CONF_HOST: "192.168.1.200", CONF_PORT: 80, CONF_PASSWORD: ""},
+            )
+            await hass.async_block_till_done()
+
+        mock_websocket.disconnect.assert_called_once()
+        assert not old_hub.poller.running
+        assert entry.runtime_data.key == ("192.168.1.200", 80)
+        assert list(hass.data[HUBS_KEY].values()) == [entry.runtime_data]
+
+        await hass.config_entries.async_unload(entry.entry_id)
+        new_websocket.disconnect.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_catalog_store_outlives_first_entry(
+        self, hass: HomeAssistant, mock_websocket
+    ):
+        """Test the catalog is stored per host and removed with its last entry."""
+        from custom_components.xschedule import async_remove_entry
+
+        first, second = make_entry(hass), make_entry(hass)
+        with patch("custom_components.xschedule.hub.XScheduleWebSocket", return_value=mock_websocket):
+            for entry in (first, second):
+                entry.runtime_data = await async_get_hub(hass, entry)
+        hub = first.runtime_data
+        assert hub.catalog._store.key == catalog_store_key("192.168.1.100", 80)
+
+        catalog_key = catalog_store_key("192.168.1.100", 80)
+        with patch("custom_components.xschedule.Store") as store:
+            store.return_value.async_remove = AsyncMock()
+            await async_release_hub(hass, first)
+            await hass.config_entries.async_remove(first.entry_id)
+            assert catalog_key not in [call.args[2] for call in store.call_args_list]
+
+            await async_release_hub(hass, second)
+            await hass.config_entries.async_remove(second.entry_id)
+            assert catalog_key in [call.args[2] for call in store.call_args_list]
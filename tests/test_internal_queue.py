@@ -1,13 +1,17 @@
 """Tests for internal queue management functionality."""
 from __future__ import annotations
 
+import asyncio
 import uuid
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 
 from custom_components.xschedule.api_client import XScheduleAPIError
+from custom_components.xschedule.const import QUEUE_SAVE_DELAY
+from custom_components.xschedule.internal_queue import InternalQueue
 from custom_components.xschedule.media_player import XScheduleMediaPlayer
+from custom_components.xschedule.status import StatusSnapshot
 from homeassistant.components.media_player import MediaPlayerState
 from homeassistant.core import HomeAssistant
 
@@ -31,11 +35,13 @@ def mock_api_client():
         {"name": "Song 3", "lengthms": "190000"},
     ])
     client.jump_to_step_at_end = AsyncMock(return_value={"result": "ok"})
+    client.observe_status = MagicMock(return_value=frozenset())
+    client.attach_websocket = MagicMock()
     return client
 
 
 @pytest.fixture
-def media_player_entity(mock_hass, mock_api_client):
+def media_player_entity(mock_hass, mock_api_client, attach_hub):
     """Create a media player entity with mocked dependencies."""
     from homeassistant.config_entries import ConfigEntry
     
@@ -46,7 +52,10 @@ def media_player_entity(mock_hass, mock_api_client):
         "port": 8080,
     }
     
-    entity = XScheduleMediaPlayer(config_entry, mock_api_client, mock_hass)
+    # The mock hass has no shared session
+    with patch("custom_components.xschedule.hub.async_get_clientsession"):
+        attach_hub(mock_hass, config_entry, mock_api_client)
+    entity = XScheduleMediaPlayer(config_entry, mock_hass)
     entity._hass = mock_hass
     entity.hass = mock_hass  # Add hass attribute
     entity._attr_media_playlist = "Test Playlist"
@@ -198,6 +207,45 @@ class TestInternalQueueRemoval:
         with pytest.raises(XScheduleAPIError, match="Queue item.*not found"):
             await media_player_entity.async_remove_from_internal_queue("invalid-uuid")
 
+    @pytest.mark.asyncio
+    async def test_remove_head_rearms_next(self, media_player_entity):
+        """Test removing the armed head arms the new head, and emptying disarms."""
+        await media_player_entity.async_add_many_to_internal_queue(["Song 1", "Song 2", "Song 3"])
+        jump = media_player_entity._api_client.jump_to_step_at_end
+        jump.reset_mock()
+
+        await media_player_entity.async_remove_from_internal_queue(
+            media_player_entity._internal_queue.find("Song 3")["id"]
+        )
+        jump.assert_not_called()
+
+        await media_player_entity.async_remove_from_internal_queue(
+            media_player_entity._internal_queue.head["id"]
+        )
+        jump.assert_called_once_with("Song 2")
+        assert media_player_entity._advancer.armed == "Song 2"
+
+        await media_player_entity.async_remove_from_internal_queue(
+            media_player_entity._internal_queue.head["id"]
+        )
+        assert media_player_entity._advancer.armed is None
+
+    @pytest.mark.asyncio
+    async def test_remove_waits_for_batch(self, media_player_entity):
+        """Test a removal doesn't interleave with a batch in progress."""
+        await media_player_entity.async_add_to_internal_queue("Song 1")
+        item_id = media_player_entity._internal_queue.head["id"]
+
+        async with media_player_entity._queue_lock:
+            task = asyncio.ensure_future(
+                media_player_entity.async_remove_from_internal_queue(item_id)
+            )
+            await asyncio.sleep(0)
+            assert len(media_player_entity._internal_queue) == 1
+
+        await task
+        assert not media_player_entity._internal_queue
+
 
 class TestInternalQueueReordering:
     """Tests for reordering the internal queue."""
@@ -339,10 +387,10 @@ class TestSongChangeDetection:
         assert len(media_player_entity._internal_queue) == 1
         assert media_player_entity._internal_queue[0]["name"] == "Song 2"
         
-        # Note: Due to mock setup, async_create_task executes the coroutine directly
-        # So we verify the jump actually happened by checking if it was called
-        # (The mock will have already executed _jump_to_next_queued_song)
-        # In real execution, this would be async via create_task
+        # The advancer arms Song 2 in the background
+        await media_player_entity._advancer._task
+        media_player_entity._api_client.jump_to_step_at_end.assert_called_once_with("Song 2")
+        assert media_player_entity._advancer.armed == "Song 2"
 
     @pytest.mark.asyncio
     async def test_song_start_empty_queue_after_removal(self, media_player_entity):
@@ -368,13 +416,53 @@ class TestSongChangeDetection:
         await media_player_entity.async_add_to_internal_queue("Song 1")
         await media_player_entity.async_add_to_internal_queue("Song 2")
         
+        media_player_entity._api_client.jump_to_step_at_end.reset_mock()
+        
         # Simulate Song 3 (not in queue) starting
+        media_player_entity._advancer.observe(StatusSnapshot(step="Song 3"))
         media_player_entity._handle_song_started("Song 3")
         
         # Verify queue unchanged
         assert len(media_player_entity._internal_queue) == 2
         assert media_player_entity._internal_queue[0]["name"] == "Song 1"
 
+        # The head is armed again to follow Song 3
+        await media_player_entity._advancer._task
+        media_player_entity._api_client.jump_to_step_at_end.assert_called_once_with("Song 1")
+
+    @pytest.mark.asyncio
+    async def test_song_start_drops_other_playlist_songs(self, media_player_entity):
+        """Test songs queued from another playlist are dropped, not armed."""
+        await media_player_entity.async_add_to_internal_queue("Song 1")
+        await media_player_entity.async_add_to_internal_queue("Song 2")
+        media_player_entity._api_client.jump_to_step_at_end.reset_mock()
+
+        media_player_entity._attr_media_playlist = "Other Playlist"
+        media_player_entity._handle_song_started("Song 3")
+
+        assert len(media_player_entity._internal_queue) == 0
+        media_player_entity._api_client.jump_to_step_at_end.assert_not_called()
+        media_player_entity.async_write_ha_state.assert_called()
+
+    @pytest.mark.asyncio
+    async def test_rejected_head_dropped(self, media_player_entity):
+        """Test a head xSchedule won't jump to is dropped and the next armed."""
+        await media_player_entity.async_add_to_internal_queue("Song 1")
+        await media_player_entity.async_add_to_internal_queue("Song 2")
+        jump = media_player_entity._api_client.jump_to_step_at_end
+        jump.reset_mock()
+        jump.side_effect = [{"result": "failed", "message": "Step not found"}, {"result": "ok"}]
+
+        media_player_entity._advancer.observe(StatusSnapshot(step="Song 3"))
+        media_player_entity._handle_song_started("Song 3")
+        await media_player_entity._advancer._task
+        # The rejection armed Song 2 in a new task
+        await media_player_entity._advancer._task
+
+        assert [item["name"] for item in media_player_entity._internal_queue] == ["Song 2"]
+        assert [c.args[0] for c in jump.call_args_list] == ["Song 1", "Song 2"]
+        assert media_player_entity._advancer.armed == "Song 2"
+
     @pytest.mark.asyncio
     async def test_song_start_removes_from_middle(self, media_player_entity):
         """Test that starting queued song from middle of queue works."""
@@ -431,9 +519,9 @@ class TestWebSocketIntegration:
     def test_websocket_update_detects_song_change(self, media_player_entity):
         """Test that WebSocket updates trigger song change detection."""
         # Add song to queue
-        media_player_entity._internal_queue = [
+        media_player_entity._internal_queue = InternalQueue([
             {"id": "test-id", "name": "Song 1", "playlist": "Test", "priority": 1, "lengthms": "180000"}
-        ]
+        ])
         
         # Set previous song to simulate a change
         media_player_entity._previous_song = "Song 0"
@@ -453,9 +541,9 @@ class TestWebSocketIntegration:
     def test_websocket_update_skips_first_load(self, media_player_entity):
         """Test that first WebSocket update doesn't trigger song detection."""
         # Add song to queue
-        media_player_entity._internal_queue = [
+        media_player_entity._internal_queue = InternalQueue([
             {"id": "test-id", "name": "Song 1", "playlist": "Test", "priority": 1, "lengthms": "180000"}
-        ]
+        ])
         media_player_entity._previous_song = None  # Simulate first load
         
         # Simulate first WebSocket update
@@ -529,3 +617,212 @@ class TestEdgeCases:
         assert len(media_player_entity._internal_queue) == 1
         assert media_player_entity._internal_queue[0]["priority"] == 5
 
+
+
+class TestBulkQueueOperations:
+    """Tests for batched queue operations."""
+
+    @pytest.mark.asyncio
+    async def test_add_many_writes_and_jumps_once(self, media_player_entity):
+        """Test a batch of adds is one state write, one save and one jump."""
+        store = media_player_entity._queue_store = MagicMock()
+
+        await media_player_entity.async_add_many_to_internal_queue(["Song 2", "Song 1", "Song 2"])
+
+        assert [item["name"] for item in media_player_entity._internal_queue] == ["Song 2", "Song 1"]
+        assert media_player_entity._internal_queue[0]["priority"] == 2
+        media_player_entity.async_write_ha_state.assert_called_once()
+        store.async_delay_save.assert_called_once()
+        media_player_entity._api_client.jump_to_step_at_end.assert_called_once_with("Song 2")
+
+    @pytest.mark.asyncio
+    async def test_failed_operation_changes_nothing(self, media_player_entity):
+        """Test a failing operation leaves the queue as it was."""
+        await media_player_entity.async_add_to_internal_queue("Song 1")
+        media_player_entity._api_client.jump_to_step_at_end.reset_mock()
+        before = media_player_entity._internal_queue.as_dict()
+
+        with pytest.raises(XScheduleAPIError, match="Operation 2 \\(remove\\)"):
+            await media_player_entity.async_apply_queue_ops([
+                {"op": "add", "song": "Song 2"},
+                {"op": "remove", "song": "Song 3"},
+            ])
+
+        assert media_player_entity._internal_queue.as_dict() == before
+        media_player_entity._api_client.jump_to_step_at_end.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_jump_only_when_head_changes(self, media_player_entity):
+        """Test moves that keep the head don't jump, and one that changes it does."""
+        await media_player_entity.async_add_many_to_internal_queue(["Song 1", "Song 2", "Song 3"])
+        jump = media_player_entity._api_client.jump_to_step_at_end
+        jump.reset_mock()
+
+        await media_player_entity.async_apply_queue_ops([
+            {"op": "move", "song": "Song 3", "position": 1},
+        ])
+        jump.assert_not_called()
+
+        song_2 = media_player_entity._internal_queue.find("Song 2")
+        await media_player_entity.async_apply_queue_ops([
+            {"op": "move", "queue_item_id": song_2["id"], "position": 0},
+            {"op": "remove", "song": "Song 1"},
+        ])
+
+        assert [item["name"] for item in media_player_entity._internal_queue] == ["Song 2", "Song 3"]
+        jump.assert_called_once_with("Song 2")
+
+
+class TestQueuePersistence:
+    """Tests for saving and restoring the internal queue."""
+
+    @pytest.mark.asyncio
+    async def test_changes_saved_debounced(self, media_player_entity):
+        """Test each change schedules the same debounced save of the whole queue."""
+        store = media_player_entity._queue_store = MagicMock()
+
+        await media_player_entity.async_add_to_internal_queue("Song 1")
+        await media_player_entity.async_add_to_internal_queue("Song 2")
+
+        assert all(
+            call.args[1] == QUEUE_SAVE_DELAY for call in store.async_delay_save.call_args_list
+        )
+        data = store.async_delay_save.call_args.args[0]()
+        assert [item["name"] for item in data["items"]] == ["Song 1", "Song 2"]
+        assert data["manual"] is False
+
+    @pytest.mark.asyncio
+    async def test_restore_checked_against_first_status(self, media_player_entity, mock_hass):
+        """Test stale items are dropped and the jump to the head is re-armed."""
+        media_player_entity._queue_store = MagicMock()
+        saved = InternalQueue()
+        for name, playlist in (
+            ("Song 1", "Test Playlist"),  # already playing
+            ("Song 3", "Test Playlist"),
+            ("Gone", "Test Playlist"),  # no longer in the playlist
+            ("Song 2", "Other Playlist"),
+        ):
+            saved.add(name, playlist)
+        media_player_entity._restored_queue = saved.as_dict()
+
+        media_player_entity._handle_websocket_update(
+            {"status": "playing", "playlist": "Test Playlist", "step": "Song 1"}
+        )
+
+        assert [item["name"] for item in media_player_entity._internal_queue] == ["Song 3"]
+        assert media_player_entity._restored_queue is None
+        media_player_entity._queue_store.async_delay_save.assert_called()
+
+        await media_player_entity._advancer._task
+        media_player_entity._api_client.jump_to_step_at_end.assert_called_once_with("Song 3")
+
+    def test_malformed_items_skipped(self):
+        """Test a damaged store restores whatever is still valid."""
+        queue = InternalQueue.from_dict(
+            {
+                "items": [
+                    {"id": "1", "name": "Song 1", "playlist": "P", "priority": "2"},
+                    {"name": "no id"},
+                    "junk",
+                    {"id": "1", "name": "duplicate", "playlist": "P"},
+                ],
+                "manual": True,
+            }
+        )
+
+        assert [item["name"] for item in queue] == ["Song 1"]
+        assert queue[0]["priority"] == 2 and queue.manual
+
+
+class TestInternalQueueStructure:
+    """Tests for the InternalQueue heap and indexes."""
+
+    def _names(self, queue):
+        return [item["name"] for item in queue]
+
+    def test_priority_then_insertion_order(self):
+        """Test bumps move songs up, ties keep the order they reached it."""
+        queue = InternalQueue()
+        a, b, c = (queue.add(name, "Halloween") for name in ("A", "B", "C"))
+
+        queue.bump(c["id"])
+        queue.bump(a["id"])
+        assert self._names(queue) == ["C", "A", "B"]
+        assert queue.head is c
+        assert queue.find("B") is b and queue.get(a["id"]) is a
+
+        queue.remove(c["id"])
+        assert queue.head is a
+        assert queue.find("C") is None and len(queue) == 2
+
+    def test_manual_order_until_bump(self):
+        """Test reorder holds for adds, and a bump re-sorts by priority."""
+        queue = InternalQueue()
+        a, b, c = (queue.add(name, "Halloween") for name in ("A", "B", "C"))
+        queue.bump(a["id"])
+
+        queue.reorder([c["id"], b["id"], a["id"]])
+        d = queue.add("D", "Halloween")
+        assert queue.manual
+        assert self._names(queue) == ["C", "B", "A", "D"]
+
+        queue.bump(d["id"])
+        assert not queue.manual
+        assert self._names(queue) == ["A", "D", "C", "B"]
+
+    def test_reorder_must_list_every_item(self):
+        """Test a partial or duplicated order is rejected."""
+        queue = InternalQueue()
+        a = queue.add("A", "Halloween")
+        queue.add("B", "Halloween")
+
+        with pytest.raises(ValueError):
+            queue.reorder([a["id"], a["id"]])
+
+    def test_attribute_cached_until_change(self):
+        """Test the state attribute is rebuilt only after a change."""
+        queue = InternalQueue()
+        queue.add("A", "Halloween", "180000")
+        attribute = queue.as_attribute()
+        version = queue.version
+
+        assert queue.as_attribute() is attribute
+        assert attribute[0]["duration"] == 180000
+
+        queue.add("B", "Halloween")
+        assert queue.as_attribute() is not attribute
+        assert queue.version != version
+
+    def test_restored_order_kept(self):
+        """Test a queue built from items keeps their order, manual or not."""
+        items = [
+            {"id": "1", "name": "A", "playlist": "P", "priority": 1, "lengthms": "0"},
+            {"id": "2", "name": "B", "playlist": "P", "priority": 3, "lengthms": "0"},
+        ]
+        queue = InternalQueue(items)
+
+        assert queue.manual
+        assert self._names(queue) == ["A", "B"]
+
+    def test_stale_heap_entries_compacted(self):
+        """Test repeated bumps don't grow the heap without bound."""
+        queue = InternalQueue()
+        item = queue.add("A", "Halloween")
+        for _ in range(100):
+            queue.bump(item["id"])
+
+        assert len(queue._heap) <= 2 * len(queue) + 16
+        assert queue.head is item and item["priority"] == 101
+
+    def test_move_and_copy(self):
+        """Test move sets a manual order and copies are independent."""
+        queue = InternalQueue()
+        *_, third = (queue.add(name, "P") for name in ("A", "B", "C"))
+
+        copy = queue.copy()
+        queue.move(third["id"], 0)
+
+        assert queue.manual and self._names(queue) == ["C", "A", "B"]
+        assert not copy.manual and self._names(copy) == ["A", "B", "C"]
+        with pytest.raises(KeyError):
+            queue.move("missing", 0)
@@ -1,10 +1,14 @@
 """Tests for xSchedule media player entity."""
+from datetime import datetime, timedelta, timezone
+
 import pytest
 from unittest.mock import AsyncMock, MagicMock, patch, call
 from homeassistant.components.media_player import MediaPlayerState
 from homeassistant.core import HomeAssistant
 from pytest_homeassistant_custom_component.common import MockConfigEntry
 
+from custom_components.xschedule.catalog import CatalogSnapshot, PlaylistEntry, XScheduleCatalog
+from custom_components.xschedule.hub import XScheduleHub
 from custom_components.xschedule.media_player import XScheduleMediaPlayer
 from custom_components.xschedule.const import DOMAIN, EVENT_CACHE_INVALIDATED
 
@@ -42,6 +46,7 @@ def mock_api_client():
 
     # Cache management
     client.invalidate_cache = MagicMock()
+    client.observe_status = MagicMock(return_value=frozenset())
 
     # Cleanup
     client.close = AsyncMock()
@@ -54,7 +59,6 @@ def mock_websocket():
     ws = MagicMock()
     ws.connect = AsyncMock()
     ws.disconnect = AsyncMock()
-    ws.send_command = AsyncMock()
     ws.connected = True  # Mark as connected so async_update doesn't re-fetch status
     ws.register_callback = MagicMock()
     ws.unregister_callback = MagicMock()
@@ -62,7 +66,9 @@ def mock_websocket():
 
 
 @pytest.fixture
-async def media_player_entity(hass: HomeAssistant, mock_api_client, mock_websocket):
+async def media_player_entity(
+    hass: HomeAssistant, mock_api_client, mock_websocket, attach_hub
+):
     """Create media player entity for testing."""
     config_entry = MockConfigEntry(
         domain=DOMAIN,
@@ -75,12 +81,9 @@ async def media_player_entity(hass: HomeAssistant, mock_api_client, mock_websock
     )
 
     # Mock the WebSocket creation since it happens in __init__
-    with patch('custom_components.xschedule.media_player.XScheduleWebSocket', return_value=mock_websocket):
-        entity = XScheduleMediaPlayer(
-            config_entry=config_entry,
-            api_client=mock_api_client,
-            hass=hass,
-        )
+    with patch('custom_components.xschedule.hub.XScheduleWebSocket', return_value=mock_websocket):
+        attach_hub(hass, config_entry, mock_api_client)
+        entity = XScheduleMediaPlayer(config_entry=config_entry, hass=hass)
 
     entity.entity_id = "media_player.xschedule_test"
 
@@ -164,8 +167,8 @@ class TestCacheInvalidation:
     """Test cache invalidation behavior."""
 
     @pytest.mark.asyncio
-    async def test_cache_invalidated_on_state_change(self, hass: HomeAssistant, media_player_entity, mock_api_client):
-        """Test cache is invalidated when state changes."""
+    async def test_cache_kept_on_state_change(self, hass: HomeAssistant, media_player_entity, mock_api_client):
+        """Test a transport state change doesn't invalidate cached data."""
         media_player_entity._attr_state = MediaPlayerState.PLAYING
 
         # Reset mock to ignore any setup calls
@@ -174,14 +177,16 @@ class TestCacheInvalidation:
         data = {"status": "paused"}
         media_player_entity._handle_websocket_update(data)
 
-        # Verify cache was invalidated
-        mock_api_client.invalidate_cache.assert_called_once()
+        # Every status is checked for staleness, nothing is wiped
+        mock_api_client.observe_status.assert_called_with(data)
+        mock_api_client.invalidate_cache.assert_not_called()
 
     @pytest.mark.asyncio
-    async def test_cache_invalidated_on_playlist_change(self, hass: HomeAssistant, media_player_entity, mock_api_client):
-        """Test cache is invalidated when playlist changes."""
+    async def test_cache_kept_on_playlist_change(self, hass: HomeAssistant, media_player_entity, mock_api_client):
+        """Test a playlist change reloads its steps without invalidating the cache."""
         media_player_entity._attr_state = MediaPlayerState.PLAYING
         media_player_entity._attr_media_playlist = "Old Playlist"
+        media_player_entity._current_playlist_steps = [{"name": "Old Song"}]
 
         # Reset mock to ignore any setup calls
         mock_api_client.invalidate_cache.reset_mock()
@@ -192,8 +197,24 @@ class TestCacheInvalidation:
         }
         media_player_entity._handle_websocket_update(data)
 
-        # Verify cache was invalidated
-        mock_api_client.invalidate_cache.assert_called_once()
+        mock_api_client.invalidate_cache.assert_not_called()
+        assert media_player_entity._current_playlist_steps == []
+
+    @pytest.mark.asyncio
+    async def test_new_server_session_reloads_steps(self, hass: HomeAssistant, media_player_entity, mock_api_client):
+        """Test a detected xSchedule restart drops the entity's steps too."""
+        from custom_components.xschedule.api_client import CACHE_ALL
+
+        media_player_entity._attr_state = MediaPlayerState.PLAYING
+        media_player_entity._attr_media_playlist = "Test Playlist"
+        media_player_entity._current_playlist_steps = [{"name": "Old Song"}]
+        mock_api_client.observe_status.return_value = CACHE_ALL
+
+        media_player_entity._handle_websocket_update(
+            {"status": "playing", "playlist": "Test Playlist"}
+        )
+
+        assert media_player_entity._current_playlist_steps == []
 
     @pytest.mark.asyncio
     async def test_cache_not_invalidated_without_change(self, hass: HomeAssistant, media_player_entity, mock_api_client):
@@ -319,8 +340,8 @@ class TestMediaPlayerServices:
 
         # Verify API client was called to play the playlist
         mock_api_client.play_playlist.assert_called_once_with("Test Playlist")
-        # Verify cache was invalidated
-        mock_api_client.invalidate_cache.assert_called_once_with("Test Playlist")
+        # Playing doesn't change playlist contents
+        mock_api_client.invalidate_cache.assert_not_called()
 
     @pytest.mark.asyncio
     async def test_play_song(self, media_player_entity, mock_api_client, mock_websocket):
@@ -342,8 +363,8 @@ class TestMediaPlayerServices:
             "Test Playlist",
             "Test Song",
         )
-        # Verify cache was invalidated
-        mock_api_client.invalidate_cache.assert_called_once_with("Test Playlist")
+        # Playing doesn't change playlist contents
+        mock_api_client.invalidate_cache.assert_not_called()
 
     @pytest.mark.asyncio
     async def test_update_fetches_status(self, media_player_entity, mock_api_client, mock_websocket):
@@ -353,10 +374,15 @@ class TestMediaPlayerServices:
         
         # Simulate WebSocket disconnection
         mock_websocket.connected = False
+        mock_websocket.routed.return_value = False
 
         await media_player_entity.async_update()
 
         mock_api_client.get_playing_status.assert_called_once()
+        # Routed through the hub, so every status subscriber sees it
+        mock_websocket.dispatch_status.assert_called_once_with(
+            mock_api_client.get_playing_status.return_value
+        )
 
 
 class TestEntityAttributes:
@@ -391,16 +417,18 @@ class TestPowerOff:
         mock_api_client.stop_all_now.assert_called_once()
 
     @pytest.mark.asyncio
-    async def test_turn_off_via_websocket(self, media_player_entity):
-        """Test turn off command via WebSocket."""
+    async def test_turn_off_with_websocket_connected(self, media_player_entity, mock_api_client):
+        """Test turn off goes through the API client's transport, not the socket directly."""
         mock_websocket = MagicMock()
         mock_websocket.connected = True
-        mock_websocket.send_command = AsyncMock()
+        mock_websocket.async_command = AsyncMock()
         media_player_entity._websocket = mock_websocket
         
         await media_player_entity.async_turn_off()
         
-        mock_websocket.send_command.assert_called_once_with("Stop all now")
+        # The API client picks WebSocket or REST itself
+        mock_api_client.stop_all_now.assert_called_once()
+        mock_websocket.async_command.assert_not_called()
 
     @pytest.mark.asyncio
     async def test_turn_off_handles_error(self, media_player_entity, mock_api_client):
@@ -416,6 +444,81 @@ class TestPowerOff:
         mock_api_client.stop_all_now.assert_called_once()
 
 
+class TestWarmStart:
+    """Test the entity starting from a restored catalog."""
+
+    @pytest.fixture
+    def restored_catalog(self, mock_api_client):
+        """Create a catalog holding a snapshot from a previous run."""
+        catalog = XScheduleCatalog(mock_api_client)
+        catalog._snapshot = CatalogSnapshot(
+            {
+                "Halloween": PlaylistEntry(
+                    "Halloween", {"name": "Halloween"}, [{"name": "Thriller", "lengthms": "5000"}]
+                ),
+                "Christmas": PlaylistEntry("Christmas", {"name": "Christmas"}),
+            }
+        )
+        return catalog
+
+    def _create_entity(self, hass, mock_api_client, mock_websocket, catalog):
+        """Create an entity using the given catalog."""
+        config_entry = MockConfigEntry(
+            domain=DOMAIN, data={"host": "192.168.1.100", "port": 80, "password": ""}
+        )
+        with patch(
+            'custom_components.xschedule.hub.XScheduleWebSocket', return_value=mock_websocket
+        ), patch(
+            'custom_components.xschedule.hub.XScheduleAPIClient', return_value=mock_api_client
+        ), patch('custom_components.xschedule.hub.XScheduleCatalog', return_value=catalog):
+            config_entry.runtime_data = XScheduleHub(hass, config_entry.data)
+            return XScheduleMediaPlayer(config_entry, hass)
+
+    @pytest.mark.asyncio
+    async def test_source_list_available_before_fetch(
+        self, hass, mock_api_client, mock_websocket, restored_catalog
+    ):
+        """Test playlists and browse_media come from the restored catalog."""
+        entity = self._create_entity(hass, mock_api_client, mock_websocket, restored_catalog)
+
+        assert entity.source_list == ["Halloween", "Christmas"]
+        browse = await entity.async_browse_media()
+        assert [child.title for child in browse.children] == ["Halloween", "Christmas"]
+        mock_api_client.get_playlists.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_playlist_steps_seeded_then_revalidated(
+        self, hass, mock_api_client, mock_websocket, restored_catalog
+    ):
+        """Test the catalog's steps show immediately and are refreshed on update."""
+        entity = self._create_entity(hass, mock_api_client, mock_websocket, restored_catalog)
+
+        entity._handle_websocket_update({"status": "playing", "playlist": "Halloween"})
+        assert entity.extra_state_attributes["playlist_songs"] == [
+            {"name": "Thriller", "duration": 5000}
+        ]
+
+        await entity.async_update()
+
+        mock_api_client.get_playlist_steps.assert_called_once_with("Halloween", False)
+        assert entity._current_playlist_steps[0]["name"] == "Song 1"
+
+    @pytest.mark.asyncio
+    async def test_offline_keeps_restored_steps(
+        self, hass, mock_api_client, mock_websocket, restored_catalog
+    ):
+        """Test the restored steps are served while xSchedule is unreachable."""
+        from custom_components.xschedule.api_client import XScheduleConnectionError
+
+        mock_api_client.get_playlist_steps.side_effect = XScheduleConnectionError("down")
+        entity = self._create_entity(hass, mock_api_client, mock_websocket, restored_catalog)
+
+        entity._handle_websocket_update({"status": "playing", "playlist": "Halloween"})
+        await entity.async_update()
+
+        assert entity._current_playlist_steps == [{"name": "Thriller", "lengthms": "5000"}]
+
+
 class TestBrowseMediaDuration:
     """Test BROWSE_MEDIA duration support and edge cases."""
     
@@ -593,3 +696,178 @@ class TestMediaTrackAttribute:
         
         attrs = media_player_entity.extra_state_attributes
         assert "media_track" not in attrs
+
+
+class TestPositionDrift:
+    """Test position-only updates skip the state write."""
+
+    @pytest.fixture
+    def clock(self):
+        """Patch utcnow with a clock the test advances."""
+        now = [datetime(2024, 12, 24, 18, 0, tzinfo=timezone.utc)]
+        with patch(
+            "custom_components.xschedule.media_player.dt_util.utcnow",
+            side_effect=lambda: now[0],
+        ):
+            yield now
+
+    @staticmethod
+    def tick(clock, entity, positionms, **fields):
+        """Advance the clock 200ms and deliver a status update."""
+        clock[0] += timedelta(milliseconds=200)
+        data = {"status": "playing", "step": "Song 1", "lengthms": "180000"}
+        data.update(fields, positionms=str(positionms))
+        entity.hass = entity._hass  # writes are only scheduled once added
+        with patch.object(entity, "_schedule_debounced_update") as mock_write:
+            entity._handle_websocket_update(data)
+        return mock_write.called
+
+    @pytest.mark.asyncio
+    async def test_position_keeping_pace_not_written(self, media_player_entity, clock):
+        """Test ticks matching the extrapolated position don't write state."""
+        assert self.tick(clock, media_player_entity, 1000)
+        written_at = media_player_entity.media_position_updated_at
+
+        writes = [self.tick(clock, media_player_entity, 1000 + 200 * n) for n in range(1, 50)]
+
+        assert not any(writes)
+        assert media_player_entity.media_position == 1.0
+        assert media_player_entity.media_position_updated_at == written_at
+        assert media_player_entity.state_writes_skipped == 49
+
+    @pytest.mark.asyncio
+    async def test_seek_written(self, media_player_entity, clock):
+        """Test a position jump beyond the threshold writes state."""
+        self.tick(clock, media_player_entity, 1000)
+
+        assert self.tick(clock, media_player_entity, 90000)
+        assert media_player_entity.media_position == 90.0
+
+    @pytest.mark.asyncio
+    async def test_other_changes_written_with_fresh_position(self, media_player_entity, clock):
+        """Test a volume change writes state and rebases the position."""
+        self.tick(clock, media_player_entity, 1000)
+
+        assert self.tick(clock, media_player_entity, 1200, volume="40")
+        assert media_player_entity.media_position == 1.2
+
+    @pytest.mark.asyncio
+    async def test_pause_written(self, media_player_entity, clock):
+        """Test the position stops extrapolating once paused."""
+        self.tick(clock, media_player_entity, 1000)
+        assert self.tick(clock, media_player_entity, 1200, status="paused")
+
+        # Paused position stays put, so an unchanged report is not a drift
+        assert not self.tick(clock, media_player_entity, 1200, status="paused")
+
+    @pytest.mark.asyncio
+    async def test_zero_threshold_writes_every_update(self, media_player_entity, clock):
+        """Test a drift threshold of 0 restores a write per update."""
+        media_player_entity._position_drift = 0
+        self.tick(clock, media_player_entity, 1000)
+
+        assert self.tick(clock, media_player_entity, 1200)
+
+
+
+class TestStateSubscription:
+    """Test the xschedule/subscribe snapshot and delta stream."""
+
+    @pytest.mark.asyncio
+    async def test_snapshot_then_changed_fields_only(self, media_player_entity):
+        """Test a subscriber gets everything once, then only changes."""
+        media_player_entity._current_playlist_steps = [{"name": "Song 1", "lengthms": "180000"}]
+        messages = []
+
+        unsubscribe = media_player_entity.async_subscribe(messages.append)
+        media_player_entity._attr_media_position = 12.0
+        media_player_entity._async_publish()
+
+        assert messages[0]["type"] == "snapshot"
+        assert messages[0]["state"]["playlist_songs"] == [{"name": "Song 1", "duration": 180000}]
+        assert messages[1] == {"type": "delta", "changes": {"media_position": 12.0}}
+
+        unsubscribe()
+        media_player_entity._attr_media_position = 13.0
+        media_player_entity._async_publish()
+        assert len(messages) == 2
+
+    @pytest.mark.asyncio
+    async def test_unchanged_state_not_pushed(self, media_player_entity):
+        """Test a write that changes nothing sends nothing."""
+        messages = []
+        media_player_entity.async_subscribe(messages.append)
+
+        media_player_entity._async_publish()
+
+        assert len(messages) == 1
+
+    @pytest.mark.asyncio
+    async def test_removed_fields_reported(self, media_player_entity):
+        """Test a field that disappears is listed as removed."""
+        media_player_entity._current_playlist_steps = [{"name": "Song 1"}]
+        media_player_entity._attr_media_title = "Song 1"
+        messages = []
+        media_player_entity.async_subscribe(messages.append)
+        assert messages[0]["state"]["media_track"] == 1
+
+        media_player_entity._attr_media_title = None
+        media_player_entity._async_publish()
+
+        assert messages[1]["removed"] == ["media_track"]
+        assert messages[1]["changes"] == {"song": None}
+
+    @pytest.mark.asyncio
+    async def test_removal_ends_subscriptions(self, media_player_entity):
+        """Test subscribers are told when the entity goes away."""
+        messages = []
+        unsubscribe = media_player_entity.async_subscribe(messages.append)
+
+        await media_player_entity.async_will_remove_from_hass()
+
+        assert messages[-1] == {"type": "removed"}
+        assert media_player_entity._subscribers == []
+        unsubscribe()  # the connection may still unsubscribe afterwards
+
+    def test_large_lists_not_recorded(self):
+        """Test the card lists are excluded from the recorder."""
+        assert {"playlist_songs", "internal_queue"} <= XScheduleMediaPlayer._unrecorded_attributes
+
+
+class TestSubscribeCommand:
+    """Test the xschedule/subscribe websocket command."""
+
+    @pytest.mark.asyncio
+    async def test_subscribe_streams_events(self, hass: HomeAssistant, media_player_entity):
+        """Test the command acknowledges, then forwards entity messages."""
+        from custom_components.xschedule.websocket_api import websocket_subscribe
+
+        hass.data["media_player"] = MagicMock(get_entity=MagicMock(return_value=media_player_entity))
+        connection = MagicMock()
+        connection.subscriptions = {}
+
+        websocket_subscribe(
+            hass, connection, {"id": 5, "type": "xschedule/subscribe", "entity_id": "media_player.xschedule_test"}
+        )
+
+        connection.send_result.assert_called_once_with(5)
+        event = connection.send_message.call_args.args[0]
+        assert event["id"] == 5
+        assert event["event"]["type"] == "snapshot"
+
+        connection.subscriptions[5]()
+        assert media_player_entity._subscribers == []
+
+    @pytest.mark.asyncio
+    async def test_subscribe_unknown_entity(self, hass: HomeAssistant):
+        """Test an entity that isn't an xSchedule player is rejected."""
+        from custom_components.xschedule.websocket_api import websocket_subscribe
+
+        hass.data["media_player"] = MagicMock(get_entity=MagicMock(return_value=None))
+        connection = MagicMock()
+
+        websocket_subscribe(
+            hass, connection, {"id": 6, "type": "xschedule/subscribe", "entity_id": "media_player.other"}
+        )
+
+        assert connection.send_error.call_args.args[:2] == (6, "not_found")
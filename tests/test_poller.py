@@ -0,0 +1,86 @@
+"""Tests for REST status polling while the WebSocket is down."""
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from custom_components.xschedule.api_client import XScheduleConnectionError
+from custom_components.xschedule.poller import StatusPoller
+
+
+def make_poller(replies, interval=0.001):
+    """Create a poller returning replies in turn, recording what it passes on."""
+    received = []
+    poll = AsyncMock(side_effect=replies)
+    return StatusPoller(poll, received.append, lambda: interval), poll, received
+
+
+class TestStatusPoller:
+    """Test the fallback poller."""
+
+    @pytest.mark.asyncio
+    async def test_unchanged_replies_not_passed_on(self):
+        """Test a reply differing only in the clock is dropped."""
+        paused = {"status": "paused", "positionms": "1000"}
+        poller, poll, received = make_poller(
+            [
+                dict(paused, time="22:07:23"),
+                dict(paused, time="22:07:24"),
+                {"status": "playing", "positionms": "1000", "time": "22:07:25"},
+            ]
+            + [asyncio.CancelledError()]
+        )
+
+        poller.start(delay=0)
+        with pytest.raises(asyncio.CancelledError):
+            await poller._task
+
+        assert [reply["status"] for reply in received] == ["paused", "playing"]
+        assert poller.unchanged == 1
+
+    @pytest.mark.asyncio
+    async def test_failures_keep_polling(self):
+        """Test a failed poll is counted and polling carries on slowly."""
+        poller, poll, received = make_poller(
+            [XScheduleConnectionError("down"), {"status": "idle"}]
+        )
+
+        sleeps = []
+
+        async def fake_sleep(delay):
+            sleeps.append(delay)
+            if len(sleeps) > 2:
+                raise asyncio.CancelledError
+
+        with patch("custom_components.xschedule.poller.asyncio.sleep", side_effect=fake_sleep):
+            poller.start(delay=0)
+            with pytest.raises(asyncio.CancelledError):
+                await poller._task
+
+        assert poller.failures == 1
+        assert received == [{"status": "idle"}]
+        # Unreachable polls at the idle interval, then back to the state's
+        assert sleeps == [0, 10, 0.001]
+
+    @pytest.mark.asyncio
+    async def test_stop_cancels_poll_in_flight(self):
+        """Test stop() takes effect without waiting for the poll."""
+        gate = asyncio.Event()
+
+        async def slow_poll():
+            await gate.wait()
+            return {"status": "playing"}
+
+        on_status = MagicMock()
+        poller = StatusPoller(slow_poll, on_status, lambda: 1)
+        poller.start(delay=0)
+        await asyncio.sleep(0)
+        task = poller._task
+
+        poller.stop()
+        gate.set()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+        assert not poller.running
+        on_status.assert_not_called()
@@ -0,0 +1,137 @@
+"""Tests for arming the next queued song ahead of the step end."""
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from homeassistant.components.media_player import MediaPlayerState
+
+from custom_components.xschedule.api_client import (
+    XScheduleAPIError,
+    XScheduleConnectionError,
+    XScheduleRequestTimeout,
+)
+from custom_components.xschedule.const import QUEUE_ADVANCE_ATTEMPTS, QUEUE_ADVANCE_GUARD
+from custom_components.xschedule.queue_advance import QueueAdvancer
+from custom_components.xschedule.status import StatusSnapshot
+
+
+def playing(step, left_ms=60000, **fields):
+    """Return a playing status for step."""
+    return StatusSnapshot(MediaPlayerState.PLAYING, "Halloween", step, left_ms=left_ms, **fields)
+
+
+class TestQueueAdvancer:
+    """Test the queue advancer."""
+
+    def test_time_left_extrapolated(self):
+        """Test leftms, or position and length, set when the step ends."""
+        advancer = QueueAdvancer(AsyncMock())
+
+        advancer.observe(playing("Thriller", 30000))
+        assert 29 < advancer.remaining() <= 30
+
+        advancer.observe(playing("Thriller", None, position_ms=50000, length_ms=60000))
+        assert 9 < advancer.remaining() <= 10
+
+        advancer.observe(StatusSnapshot(MediaPlayerState.PAUSED, "Halloween", "Thriller", left_ms=5000))
+        assert advancer.remaining() is None
+
+    @pytest.mark.asyncio
+    async def test_armed_once_per_step(self):
+        """Test arming again in the same step sends nothing, a new step re-arms."""
+        jump = AsyncMock()
+        advancer = QueueAdvancer(jump)
+
+        advancer.observe(playing("Thriller"))
+        advancer.arm("Ghostbusters")
+        advancer.arm("Ghostbusters")
+        await advancer._task
+        advancer.arm("Ghostbusters")
+        assert jump.call_count == 1
+        assert advancer.armed == "Ghostbusters"
+
+        advancer.observe(playing("Monster Mash"))
+        assert advancer.armed is None
+        advancer.arm("Ghostbusters")
+        await advancer._task
+        assert jump.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_retries_until_confirmed(self):
+        """Test unanswered jumps are resent while the step has time left."""
+        jump = AsyncMock(
+            side_effect=[XScheduleConnectionError("Connection failed"), XScheduleRequestTimeout("timeout"), None]
+        )
+        advancer = QueueAdvancer(jump)
+        advancer.observe(playing("Thriller"))
+
+        with patch("custom_components.xschedule.queue_advance.QUEUE_ADVANCE_RETRY_DELAY", 0):
+            advancer.arm("Ghostbusters")
+            await advancer._task
+
+        assert jump.call_count == 3
+        assert advancer.armed == "Ghostbusters"
+        assert (advancer.jumps, advancer.retries, advancer.missed) == (1, 2, 0)
+
+    @pytest.mark.asyncio
+    async def test_gives_up_when_step_ending(self):
+        """Test no retry is made once the step is about to end."""
+        jump = AsyncMock(side_effect=XScheduleRequestTimeout("timeout"))
+        advancer = QueueAdvancer(jump)
+        advancer.observe(playing("Thriller", int(QUEUE_ADVANCE_GUARD * 1000)))
+
+        advancer.arm("Ghostbusters")
+        await advancer._task
+
+        jump.assert_called_once()
+        assert advancer.armed is None and advancer.missed == 1
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("status", [None, playing("Thriller", 600000)])
+    async def test_attempts_bounded(self, status):
+        """Test a step gets a fixed number of attempts, paused or playing."""
+        jump = AsyncMock(side_effect=XScheduleRequestTimeout("timeout"))
+        advancer = QueueAdvancer(jump)
+        if status is not None:
+            advancer.observe(status)
+
+        with patch("custom_components.xschedule.queue_advance.QUEUE_ADVANCE_RETRY_DELAY", 0):
+            advancer.arm("Ghostbusters")
+            await advancer._task
+
+        assert jump.call_count == QUEUE_ADVANCE_ATTEMPTS and advancer.missed == 1
+
+    @pytest.mark.asyncio
+    async def test_rejection_is_final(self):
+        """Test a jump xSchedule rejects is not resent, and is reported."""
+        jump = AsyncMock(side_effect=XScheduleAPIError("Jump failed: step not found"))
+        on_rejected = MagicMock()
+        advancer = QueueAdvancer(jump, on_rejected)
+        advancer.observe(playing("Thriller"))
+
+        advancer.arm("Ghostbusters")
+        await advancer._task
+
+        jump.assert_called_once()
+        on_rejected.assert_called_once_with("Ghostbusters")
+        assert advancer.armed is None and advancer.missed == 1
+        assert not advancer.running
+
+    @pytest.mark.asyncio
+    async def test_new_target_replaces_pending(self):
+        """Test arming another song cancels the one in flight."""
+        jump = AsyncMock()
+        advancer = QueueAdvancer(jump)
+        advancer.observe(playing("Thriller"))
+
+        advancer.arm("Ghostbusters")
+        first = advancer._task
+        await advancer.async_arm("Monster Mash")
+        await asyncio.sleep(0)
+
+        assert first.cancelled()
+        jump.assert_called_once_with("Monster Mash")
+        assert advancer.armed == "Monster Mash"
+
+        advancer.cancel()
+        assert advancer.armed is None and not advancer.running
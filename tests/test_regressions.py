@@ -11,7 +11,8 @@ from homeassistant.core import HomeAssistant
 from pytest_homeassistant_custom_component.common import MockConfigEntry
 
 from custom_components.xschedule.media_player import XScheduleMediaPlayer
-from custom_components.xschedule.const import DOMAIN
+from custom_components.xschedule.const import DOMAIN, WS_TOPIC_PINGSTATUS
+from custom_components.xschedule.websocket import XScheduleWebSocket
 
 
 @pytest.fixture
@@ -23,6 +24,7 @@ def mock_api_client():
     client.get_playlist_steps = AsyncMock(return_value=[])
     client.get_queued_steps = AsyncMock(return_value=[])
     client.invalidate_cache = MagicMock()
+    client.observe_status = MagicMock(return_value=frozenset())
     client.close = AsyncMock()
     return client
 
@@ -33,13 +35,14 @@ def mock_websocket():
     ws = MagicMock()
     ws.connect = AsyncMock()
     ws.disconnect = AsyncMock()
-    ws.send_command = AsyncMock()
     ws.connected = True  # Mark as connected so async_update doesn't re-fetch status
     return ws
 
 
 @pytest.fixture
-async def media_player_entity(hass: HomeAssistant, mock_api_client, mock_websocket):
+async def media_player_entity(
+    hass: HomeAssistant, mock_api_client, mock_websocket, attach_hub
+):
     """Create media player entity for testing."""
     config_entry = MockConfigEntry(
         domain=DOMAIN,
@@ -51,12 +54,9 @@ async def media_player_entity(hass: HomeAssistant, mock_api_client, mock_websock
         },
     )
 
-    with patch('custom_components.xschedule.media_player.XScheduleWebSocket', return_value=mock_websocket):
-        entity = XScheduleMediaPlayer(
-            config_entry=config_entry,
-            api_client=mock_api_client,
-            hass=hass,
-        )
+    with patch('custom_components.xschedule.hub.XScheduleWebSocket', return_value=mock_websocket):
+        attach_hub(hass, config_entry, mock_api_client)
+        entity = XScheduleMediaPlayer(config_entry=config_entry, hass=hass)
 
     entity.entity_id = "media_player.xschedule_test"
     await entity.async_added_to_hass()
@@ -190,7 +190,7 @@ class TestRegressionV122Pre1:
         await media_player_entity.async_update()
 
         # Verify playlist steps were fetched
-        mock_api_client.get_playlist_steps.assert_called_once_with("Halloween")
+        mock_api_client.get_playlist_steps.assert_called_once_with("Halloween", False)
         
         # Verify songs populated
         assert len(media_player_entity._current_playlist_steps) == 1
@@ -295,34 +295,28 @@ class TestRegressionV121CPUOptimizations:
         assert media_player_entity.should_poll is False
 
     @pytest.mark.asyncio
-    async def test_regression_cpu_excessive_controller_events(
-        self, hass: HomeAssistant, media_player_entity
-    ):
-        """Verify controller events only fire on actual status changes.
+    async def test_regression_cpu_excessive_controller_events(self):
+        """Verify controller updates only go out on actual status changes.
 
         Bug: v1.2.1
         - Controller status events fired on every WebSocket message
         - Caused excessive event bus traffic and CPU usage
         - Binary sensors updated even when status unchanged
 
-        Fix: media_player.py:255-267
-        - Added: Change detection (new_status != self._previous_controller_status)
-        - Only fire event if controller status actually changed
+        Fix: change detection on pingstatus; the binary sensors now
+        subscribe to the WebSocket's pingstatus topic, which only
+        publishes controllers that changed
 
         Test verifies:
-        1. First controller status fires event
-        2. Identical controller status does NOT fire event
-        3. Changed controller status fires event
+        1. First controller status is published
+        2. Identical controller status is NOT published
+        3. Changed controller status is published
         """
-        # Track events fired
-        events_fired = []
-
-        def capture_event(event):
-            events_fired.append(event.data)
-
-        hass.bus.async_listen(f"{DOMAIN}_controller_status_update", capture_event)
+        published = []
+        websocket = XScheduleWebSocket("192.168.1.100", 80)
+        websocket.subscribe(WS_TOPIC_PINGSTATUS, published.append)
 
-        # First update: Should fire event
+        # First update: published
         data_initial = {
             "status": "playing",
             "pingstatus": [
@@ -330,14 +324,11 @@ class TestRegressionV121CPUOptimizations:
                 {"controller": "House", "ip": "192.168.1.102", "result": "Ok"},
             ],
         }
-        media_player_entity._handle_websocket_update(data_initial)
-        await hass.async_block_till_done()
-
-        # Verify event fired
-        assert len(events_fired) == 1
-        assert len(events_fired[0]["controllers"]) == 2
+        websocket.dispatch_status(data_initial)
+        assert len(published) == 1
+        assert len(published[0]) == 2
 
-        # Second update: Same status, should NOT fire event
+        # Second update: Same status, should NOT be published
         data_same = {
             "status": "playing",
             "pingstatus": [
@@ -345,13 +336,12 @@ class TestRegressionV121CPUOptimizations:
                 {"controller": "House", "ip": "192.168.1.102", "result": "Ok"},
             ],
         }
-        media_player_entity._handle_websocket_update(data_same)
-        await hass.async_block_till_done()
+        websocket.dispatch_status(data_same)
 
-        # CRITICAL: Event should NOT fire (bug fix verification)
-        assert len(events_fired) == 1  # Still only 1 event
+        # CRITICAL: nothing published (bug fix verification)
+        assert len(published) == 1
 
-        # Third update: Changed status, should fire event
+        # Third update: Changed status, should be published
         data_changed = {
             "status": "playing",
             "pingstatus": [
@@ -359,12 +349,10 @@ class TestRegressionV121CPUOptimizations:
                 {"controller": "House", "ip": "192.168.1.102", "result": "Ok"},
             ],
         }
-        media_player_entity._handle_websocket_update(data_changed)
-        await hass.async_block_till_done()
+        websocket.dispatch_status(data_changed)
 
-        # Event should fire for changed status
-        assert len(events_fired) == 2
-        assert events_fired[1]["controllers"][0]["result"] == "Failed"
+        assert len(published) == 2
+        assert published[1][0].result == "Failed"
 
     @pytest.mark.asyncio
     async def test_regression_cpu_websocket_debouncing(
@@ -462,7 +450,7 @@ class TestRegressionConditionalAPICalls:
         await hass.async_block_till_done()
 
         # Verify API called
-        mock_api_client.get_playlist_steps.assert_called_once_with("Halloween")
+        mock_api_client.get_playlist_steps.assert_called_once_with("Halloween", False)
 
         # Scenario 2: Playing playlist, cache populated - should NOT fetch
         mock_api_client.get_playlist_steps.reset_mock()
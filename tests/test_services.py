@@ -0,0 +1,104 @@
+"""Tests for the service entity dispatcher."""
+import asyncio
+import functools
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from homeassistant.core import HomeAssistant, ServiceCall
+from homeassistant.exceptions import HomeAssistantError
+
+from custom_components.xschedule import _raise_for_errors, async_call_entities
+from custom_components.xschedule.const import DOMAIN, SERVICE_ENTITY_CONCURRENCY
+
+
+def register_players(hass, **players):
+    """Make the given players resolvable through the media_player component."""
+    hass.data["media_player"] = MagicMock(get_entity=MagicMock(side_effect=players.get))
+
+
+class TestCallEntities:
+    """Test service calls fan out to players concurrently."""
+
+    @pytest.mark.asyncio
+    async def test_players_called_together(self, hass: HomeAssistant):
+        """Test every player has started before any finishes."""
+        started = []
+        release = asyncio.Event()
+
+        async def play(name, playlist, song):
+            started.append(name)
+            await release.wait()
+
+        players = {
+            f"media_player.{name}": MagicMock(
+                async_play_song=AsyncMock(side_effect=functools.partial(play, name))
+            )
+            for name in ("front", "back", "garage")
+        }
+        register_players(hass, **players)
+
+        task = asyncio.ensure_future(
+            async_call_entities(hass, list(players), "async_play_song", "Halloween", "Thriller")
+        )
+        for _ in range(3):
+            await asyncio.sleep(0)
+        assert started == ["front", "back", "garage"]
+        release.set()
+
+        assert (await task)["succeeded"] == list(players)
+
+    @pytest.mark.asyncio
+    async def test_concurrency_bounded(self, hass: HomeAssistant):
+        """Test no more than the limit run at once."""
+        running = 0
+        peak = 0
+
+        async def clear():
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+
+        players = {
+            f"media_player.p{i}": MagicMock(async_clear_internal_queue=AsyncMock(side_effect=clear))
+            for i in range(SERVICE_ENTITY_CONCURRENCY * 2)
+        }
+        register_players(hass, **players)
+
+        await async_call_entities(hass, list(players), "async_clear_internal_queue")
+
+        assert peak == SERVICE_ENTITY_CONCURRENCY
+
+    @pytest.mark.asyncio
+    async def test_errors_collected_per_entity(self, hass: HomeAssistant):
+        """Test one failing or unknown player doesn't stop the others."""
+        good = MagicMock(async_jump_to_step=AsyncMock())
+        bad = MagicMock(async_jump_to_step=AsyncMock(side_effect=ValueError("Step not found")))
+        register_players(hass, **{"media_player.good": good, "media_player.bad": bad})
+
+        response = await async_call_entities(
+            hass,
+            ["media_player.bad", "media_player.good", "media_player.missing", "media_player.good"],
+            "async_jump_to_step",
+            "Thriller",
+        )
+
+        good.async_jump_to_step.assert_called_once_with("Thriller")
+        assert response == {
+            "succeeded": ["media_player.good"],
+            "errors": {
+                "media_player.bad": "Step not found",
+                "media_player.missing": "not an xSchedule player",
+            },
+        }
+
+    def test_errors_fail_call_without_response(self):
+        """Test entity errors raise unless the caller asked for the response."""
+        response = {"succeeded": [], "errors": {"media_player.bad": "Song not found"}}
+
+        with pytest.raises(HomeAssistantError, match="media_player.bad: Song not found"):
+            _raise_for_errors(ServiceCall(DOMAIN, "add_to_internal_queue", {}), response)
+
+        call = ServiceCall(DOMAIN, "add_to_internal_queue", {}, return_response=True)
+        assert _raise_for_errors(call, response) is response
@@ -0,0 +1,106 @@
+"""Tests for typed xSchedule status snapshots."""
+from homeassistant.components.media_player import MediaPlayerState
+
+from custom_components.xschedule.status import (
+    STATUS_FIELDS,
+    ControllerStatus,
+    StatusSnapshot,
+    changed_controllers,
+)
+
+from tests.fixtures.api_responses import PLAYING_STATUS_BACKGROUND
+
+
+class TestStatusSnapshot:
+    """Test parsing a status message."""
+
+    def test_fields_typed(self):
+        """Test millisecond, volume and state fields are parsed."""
+        status = StatusSnapshot.from_message(PLAYING_STATUS_BACKGROUND)
+
+        assert status.state == MediaPlayerState.PLAYING
+        assert status.playlist == "Halloween Background"
+        assert status.step == "House lights"
+        assert (status.position_ms, status.length_ms, status.left_ms) == (45000, 120000, 75000)
+        assert status.volume == 100
+        assert status.output_to_lights is True
+        assert status.controllers[0] == ControllerStatus(
+            "192.168.1.101 Tree / Eves", "192.168.1.101", "Ok", 0
+        )
+
+    def test_absent_and_malformed_fields(self):
+        """Test absent fields are None and malformed ms fields are 0."""
+        status = StatusSnapshot.from_message(
+            {"status": "Paused", "positionms": "bad", "volume": "loud"}
+        )
+
+        assert status.state == MediaPlayerState.PAUSED
+        assert status.playlist is None
+        assert status.position_ms == 0
+        assert status.length_ms is None
+        assert status.volume is None
+        assert status.controllers is None
+
+    def test_unknown_status_is_idle(self):
+        """Test any status other than playing/paused is idle."""
+        assert StatusSnapshot.from_message({"status": "stopped"}).state == MediaPlayerState.IDLE
+        assert StatusSnapshot.from_message({}).state == MediaPlayerState.IDLE
+
+    def test_controllers_carry_over(self):
+        """Test a message without pingstatus keeps the previous controllers."""
+        first = StatusSnapshot.from_message(PLAYING_STATUS_BACKGROUND)
+        second = StatusSnapshot.from_message({"status": "playing"}, first)
+
+        assert second.controllers is first.controllers
+
+    def test_controller_round_trip(self):
+        """Test controllers convert back to the pingstatus format."""
+        entry = PLAYING_STATUS_BACKGROUND["pingstatus"][0]
+
+        assert ControllerStatus.from_message(entry).as_dict() == entry
+
+
+class TestStatusDiff:
+    """Test field-level diffs between snapshots."""
+
+    def test_first_snapshot_changes_everything(self):
+        """Test a snapshot with no predecessor reports every field."""
+        assert StatusSnapshot.from_message({}).diff(None) == STATUS_FIELDS
+
+    def test_only_changed_fields(self):
+        """Test a playback tick reports just the moving fields."""
+        first = StatusSnapshot.from_message(PLAYING_STATUS_BACKGROUND)
+        tick = dict(PLAYING_STATUS_BACKGROUND, positionms="45200", leftms="74800")
+
+        assert StatusSnapshot.from_message(tick, first).diff(first) == {"position_ms", "left_ms"}
+
+    def test_identical_message_has_no_diff(self):
+        """Test re-parsing the same message changes nothing."""
+        first = StatusSnapshot.from_message(PLAYING_STATUS_BACKGROUND)
+
+        assert not StatusSnapshot.from_message(PLAYING_STATUS_BACKGROUND, first).diff(first)
+
+    def test_changed_controllers(self):
+        """Test only new or changed controllers are reported."""
+        first = StatusSnapshot.from_message(PLAYING_STATUS_BACKGROUND)
+        pingstatus = [dict(item) for item in PLAYING_STATUS_BACKGROUND["pingstatus"]]
+        pingstatus[1].update(result="Failed", failcount="3")
+        pingstatus.append({"controller": "Pumpkins", "ip": "192.168.1.103", "result": "Ok"})
+        second = StatusSnapshot.from_message({"pingstatus": pingstatus}, first)
+
+        changed = changed_controllers(second.controllers, first.controllers)
+
+        assert [item.controller for item in changed] == ["192.168.1.102 House", "Pumpkins"]
+        assert changed[0].fail_count == 3
+
+    def test_reused_pingstatus_keeps_controllers(self):
+        """Test the same pingstatus list as last time isn't parsed again."""
+        pingstatus = PLAYING_STATUS_BACKGROUND["pingstatus"]
+        first = StatusSnapshot.from_message(PLAYING_STATUS_BACKGROUND)
+
+        reused = StatusSnapshot.from_message({"pingstatus": pingstatus}, first, pingstatus)
+        copied = StatusSnapshot.from_message({"pingstatus": list(pingstatus)}, first, pingstatus)
+
+        assert reused.controllers is first.controllers
+        assert copied.controllers == first.controllers
+        assert copied.controllers is not first.controllers
@@ -0,0 +1,314 @@
+"""Transport parity tests for xSchedule commands.
+
+Every command in the xSchedule API document must reach xSchedule with the
+same name and parameters whether it travels over the WebSocket or REST,
+and must leave the cache in the same state either way. Entity control
+methods must go through the API client's transport rather than picking a
+channel themselves.
+"""
+from unittest.mock import AsyncMock, MagicMock, patch
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.xschedule.api_client import (
+    XScheduleAPIClient,
+    XScheduleConnectionError,
+)
+from custom_components.xschedule.const import DOMAIN
+from custom_components.xschedule.media_player import XScheduleMediaPlayer
+
+# (command, example parameters) for every command in the xSchedule API document
+XSCHEDULE_COMMANDS = [
+    ("Stop all now", ""),
+    ("Stop", ""),
+    ("Play selected playlist", ""),
+    ("Play selected playlist looped", ""),
+    ("Play specified playlist", "Halloween"),
+    ("Play specified playlist if not playing", "Halloween"),
+    ("Play specified playlist if nothing playing", "Halloween"),
+    ("Play specified playlist looped", "Halloween"),
+    ("Stop specified playlist", "Halloween"),
+    ("Stop specified playlist at the end of the current step", "Halloween"),
+    ("Stop specified playlist at the end of the current loop", "Halloween"),
+    ("Stop playlist at end of current step", ""),
+    ("Stop playlist at end of current loop", ""),
+    ("Jump to play once at end at end of current step and then stop", ""),
+    ("Pause", ""),
+    ("Next step in current playlist", ""),
+    ("Restart step in current playlist", ""),
+    ("Prior step in current playlist", ""),
+    ("Jump to random step in current playlist", ""),
+    ("Jump to random step in specified playlist", "Halloween"),
+    ("Play one random step in specified playlist", "Halloween"),
+    ("Jump to specified step in current playlist", "Light Em Up"),
+    ("Jump to specified step in current playlist at the end of current step", "Light Em Up"),
+    ("Play playlist starting at step", "Halloween,Light Em Up"),
+    ("Play playlist step", "Halloween,Light Em Up"),
+    ("Play playlist starting at step looped", "Halloween,Light Em Up"),
+    ("Toggle loop current step", ""),
+    ("Play specified step in specified playlist looped", "Halloween,Light Em Up"),
+    ("Add to the current schedule n minutes", "15"),
+    ("Set volume to", "80"),
+    ("Adjust volume by", "-10"),
+    ("Save schedule", ""),
+    ("Toggle output to lights", ""),
+    ("Toggle current playlist random", ""),
+    ("Toggle current playlist loop", ""),
+    ("Play specified playlist step once only", "Halloween,Light Em Up"),
+    ("Play specified playlist n times", "Halloween,3"),
+    ("Play specified playlist step n times", "Halloween,Light Em Up,3"),
+    ("Increase brightness by n%", "-20"),
+    ("Activate all schedules", ""),
+    ("Deactivate all schedules", ""),
+    ("Activate specified schedule", "October sunset-30 -> 11pm"),
+    ("Deactivate specified schedule", "October sunset-30 -> 11pm"),
+    ("Set brightness to n%", "75"),
+    ("PressButton", "Lights On"),
+    ("Restart selected schedule", ""),
+    ("Restart named schedule", "October sunset-30 -> 11pm"),
+    ("Toggle mute", ""),
+    ("Enqueue playlist step", "Halloween,Light Em Up"),
+    ("Clear playlist queue", ""),
+    ("Refresh current playlist", ""),
+    ("Run command at end of current step", "Pause,"),
+    ("Bring to foreground", ""),
+    ("Set current text", "Banner,Happy Halloween,"),
+    ("Set pixels", "1,Normal"),
+    ("Set pixel range", "1,300,#FF8000,Normal"),
+    ("Clear all overlays", ""),
+    ("Run process", "Halloween,Light Em Up,Fog"),
+    ("Run event playlist step", "Halloween,Light Em Up"),
+    ("Run event playlist step unique", "Halloween,Light Em Up"),
+    ("Run event playlist step if idle", "Halloween,Light Em Up"),
+    ("Run event playlist step looped", "Halloween,Light Em Up"),
+    ("Run event playlist step unique looped", "Halloween,Light Em Up"),
+    ("Run event playlist step if idle looped", "Halloween,Light Em Up"),
+    ("Stop event playlist", "Halloween"),
+    ("Stop event playlist if running step", "Halloween,Light Em Up"),
+    ("Set playlist as background", "Halloween Background"),
+    ("Clear background playlist", ""),
+    ("Close xSchedule", ""),
+    ("Add n Seconds To Current Step Position", "10"),
+    ("Start test mode", "Alternate|All|500|#FFFFFF|#000000"),
+    ("Stop test mode", ""),
+    ("Change show folder", "C:\\Shows\\Halloween 2025"),
+    ("Set mode", "master|remote"),
+    ("Fire plugin event", "Plugin|a|b"),
+    ("Set step position", "1:30.000"),
+    ("Set step position ms", "90000"),
+    ("Adjust frame interval by ms", "-5"),
+    ("Set frame interval to ms", "25"),
+    ("Start plugin", "Remote Falcon"),
+    ("Stop plugin", "Remote Falcon"),
+    ("Send command to plugin", "Remote Falcon,sync,a|b"),
+]
+
+# (API client method, args, command, parameters)
+CLIENT_METHODS = [
+    ("play_playlist", ("Halloween",), "Play specified playlist", "Halloween"),
+    ("pause", (), "Pause", ""),
+    ("stop", (), "Stop", ""),
+    ("stop_all_now", (), "Stop all now", ""),
+    ("next_step", (), "Next step in current playlist", ""),
+    ("previous_step", (), "Prior step in current playlist", ""),
+    ("restart_step", (), "Restart step in current playlist", ""),
+    ("play_playlist_step", ("Halloween", "Light Em Up"), "Play playlist step", "Halloween,Light Em Up"),
+    ("set_step_position", (90000,), "Set step position ms", "90000"),
+    ("set_volume", (80,), "Set volume to", "80"),
+    ("adjust_volume", (-10,), "Adjust volume by", "-10"),
+    ("toggle_mute", (), "Toggle mute", ""),
+    ("enqueue_step", ("Halloween", "Light Em Up"), "Enqueue playlist step", "Halloween,Light Em Up"),
+    ("clear_queue", (), "Clear playlist queue", ""),
+    (
+        "jump_to_step_at_end",
+        ("Light Em Up",),
+        "Jump to specified step in current playlist at the end of current step",
+        "Light Em Up",
+    ),
+]
+
+# (entity method, args, API client method, its args)
+ENTITY_METHODS = [
+    ("async_media_pause", (), "pause", ()),
+    ("async_media_stop", (), "stop", ()),
+    ("async_turn_off", (), "stop_all_now", ()),
+    ("async_media_next_track", (), "next_step", ()),
+    ("async_media_previous_track", (), "previous_step", ()),
+    ("async_media_seek", (90.0,), "set_step_position", (90000,)),
+    ("async_select_source", ("Halloween",), "play_playlist", ("Halloween",)),
+    ("async_set_volume_level", (0.8,), "set_volume", (80,)),
+    ("async_mute_volume", (True,), "toggle_mute", ()),
+    ("async_play_song", ("Halloween", "Light Em Up"), "play_playlist_step", ("Halloween", "Light Em Up")),
+    ("async_jump_to_step", ("Light Em Up",), "jump_to_step_at_end", ("Light Em Up",)),
+    ("async_play_media", ("music", "Halloween|||Light Em Up"), "play_playlist_step", ("Halloween", "Light Em Up")),
+    ("async_play_media", ("playlist", "Halloween"), "play_playlist", ("Halloween",)),
+]
+
+
+def _sent_over_rest(mock_request):
+    """Return the (command, parameters) of the single REST request made."""
+    query = parse_qs(urlsplit(mock_request.call_args.args[0]).query)
+    return query["Command"][0], query.get("Parameters", [""])[0]
+
+
+def _fill_caches(api_client):
+    """Populate every cache so invalidation can be observed."""
+    api_client._playlists_cache.set("metadata", [{"name": "Halloween"}])
+    api_client._steps_cache.set("Halloween", [{"name": "Light Em Up"}])
+    api_client._schedule_cache.set("Halloween", [{"name": "Nightly"}])
+
+
+def _cache_state(api_client):
+    """Return which caches still hold data."""
+    return (
+        len(api_client._playlists_cache),
+        len(api_client._steps_cache),
+        len(api_client._schedule_cache),
+    )
+
+
+@pytest.fixture
+def api_client():
+    """Create API client instance."""
+    return XScheduleAPIClient(host="192.168.1.100", port=80)
+
+
+@pytest.fixture
+def websocket():
+    """Create a connected mock WebSocket."""
+    ws = MagicMock()
+    ws.connected = True
+    ws.async_command = AsyncMock(return_value={"result": "ok", "reference": "ha1"})
+    ws.async_query = AsyncMock(return_value={"result": "ok", "reference": "ha2"})
+    return ws
+
+
+class TestCommandParity:
+    """Verify each documented command is identical over both transports."""
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("command,parameters", XSCHEDULE_COMMANDS)
+    async def test_command_parity(self, api_client, websocket, command, parameters):
+        """Same command, parameters, result and invalidation over WS and REST."""
+        # WebSocket
+        api_client.attach_websocket(websocket)
+        _fill_caches(api_client)
+        with patch.object(api_client, '_request', new=AsyncMock()) as mock_request:
+            ws_result = await api_client.command(command, parameters)
+        mock_request.assert_not_called()
+        websocket.async_command.assert_called_once_with(command, parameters)
+        ws_cache = _cache_state(api_client)
+
+        # REST
+        api_client.attach_websocket(None)
+        _fill_caches(api_client)
+        with patch.object(
+            api_client, '_request', new=AsyncMock(return_value={"result": "ok", "reference": "ha1"})
+        ) as mock_request:
+            rest_result = await api_client.command(command, parameters)
+        assert _sent_over_rest(mock_request) == (command, parameters)
+        rest_cache = _cache_state(api_client)
+
+        assert ws_result == rest_result
+        assert ws_cache == rest_cache
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("command,parameters", XSCHEDULE_COMMANDS)
+    async def test_command_falls_back_when_not_sent(self, api_client, websocket, command, parameters):
+        """A command the socket couldn't send is delivered over REST."""
+        websocket.async_command.side_effect = XScheduleConnectionError("send failed")
+        api_client.attach_websocket(websocket)
+
+        with patch.object(
+            api_client, '_request', new=AsyncMock(return_value={"result": "ok"})
+        ) as mock_request:
+            assert await api_client.command(command, parameters) == {"result": "ok"}
+
+        assert _sent_over_rest(mock_request) == (command, parameters)
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("method,args,command,parameters", CLIENT_METHODS)
+    async def test_client_method_parity(self, api_client, websocket, method, args, command, parameters):
+        """API client helpers send the documented command on both transports."""
+        api_client.attach_websocket(websocket)
+        await getattr(api_client, method)(*args)
+        websocket.async_command.assert_called_once_with(command, parameters)
+
+        api_client.attach_websocket(None)
+        with patch.object(
+            api_client, '_request', new=AsyncMock(return_value={"result": "ok"})
+        ) as mock_request:
+            await getattr(api_client, method)(*args)
+        assert _sent_over_rest(mock_request) == (command, parameters)
+
+
+class TestTransportHealth:
+    """Verify channel selection after failures."""
+
+    @pytest.mark.asyncio
+    async def test_unparsed_websocket_request_resent_over_rest(self, api_client, websocket):
+        """xSchedule's 'Empty request.' means the command didn't run; REST delivers it."""
+        websocket.async_command.return_value = {
+            "result": "failed", "reference": "", "message": "Empty request."
+        }
+        api_client.attach_websocket(websocket)
+
+        with patch.object(
+            api_client, '_request', new=AsyncMock(return_value={"result": "ok"})
+        ) as mock_request:
+            result = await api_client.jump_to_step_at_end("Light Em Up")
+
+        assert result == {"result": "ok"}
+        mock_request.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_failed_websocket_skipped_during_cooldown(self, api_client, websocket):
+        """After a WebSocket failure REST is used directly until the cooldown ends."""
+        websocket.async_command.side_effect = XScheduleConnectionError("send failed")
+        api_client.attach_websocket(websocket)
+
+        with patch.object(api_client, '_request', new=AsyncMock(return_value={"result": "ok"})):
+            await api_client.pause()
+            await api_client.pause()
+            assert websocket.async_command.call_count == 1
+
+            # Cooldown over: the socket is tried again
+            api_client._websocket_retry_at = 0
+            websocket.async_command.side_effect = None
+            await api_client.pause()
+
+        assert websocket.async_command.call_count == 2
+
+
+class TestEntityTransport:
+    """Verify entity control methods never choose a channel themselves."""
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("connected", [True, False])
+    @pytest.mark.parametrize("method,args,client_method,client_args", ENTITY_METHODS)
+    async def test_entity_uses_client_transport(
+        self, hass, attach_hub, connected, method, args, client_method, client_args
+    ):
+        """Entity calls the same API client helper whether or not the socket is up."""
+        mock_websocket = MagicMock()
+        mock_websocket.connected = connected
+        mock_websocket.async_command = AsyncMock()
+        client = MagicMock()
+        setattr(client, client_method, AsyncMock(return_value={"result": "ok"}))
+        config_entry = MockConfigEntry(
+            domain=DOMAIN, data={"host": "192.168.1.100", "port": 80, "password": ""}
+        )
+        with patch(
+            "custom_components.xschedule.hub.XScheduleWebSocket",
+            return_value=mock_websocket,
+        ):
+            attach_hub(hass, config_entry, client)
+            entity = XScheduleMediaPlayer(config_entry, hass)
+        entity.entity_id = "media_player.xschedule"
+
+        await getattr(entity, method)(*args)
+
+        getattr(client, client_method).assert_called_once_with(*client_args)
+        mock_websocket.async_command.assert_not_called()
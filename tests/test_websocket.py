@@ -4,6 +4,15 @@ from unittest.mock import AsyncMock, MagicMock, patch
 import asyncio
 from aiohttp import WSMessage, WSMsgType
 
+from custom_components.xschedule.const import (
+    WS_CLOSE_TIMEOUT,
+    WS_PROBE_QUERY,
+    WS_TOPIC_COMMAND_RESULT,
+    WS_TOPIC_QUERY_RESPONSE,
+    WS_TOPIC_STATUS,
+    WS_TOPIC_STEP,
+)
+from custom_components.xschedule.status import ControllerStatus
 from custom_components.xschedule.websocket import XScheduleWebSocket
 
 
@@ -165,6 +174,191 @@ class TestMessageHandling:
         await websocket_client._handle_message(json.dumps(test_data))
 
 
+
+class TestFrameDedupe:
+    """Test repeated frames skip decoding."""
+
+    PINGSTATUS = [
+        {"controller": "Tree", "ip": "192.168.1.101", "result": "Ok", "failcount": "0"},
+        {"controller": "House", "ip": "192.168.1.102", "result": "Ok", "failcount": "0"},
+    ]
+
+    @pytest.mark.asyncio
+    async def test_identical_frame_skipped(self):
+        """Test an identical frame never reaches json or the callback."""
+        import json
+        received = []
+        client = XScheduleWebSocket("192.168.1.100", 80, status_callback=received.append)
+        frame = json.dumps({"status": "paused", "pingstatus": self.PINGSTATUS})
+
+        await client._handle_message(frame)
+        with patch("custom_components.xschedule.websocket.loads") as mock_loads:
+            await client._handle_message(frame)
+            await client._handle_message(frame)
+
+        mock_loads.assert_not_called()
+        assert len(received) == 1
+        assert client.frame_stats == {"duplicate": 2, "decoded": 1, "pingstatus_reused": 0}
+
+    @pytest.mark.asyncio
+    async def test_unchanged_pingstatus_reused(self):
+        """Test only the head is decoded when pingstatus repeats."""
+        import json
+        received = []
+        client = XScheduleWebSocket("192.168.1.100", 80, status_callback=received.append)
+
+        for position in (1000, 1200):
+            await client._handle_message(
+                json.dumps(
+                    {"status": "playing", "positionms": str(position), "pingstatus": self.PINGSTATUS}
+                )
+            )
+
+        assert received[1] == {
+            "status": "playing",
+            "positionms": "1200",
+            "pingstatus": self.PINGSTATUS,
+        }
+        assert received[1]["pingstatus"] is received[0]["pingstatus"]
+        assert client.frame_stats["pingstatus_reused"] == 1
+
+    @pytest.mark.asyncio
+    async def test_reused_pingstatus_not_reparsed(self):
+        """Test the router parses each status once and keeps unchanged controllers."""
+        import json
+        client = XScheduleWebSocket("192.168.1.100", 80)
+        statuses = []
+        client.subscribe(WS_TOPIC_STATUS, lambda message: statuses.append(client.status))
+
+        with patch(
+            "custom_components.xschedule.status.ControllerStatus.from_message",
+            wraps=ControllerStatus.from_message,
+        ) as parse:
+            for position in (1000, 1200):
+                await client._handle_message(
+                    json.dumps(
+                        {"status": "playing", "positionms": str(position), "pingstatus": self.PINGSTATUS}
+                    )
+                )
+
+        assert parse.call_count == len(self.PINGSTATUS)
+        assert [status.position_ms for status in statuses] == [1000, 1200]
+        assert statuses[1].controllers is statuses[0].controllers is client.controllers
+
+    @pytest.mark.asyncio
+    async def test_changed_pingstatus_decoded(self):
+        """Test a changed pingstatus is decoded in full."""
+        import json
+        received = []
+        client = XScheduleWebSocket("192.168.1.100", 80, status_callback=received.append)
+        failed = [dict(self.PINGSTATUS[0], result="Failed"), self.PINGSTATUS[1]]
+
+        await client._handle_message(json.dumps({"status": "playing", "pingstatus": self.PINGSTATUS}))
+        await client._handle_message(json.dumps({"status": "playing", "pingstatus": failed}))
+
+        assert received[1]["pingstatus"] == failed
+        assert client.frame_stats["decoded"] == 2
+
+    @pytest.mark.asyncio
+    async def test_pingstatus_not_last_always_decoded(self):
+        """Test a tail holding other keys is never reused."""
+        import json
+        received = []
+        client = XScheduleWebSocket("192.168.1.100", 80, status_callback=received.append)
+
+        for position in (1000, 1200):
+            await client._handle_message(
+                json.dumps({"pingstatus": self.PINGSTATUS, "positionms": str(position)})
+            )
+
+        assert received[1]["positionms"] == "1200"
+        assert client.frame_stats["pingstatus_reused"] == 0
+
+    @pytest.mark.asyncio
+    async def test_first_frame_after_reconnect_handled(self):
+        """Test the first frame on a new connection is always handled."""
+        import json
+        received = []
+        client = XScheduleWebSocket("192.168.1.100", 80, status_callback=received.append)
+        frame = json.dumps({"status": "idle"})
+        await client._handle_message(frame)
+
+        ws = MagicMock()
+        ws.receive = AsyncMock(
+            side_effect=[WSMessage(WSMsgType.TEXT, frame, None), WSMessage(WSMsgType.CLOSED, None, None)]
+        )
+        await client._listen(ws)
+
+        assert len(received) == 2
+
+
+
+class TestTopics:
+    """Test routing messages to topic subscribers."""
+
+    @pytest.mark.asyncio
+    async def test_step_published_on_change_only(self):
+        """Test step subscribers hear each new step once."""
+        steps = []
+        client = XScheduleWebSocket("192.168.1.100", 80)
+        client.subscribe(WS_TOPIC_STEP, steps.append)
+
+        for step in ("Song 1", "Song 1", "Song 2"):
+            client.dispatch_status({"status": "playing", "step": step})
+
+        assert steps == [
+            {"step": "Song 1", "previous": None},
+            {"step": "Song 2", "previous": "Song 1"},
+        ]
+
+    @pytest.mark.asyncio
+    async def test_responses_routed_by_type(self, websocket_client):
+        """Test command results and query responses go to their topics only."""
+        import json
+        commands, queries, statuses = [], [], []
+        websocket_client.subscribe(WS_TOPIC_COMMAND_RESULT, commands.append)
+        websocket_client.subscribe(WS_TOPIC_QUERY_RESPONSE, queries.append)
+        websocket_client.subscribe(WS_TOPIC_STATUS, statuses.append)
+        ws = _connect_mock_socket(websocket_client)
+
+        command = asyncio.ensure_future(websocket_client.async_command("Next step in current playlist"))
+        query = asyncio.ensure_future(websocket_client.async_query("GetQueuedSteps"))
+        await asyncio.sleep(0)
+        command_ref, query_ref = (c.args[0]["Reference"] for c in ws.send_json.call_args_list)
+        await websocket_client._handle_message(json.dumps({"result": "ok", "reference": command_ref}))
+        await websocket_client._handle_message(json.dumps({"steps": [], "reference": query_ref}))
+        await asyncio.gather(command, query)
+
+        assert commands == [
+            {"command": "Next step in current playlist", "response": {"result": "ok", "reference": command_ref}}
+        ]
+        assert queries == [{"query": "GetQueuedSteps", "response": {"steps": [], "reference": query_ref}}]
+        assert statuses == []
+
+    @pytest.mark.asyncio
+    async def test_failing_subscriber_isolated(self):
+        """Test one subscriber raising doesn't stop the others."""
+        received = []
+        client = XScheduleWebSocket("192.168.1.100", 80)
+        client.subscribe(WS_TOPIC_STATUS, MagicMock(side_effect=ValueError("boom")))
+        client.subscribe(WS_TOPIC_STATUS, received.append)
+
+        client.dispatch_status({"status": "idle"})
+
+        assert received == [{"status": "idle"}]
+
+    @pytest.mark.asyncio
+    async def test_unsubscribe(self):
+        """Test an unsubscribed callback gets nothing more."""
+        received = []
+        client = XScheduleWebSocket("192.168.1.100", 80)
+        unsubscribe = client.subscribe(WS_TOPIC_STATUS, received.append)
+
+        unsubscribe()
+        client.dispatch_status({"status": "idle"})
+
+        assert received == []
+
 class TestReconnectionLogic:
     """Test reconnection and error handling."""
 
@@ -215,32 +409,134 @@ class TestPasswordAuthentication:
             assert websocket_client_no_password.password is None
 
 
-class TestHeartbeat:
-    """Test heartbeat mechanism."""
+class TestWatchdog:
+    """Test passive liveness tracking."""
+
+    @staticmethod
+    def _silent_socket(client):
+        """Attach a socket that never delivers a message."""
+        ws = _connect_mock_socket(client)
+
+        async def receive(timeout=None):
+            await asyncio.sleep(timeout)
+            raise asyncio.TimeoutError
+
+        ws.receive = receive
+        return ws
 
     @pytest.mark.asyncio
-    async def test_heartbeat_task_created_on_connection(self, websocket_client):
-        """Test heartbeat task is created when connected."""
-        # The _heartbeat() method should exist and be async
-        assert asyncio.iscoroutinefunction(websocket_client._heartbeat)
+    async def test_silent_link_probed_then_dropped(self):
+        """Test a quiet socket is probed once and dropped at the bound."""
+        client = XScheduleWebSocket("192.168.1.100", 80, dead_link_timeout=0.1)
+        ws = self._silent_socket(client)
+
+        async with asyncio.timeout(1):
+            await client._listen(ws)
 
-        # Initially no heartbeat task
-        assert websocket_client._heartbeat_task is None
+        assert client.dead_links == 1
+        ws.send_json.assert_called_once()
+        assert ws.send_json.call_args.args[0]["Query"] == WS_PROBE_QUERY
+        await client._cancel_probe()
 
     @pytest.mark.asyncio
-    async def test_heartbeat_cancelled_on_disconnect(self, websocket_client):
-        """Test heartbeat task is cancelled on disconnect."""
-        # Create a real task that we can cancel
-        async def dummy_heartbeat():
-            await asyncio.sleep(100)
+    async def test_busy_link_not_probed(self):
+        """Test regular traffic keeps the link alive without probes."""
+        client = XScheduleWebSocket("192.168.1.100", 80, dead_link_timeout=0.1)
+        ws = _connect_mock_socket(client)
+        messages = [WSMessage(WSMsgType.TEXT, '{"status": "playing"}', None)] * 10
+        messages.append(WSMessage(WSMsgType.CLOSED, None, None))
 
-        task = asyncio.create_task(dummy_heartbeat())
-        websocket_client._heartbeat_task = task
-        websocket_client._connected = True
+        async def receive(timeout=None):
+            await asyncio.sleep(0.02)
+            return messages.pop(0)
+
+        ws.receive = receive
+        await client._listen(ws)
+
+        assert client.dead_links == 0
+        ws.send_json.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_probe_reply_not_a_status_update(self):
+        """Test the probe's reply doesn't reach the status callback."""
+        import json
+
+        received = []
+        client = XScheduleWebSocket(
+            "192.168.1.100", 80, status_callback=received.append, dead_link_timeout=1
+        )
+        ws = _connect_mock_socket(client)
+
+        client._probe()
+        client._probe()  # one probe at a time
+        await asyncio.sleep(0)
+        reference = ws.send_json.call_args.args[0]["Reference"]
+        await client._handle_message(json.dumps({"steps": [], "reference": reference}))
+        await client._probe_task
+
+        ws.send_json.assert_called_once()
+        assert received == []
+
+    @pytest.mark.asyncio
+    async def test_established_connection_reconnects_immediately(self):
+        """Test a dropped link reconnects without the backoff delay."""
+        client = XScheduleWebSocket("192.168.1.100", 80, dead_link_timeout=0)
+        client._running = True
+        ws = MagicMock()
+        ws.closed = False
+        connect = MagicMock()
+        connect.return_value.__aenter__ = AsyncMock(return_value=ws)
+        connect.return_value.__aexit__ = AsyncMock(return_value=False)
+        client._session = MagicMock(ws_connect=connect, close=AsyncMock())
+
+        listens = 0
+
+        async def listen(_ws):
+            nonlocal listens
+            listens += 1
+            if listens == 2:
+                client._running = False
+
+        with patch.object(client, "_listen", side_effect=listen), patch(
+            "custom_components.xschedule.websocket.asyncio.sleep"
+        ) as mock_sleep:
+            await client._connection_loop()
+
+        assert connect.call_count == 2
+        mock_sleep.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_connection_callback_on_up_and_down(self):
+        """Test the connection callback sees each connect and drop."""
+        changes = []
+        client = XScheduleWebSocket(
+            "192.168.1.100", 80, dead_link_timeout=0, connection_callback=changes.append
+        )
+        client._running = True
+        connect = MagicMock()
+        connect.return_value.__aenter__ = AsyncMock(return_value=MagicMock(closed=False))
+        connect.return_value.__aexit__ = AsyncMock(return_value=False)
+        client._session = MagicMock(ws_connect=connect, close=AsyncMock())
+
+        async def listen(_ws):
+            client._running = False
+
+        with patch.object(client, "_listen", side_effect=listen):
+            await client._connection_loop()
+
+        assert changes == [True, False]
+        timeout = connect.call_args.kwargs["timeout"]
+        assert getattr(timeout, "ws_close", timeout) == WS_CLOSE_TIMEOUT
+
+    @pytest.mark.asyncio
+    async def test_probe_cancelled_on_disconnect(self, websocket_client):
+        """Test an outstanding probe is cancelled on disconnect."""
+        _connect_mock_socket(websocket_client)
+        websocket_client._probe()
+        task = websocket_client._probe_task
 
         await websocket_client.disconnect()
 
-        # Heartbeat task should be cancelled
         assert task.cancelled()
 
 
@@ -299,3 +595,153 @@ class TestCleanup:
 
         # Callback reference should still exist
         assert websocket_client._status_callback is not None
+
+
+def _connect_mock_socket(client):
+    """Attach a mock socket so the client reports connected."""
+    ws = MagicMock()
+    ws.closed = False
+    ws.send_json = AsyncMock()
+    ws.close = AsyncMock()
+    client._ws = ws
+    client._connected = True
+    return ws
+
+
+class TestRequestCorrelation:
+    """Test Reference-correlated queries and commands."""
+
+    @pytest.mark.asyncio
+    async def test_query_resolved_by_reference(self, websocket_client):
+        """Test a query returns the message carrying its reference."""
+        import json
+
+        ws = _connect_mock_socket(websocket_client)
+        task = asyncio.create_task(websocket_client.async_query("GetPlayListSteps", "Halloween"))
+        await asyncio.sleep(0)
+
+        sent = ws.send_json.call_args.args[0]
+        assert sent["Type"] == "Query"
+        assert sent["Query"] == "GetPlayListSteps"
+        assert sent["Parameters"] == "Halloween"
+        assert sent["Pass"] == "testpass"
+
+        # An unrelated status push doesn't resolve it
+        await websocket_client._handle_message(json.dumps({"status": "playing", "reference": ""}))
+        assert not task.done()
+
+        await websocket_client._handle_message(
+            json.dumps({"steps": [{"name": "Light Em Up"}], "reference": sent["Reference"]})
+        )
+        result = await task
+
+        assert result["steps"] == [{"name": "Light Em Up"}]
+        assert websocket_client._pending == {}
+
+    @pytest.mark.asyncio
+    async def test_concurrent_requests_get_distinct_references(self, websocket_client):
+        """Test responses are matched even when they arrive out of order."""
+        import json
+
+        ws = _connect_mock_socket(websocket_client)
+        first = asyncio.create_task(websocket_client.async_command("Pause"))
+        second = asyncio.create_task(websocket_client.async_command("Next step in current playlist"))
+        await asyncio.sleep(0)
+
+        ref_first, ref_second = (c.args[0]["Reference"] for c in ws.send_json.call_args_list)
+        assert ref_first != ref_second
+
+        await websocket_client._handle_message(json.dumps({"result": "ok", "reference": ref_second}))
+        await websocket_client._handle_message(
+            json.dumps({"result": "failed", "message": "x", "reference": ref_first})
+        )
+
+        assert (await first)["result"] == "failed"
+        assert (await second)["result"] == "ok"
+
+    @pytest.mark.asyncio
+    async def test_command_response_not_treated_as_status(self):
+        """Test correlated command acks don't reach the status callback."""
+        import json
+
+        received = []
+        client = XScheduleWebSocket("192.168.1.100", 80, status_callback=received.append)
+        ws = _connect_mock_socket(client)
+
+        task = asyncio.create_task(client.async_command("Pause"))
+        await asyncio.sleep(0)
+        reference = ws.send_json.call_args.args[0]["Reference"]
+        await client._handle_message(json.dumps({"result": "ok", "reference": reference}))
+        await task
+
+        assert received == []
+
+    @pytest.mark.asyncio
+    async def test_status_query_response_reaches_callback(self):
+        """Test a correlated GetPlayingStatus reply is also a status update."""
+        import json
+
+        received = []
+        client = XScheduleWebSocket("192.168.1.100", 80, status_callback=received.append)
+        ws = _connect_mock_socket(client)
+
+        task = asyncio.create_task(client.async_query("GetPlayingStatus"))
+        await asyncio.sleep(0)
+        reference = ws.send_json.call_args.args[0]["Reference"]
+        await client._handle_message(json.dumps({"status": "idle", "reference": reference}))
+
+        reply = await task
+        assert reply["status"] == "idle"
+        assert received == [{"status": "idle", "reference": reference}]
+        assert client.routed(reply)
+        assert not client.routed({"status": "idle"})
+
+    @pytest.mark.asyncio
+    async def test_request_timeout(self, websocket_client):
+        """Test an unanswered request times out and is forgotten."""
+        from custom_components.xschedule.api_client import XScheduleRequestTimeout
+
+        _connect_mock_socket(websocket_client)
+
+        with pytest.raises(XScheduleRequestTimeout):
+            await websocket_client.async_command("Pause", timeout=0.01)
+
+        assert websocket_client._pending == {}
+
+    @pytest.mark.asyncio
+    async def test_request_when_disconnected(self, websocket_client):
+        """Test requests fail fast without a connection."""
+        from custom_components.xschedule.api_client import XScheduleConnectionError
+
+        with pytest.raises(XScheduleConnectionError):
+            await websocket_client.async_query("GetPlayingStatus")
+
+    @pytest.mark.asyncio
+    async def test_send_failure_raises_connection_error(self, websocket_client):
+        """Test a failed send is reported as not sent."""
+        from custom_components.xschedule.api_client import (
+            XScheduleConnectionError,
+            XScheduleRequestTimeout,
+        )
+
+        ws = _connect_mock_socket(websocket_client)
+        ws.send_json.side_effect = ConnectionResetError("reset")
+
+        with pytest.raises(XScheduleConnectionError) as err:
+            await websocket_client.async_command("Pause")
+        assert not isinstance(err.value, XScheduleRequestTimeout)
+
+    @pytest.mark.asyncio
+    async def test_disconnect_fails_pending_requests(self, websocket_client):
+        """Test waiting requests are failed when the socket goes away."""
+        from custom_components.xschedule.api_client import XScheduleConnectionError
+
+        _connect_mock_socket(websocket_client)
+        task = asyncio.create_task(websocket_client.async_query("GetPlayLists"))
+        await asyncio.sleep(0)
+
+        websocket_client._ws = None
+        await websocket_client.disconnect()
+
+        with pytest.raises(XScheduleConnectionError):
+            await task
@@ -11,7 +11,8 @@ from homeassistant.core import HomeAssistant
 from pytest_homeassistant_custom_component.common import MockConfigEntry
 
 from custom_components.xschedule.media_player import XScheduleMediaPlayer
-from custom_components.xschedule.const import DOMAIN
+from custom_components.xschedule.const import DOMAIN, WS_TOPIC_PINGSTATUS
+from custom_components.xschedule.websocket import XScheduleWebSocket
 from tests.fixtures.api_responses import (
     WEBSOCKET_MESSAGE_PLAYING,
     WEBSOCKET_MESSAGE_IDLE,
@@ -30,6 +31,7 @@ def mock_api_client():
     client.get_playlist_steps = AsyncMock(return_value=[])
     client.get_queued_steps = AsyncMock(return_value=[])
     client.invalidate_cache = MagicMock()
+    client.observe_status = MagicMock(return_value=frozenset())
     client.close = AsyncMock()
     return client
 
@@ -40,13 +42,14 @@ def mock_websocket():
     ws = MagicMock()
     ws.connect = AsyncMock()
     ws.disconnect = AsyncMock()
-    ws.send_command = AsyncMock()
     ws.connected = True  # Mark as connected so async_update doesn't re-fetch status
     return ws
 
 
 @pytest.fixture
-async def media_player_entity(hass: HomeAssistant, mock_api_client, mock_websocket):
+async def media_player_entity(
+    hass: HomeAssistant, mock_api_client, mock_websocket, attach_hub
+):
     """Create media player entity for testing."""
     config_entry = MockConfigEntry(
         domain=DOMAIN,
@@ -58,12 +61,9 @@ async def media_player_entity(hass: HomeAssistant, mock_api_client, mock_websock
         },
     )
 
-    with patch('custom_components.xschedule.media_player.XScheduleWebSocket', return_value=mock_websocket):
-        entity = XScheduleMediaPlayer(
-            config_entry=config_entry,
-            api_client=mock_api_client,
-            hass=hass,
-        )
+    with patch('custom_components.xschedule.hub.XScheduleWebSocket', return_value=mock_websocket):
+        attach_hub(hass, config_entry, mock_api_client)
+        entity = XScheduleMediaPlayer(config_entry=config_entry, hass=hass)
 
     entity.entity_id = "media_player.xschedule_test"
     await entity.async_added_to_hass()
@@ -232,72 +232,41 @@ class TestWebSocketStateTransitions:
 
 
 class TestControllerStatusHandling:
-    """Test controller health status updates via WebSocket."""
+    """Test controller health updates routed by the WebSocket."""
 
     @pytest.mark.asyncio
-    async def test_controller_status_initial_update(self, hass: HomeAssistant, media_player_entity):
-        """Test first controller status update fires event."""
-        events_fired = []
-
-        def capture_event(event):
-            events_fired.append(event.data)
-
-        hass.bus.async_listen(f"{DOMAIN}_controller_status_update", capture_event)
+    async def test_controller_status_initial_update(self):
+        """Test the first controller status is published in full."""
+        published = []
+        websocket = XScheduleWebSocket("192.168.1.100", 80)
+        websocket.subscribe(WS_TOPIC_PINGSTATUS, published.append)
 
-        # First controller status
-        media_player_entity._handle_websocket_update(WEBSOCKET_MESSAGE_CONTROLLER_UPDATE)
-        await hass.async_block_till_done()
+        websocket.dispatch_status(WEBSOCKET_MESSAGE_CONTROLLER_UPDATE)
 
-        # Event should fire
-        assert len(events_fired) == 1
-        assert len(events_fired[0]["controllers"]) == 2
+        assert len(published) == 1
+        assert len(published[0]) == 2
 
     @pytest.mark.asyncio
-    async def test_controller_status_change_detection(self, hass: HomeAssistant, media_player_entity):
-        """Test controller status only fires event on actual change.
+    async def test_controller_status_change_detection(self):
+        """Test controller status is only published on an actual change.
 
         Critical for CPU optimization from v1.2.1.
-        Verifies: media_player.py:255-267
         """
-        events_fired = []
-
-        def capture_event(event):
-            events_fired.append(event.data)
-
-        hass.bus.async_listen(f"{DOMAIN}_controller_status_update", capture_event)
+        published = []
+        websocket = XScheduleWebSocket("192.168.1.100", 80)
+        websocket.subscribe(WS_TOPIC_PINGSTATUS, published.append)
+        tree = {"controller": "Tree", "ip": "192.168.1.101", "result": "Ok"}
 
-        # First update - should fire event
-        message_1 = {
-            "status": "playing",
-            "pingstatus": [
-                {"controller": "Tree", "ip": "192.168.1.101", "result": "Ok"},
-            ]
-        }
-        media_player_entity._handle_websocket_update(message_1)
-        await hass.async_block_till_done()
-        assert len(events_fired) == 1
+        websocket.dispatch_status({"status": "playing", "pingstatus": [tree]})
+        assert len(published) == 1
 
-        # Second update - SAME status - should NOT fire event
-        message_2 = {
-            "status": "playing",
-            "pingstatus": [
-                {"controller": "Tree", "ip": "192.168.1.101", "result": "Ok"},
-            ]
-        }
-        media_player_entity._handle_websocket_update(message_2)
-        await hass.async_block_till_done()
-        assert len(events_fired) == 1  # Still only 1
+        # SAME status - nothing published
+        websocket.dispatch_status({"status": "playing", "pingstatus": [dict(tree)]})
+        assert len(published) == 1
 
-        # Third update - CHANGED status - should fire event
-        message_3 = {
-            "status": "playing",
-            "pingstatus": [
-                {"controller": "Tree", "ip": "192.168.1.101", "result": "Failed"},
-            ]
-        }
-        media_player_entity._handle_websocket_update(message_3)
-        await hass.async_block_till_done()
-        assert len(events_fired) == 2  # Now 2 events
+        # CHANGED status - published
+        websocket.dispatch_status({"status": "playing", "pingstatus": [dict(tree, result="Failed")]})
+        assert len(published) == 2
 
     @pytest.mark.asyncio
     async def test_controller_status_no_pingstatus_field(self, media_player_entity):
@@ -313,6 +282,34 @@ class TestControllerStatusHandling:
 
         assert media_player_entity.state == MediaPlayerState.PLAYING
 
+    @pytest.mark.asyncio
+    async def test_controller_status_publishes_changed_only(self):
+        """Test only the controllers that changed are published.
+
+        A message without pingstatus in between must not count as a change.
+        """
+        published = []
+        websocket = XScheduleWebSocket("192.168.1.100", 80)
+        websocket.subscribe(WS_TOPIC_PINGSTATUS, published.append)
+        tree = {"controller": "Tree", "ip": "192.168.1.101", "result": "Ok"}
+        house = {"controller": "House", "ip": "192.168.1.102", "result": "Ok"}
+
+        websocket.dispatch_status({"status": "playing", "pingstatus": [tree, house]})
+        websocket.dispatch_status({"status": "playing"})
+        websocket.dispatch_status(
+            {"status": "playing", "pingstatus": [tree, dict(house, result="Failed")]}
+        )
+
+        assert len(published) == 2
+        assert [item.controller for item in published[1]] == ["House"]
+
+    @pytest.mark.asyncio
+    async def test_entity_tracks_controller_status(self, media_player_entity):
+        """Test the entity keeps the full list for sensor setup."""
+        media_player_entity._handle_websocket_update(WEBSOCKET_MESSAGE_CONTROLLER_UPDATE)
+
+        assert len(media_player_entity._controller_status) == 2
+
 
 class TestWebSocketDebouncing:
     """Test WebSocket update debouncing for CPU optimization."""
@@ -388,8 +385,8 @@ class TestCacheInvalidation:
     """Test cache invalidation on state changes via WebSocket."""
 
     @pytest.mark.asyncio
-    async def test_cache_invalidated_on_state_change(self, media_player_entity, mock_api_client):
-        """Test cache invalidated when state changes."""
+    async def test_cache_not_invalidated_on_state_change(self, media_player_entity, mock_api_client):
+        """Test cache kept when state changes (playback doesn't edit playlists)."""
         media_player_entity._attr_state = MediaPlayerState.PLAYING
         mock_api_client.invalidate_cache.reset_mock()
 
@@ -397,12 +394,13 @@ class TestCacheInvalidation:
         idle_message = {"status": "idle"}
         media_player_entity._handle_websocket_update(idle_message)
 
-        # Cache should be invalidated
-        mock_api_client.invalidate_cache.assert_called_once()
+        # Staleness is decided by the API client from the status itself
+        mock_api_client.observe_status.assert_called_once_with(idle_message)
+        mock_api_client.invalidate_cache.assert_not_called()
 
     @pytest.mark.asyncio
-    async def test_cache_invalidated_on_playlist_change(self, media_player_entity, mock_api_client):
-        """Test cache invalidated when playlist changes."""
+    async def test_cache_not_invalidated_on_playlist_change(self, media_player_entity, mock_api_client):
+        """Test cache kept when playlist changes."""
         media_player_entity._attr_state = MediaPlayerState.PLAYING
         media_player_entity._attr_media_playlist = "Halloween"
         mock_api_client.invalidate_cache.reset_mock()
@@ -414,8 +412,7 @@ class TestCacheInvalidation:
         }
         media_player_entity._handle_websocket_update(new_playlist_message)
 
-        # Cache should be invalidated
-        mock_api_client.invalidate_cache.assert_called_once()
+        mock_api_client.invalidate_cache.assert_not_called()
 
     @pytest.mark.asyncio
     async def test_cache_not_invalidated_on_song_change(self, media_player_entity, mock_api_client):